@@ -0,0 +1,185 @@
+"""Asyncio enrichment on ollama.AsyncClient with AIMD-adapted concurrency."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import httpx
+from ollama import AsyncClient, ResponseError
+
+from agent.chunk_enrichment.enrichment_cache import EnrichmentCache
+from agent.chunk_enrichment.enrichment_journal import EnrichmentJournal
+from agent.chunk_enrichment.llm_enrichment import _prepare_chunk, _retry_delay
+from llm.ollama_client import create_async_client
+from llm.qwen_ollama_chunking import agenerate_enriched_chunk, chunk_enricher
+
+
+class AIMDController:
+    """Additive-increase / multiplicative-decrease limit on in-flight requests.
+
+    While the smoothed latency stays within ``latency_tolerance`` of the best
+    latency seen, each success adds ``increase / limit`` (about ``increase``
+    per round of ``limit`` requests). Timeouts, 5xx/429 responses or latency
+    beyond the tolerance multiply the limit by ``decrease``, at most once per
+    round: signals from requests started before the last decrease are ignored.
+    """
+
+    def __init__(
+        self,
+        initial: int = 4,
+        minimum: int = 1,
+        maximum: int = 32,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        latency_tolerance: float = 1.5,
+        smoothing: float = 0.3,
+    ) -> None:
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.smoothing = smoothing
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.peak = self.concurrency
+        self.overloads = 0
+        self._baseline: Optional[float] = None
+        self._latency: Optional[float] = None
+        self._last_decrease = float("-inf")
+
+    @property
+    def concurrency(self) -> int:
+        return int(self.limit)
+
+    def on_success(self, latency: float, started_at: float) -> None:
+        self._latency = (
+            latency
+            if self._latency is None
+            else self.smoothing * latency + (1 - self.smoothing) * self._latency
+        )
+        self._baseline = (
+            self._latency if self._baseline is None else min(self._baseline, self._latency)
+        )
+        if self._latency > self._baseline * self.latency_tolerance:
+            self._back_off(started_at)
+            return
+        self.limit = min(self.maximum, self.limit + self.increase / self.limit)
+        self.peak = max(self.peak, self.concurrency)
+
+    def on_overload(self, started_at: float) -> None:
+        self.overloads += 1
+        self._back_off(started_at)
+
+    def _back_off(self, started_at: float) -> None:
+        if started_at < self._last_decrease:
+            return
+        self.limit = max(self.minimum, self.limit * self.decrease)
+        self._last_decrease = time.monotonic()
+        # Latency measured above the old limit says nothing about the new one.
+        self._latency = None
+
+
+def _is_overload(exc: Exception) -> bool:
+    if isinstance(exc, (httpx.TimeoutException, asyncio.TimeoutError)):
+        return True
+    return isinstance(exc, ResponseError) and (exc.status_code >= 500 or exc.status_code == 429)
+
+
+async def aenrich_chunks(
+    chunks: Sequence[Any],
+    *,
+    controller: Optional[AIMDController] = None,
+    cache: Optional[EnrichmentCache] = None,
+    journal: Optional[EnrichmentJournal] = None,
+    max_attempts: int = 3,
+    retry_delay: float = 0.5,
+) -> List[Dict[str, Any]]:
+    """Enrich ``chunks`` concurrently, returning metadata in input order.
+
+    ``controller.maximum`` workers share the chunks; a worker only starts a
+    request while its slot is below the controller's current limit. A failed
+    chunk (overload, connection error, timeout or invalid answer) is retried
+    after a backoff, up to ``max_attempts`` times, and yields ``{}`` if it
+    still fails, as in ``enrich_chunk``; only overloads lower the limit.
+    ``journal`` replays and records results as in ``enrich_chunk``.
+    """
+
+    controller = controller or AIMDController()
+    results: List[Dict[str, Any]] = [{} for _ in chunks]
+    positions = iter(range(len(chunks)))
+    slots_changed = asyncio.Condition()
+
+    async def enrich_one(client: AsyncClient, chunk) -> Dict[str, Any]:
+        truncated_content, is_table, expert = _prepare_chunk(chunk)
+        key = cache.key(truncated_content, is_table, expert) if cache is not None else None
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+        journal_key = journal.key(truncated_content, is_table, expert) if journal is not None else None
+        if journal is not None:
+            replayed = journal.get(journal_key)
+            if replayed is not None:
+                return replayed
+
+        prompt = chunk_enricher(truncated_content, is_table, expert)
+        for attempt in range(1, max_attempts + 1):
+            started_at = time.monotonic()
+            try:
+                metadata = (await agenerate_enriched_chunk(prompt, client)).model_dump()
+            except Exception as exc:
+                # Only overloads shrink the limit; connection errors and bad answers are retried as is.
+                if _is_overload(exc):
+                    controller.on_overload(started_at)
+                if attempt < max_attempts:
+                    print(f"Error enriching chunk (attempt {attempt} of {max_attempts}), retrying: {exc}")
+                    await asyncio.sleep(_retry_delay(attempt, retry_delay))
+                    continue
+                print(f"Error enriching chunk after {attempt} attempt(s): {exc}")
+                if journal is not None:
+                    journal.record_failure(journal_key, exc, attempt)
+                return {}
+            controller.on_success(time.monotonic() - started_at, started_at)
+            if cache is not None:
+                cache.put(key, metadata)
+            if journal is not None:
+                journal.record(journal_key, metadata, attempt)
+            return metadata
+        return {}
+
+    exhausted = False
+
+    async def worker(client: AsyncClient, slot: int) -> None:
+        nonlocal exhausted
+        while True:
+            async with slots_changed:
+                await slots_changed.wait_for(lambda: exhausted or slot < controller.concurrency)
+            position = next(positions, None)
+            if position is None:
+                async with slots_changed:
+                    exhausted = True
+                    slots_changed.notify_all()
+                return
+            results[position] = await enrich_one(client, chunks[position])
+            async with slots_changed:
+                slots_changed.notify_all()
+
+    # One pooled connection per worker slot.
+    client = create_async_client(pool_size=controller.maximum)
+    try:
+        await asyncio.gather(*(worker(client, slot) for slot in range(controller.maximum)))
+    finally:
+        await client.close()
+
+    print(
+        f"Async enrichment of {len(chunks)} chunks finished at concurrency "
+        f"{controller.concurrency} (peak {controller.peak}, {controller.overloads} overloads)."
+    )
+    return results
+
+
+def enrich_chunk_async(chunks, cache: Optional[EnrichmentCache] = None, **kwargs) -> List[Dict[str, Any]]:
+    """Synchronous entry point with the same contract as ``enrich_chunk``."""
+    return asyncio.run(aenrich_chunks(chunks, cache=cache, **kwargs))
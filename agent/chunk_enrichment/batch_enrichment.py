@@ -0,0 +1,200 @@
+"""Pack short chunks into multi-chunk prompts to cut per-call prompt overhead."""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+from agent.chunk_enrichment.enrichment_cache import EnrichmentCache
+from agent.chunk_enrichment.enrichment_journal import EnrichmentJournal
+from agent.chunk_enrichment.llm_enrichment import _prepare_chunk, _process_single_chunk
+from agent.chunk_enrichment.model_routing import ModelRouter
+from agent.chunk_generation.token_chunker import ApproximateTokenCounter
+from llm.backends import generate_enriched_batch, get_backend
+from llm.qwen_ollama_chunking import batch_chunk_enricher, chunk_enricher, full_prompt
+
+SHORT_CHUNK_CHARS = 500
+BATCH_TOKEN_BUDGET = 1500
+MAX_BATCH_SIZE = 8
+
+_tokens = ApproximateTokenCounter()
+
+
+@dataclass
+class BatchEnrichmentStats:
+    """Calls (every attempt counts) and prompt tokens spent, against one call per chunk."""
+
+    chunks: int = 0
+    calls: int = 0
+    batch_calls: int = 0
+    fallback_calls: int = 0
+    prompt_tokens: int = 0
+    single_call_prompt_tokens: int = 0
+
+    def report(self) -> str:
+        saved_calls = self.chunks - self.calls
+        saved_tokens = self.single_call_prompt_tokens - self.prompt_tokens
+        token_share = saved_tokens / self.single_call_prompt_tokens if self.single_call_prompt_tokens else 0.0
+        return (
+            f"Batched enrichment: {self.calls} LLM calls for {self.chunks} chunks "
+            f"({self.batch_calls} batched, {self.fallback_calls} single-chunk fallbacks; "
+            f"{saved_calls} calls saved), ~{self.prompt_tokens} prompt tokens "
+            f"(~{saved_tokens} saved, {token_share:.1%})."
+        )
+
+
+def plan_batches(
+    sizes: Sequence[int],
+    token_budget: int = BATCH_TOKEN_BUDGET,
+    max_batch_size: int = MAX_BATCH_SIZE,
+) -> List[List[int]]:
+    """Group consecutive positions so each group's content tokens fit ``token_budget``."""
+
+    batches: List[List[int]] = []
+    current: List[int] = []
+    used = 0
+    for position, size in enumerate(sizes):
+        if current and (used + size > token_budget or len(current) == max_batch_size):
+            batches.append(current)
+            current, used = [], 0
+        current.append(position)
+        used += size
+    if current:
+        batches.append(current)
+    return batches
+
+
+def enrich_chunks_batched(
+    chunks: Sequence[Any],
+    cache: Optional[EnrichmentCache] = None,
+    journal: Optional[EnrichmentJournal] = None,
+    max_attempts: int = 1,
+    router: Optional[ModelRouter] = None,
+    *,
+    short_chunk_chars: int = SHORT_CHUNK_CHARS,
+    token_budget: int = BATCH_TOKEN_BUDGET,
+    max_batch_size: int = MAX_BATCH_SIZE,
+    stats: Optional[BatchEnrichmentStats] = None,
+) -> List[Dict[str, Any]]:
+    """Enrich chunks, packing short ones into shared prompts; results keep input order.
+
+    Chunks shorter than ``short_chunk_chars`` are grouped up to ``token_budget``
+    content tokens and ``max_batch_size`` chunks per call. Every entry of a
+    batch answer is validated; chunks whose entry is missing or invalid, and
+    all longer chunks, go through the single-chunk path. ``cache``, ``journal``,
+    ``max_attempts`` and ``router`` behave as in ``enrich_chunk``; with a
+    router, only chunks routed to the small model are batched (on that model).
+    """
+
+    stats = stats if stats is not None else BatchEnrichmentStats()
+    lock = threading.Lock()
+    results: List[Dict[str, Any]] = [{} for _ in chunks]
+    prepared = [_prepare_chunk(chunk) for chunk in chunks]
+
+    pending: List[int] = []
+    for position, (content, is_table, expert) in enumerate(prepared):
+        cached = cache.get(cache.key(content, is_table, expert)) if cache is not None else None
+        if cached is None and journal is not None:
+            cached = journal.get(journal.key(content, is_table, expert))
+        if cached is not None:
+            results[position] = cached
+        else:
+            pending.append(position)
+
+    stats.chunks += len(pending)
+    stats.single_call_prompt_tokens += sum(
+        _tokens.count(full_prompt(chunk_enricher(*prepared[p]))) for p in pending
+    )
+
+    def batchable(position: int) -> bool:
+        content, is_table, _ = prepared[position]
+        if len(content) >= short_chunk_chars:
+            return False
+        return router is None or router.policy.choose(content, is_table) == router.policy.small_model
+
+    short = [p for p in pending if batchable(p)]
+    singles = [p for p in pending if not batchable(p)]
+    batches: List[List[int]] = []
+    for group in plan_batches(
+        [_tokens.count(prepared[p][0]) for p in short], token_budget, max_batch_size
+    ):
+        positions = [short[i] for i in group]
+        if len(positions) == 1:
+            singles.extend(positions)
+        else:
+            batches.append(positions)
+
+    def record_call(prompt: str, batched: bool = False, fallback: bool = False) -> None:
+        with lock:
+            stats.calls += 1
+            stats.batch_calls += batched
+            stats.fallback_calls += fallback
+            stats.prompt_tokens += _tokens.count(prompt)
+
+    def store(position: int, metadata: Dict[str, Any]) -> None:
+        results[position] = metadata
+        if metadata and cache is not None:
+            cache.put(cache.key(*prepared[position]), metadata)
+
+    def run_batch(batch: List[int]) -> List[int]:
+        """Enrich one batch and return the positions that need a single-chunk retry."""
+        expert = prepared[batch[0]][2]
+        prompt = batch_chunk_enricher([prepared[p][:2] for p in batch], expert)
+        record_call(prompt, batched=True)
+        try:
+            if router is not None:
+                answers = router.generate_batch(prompt, len(batch))
+            else:
+                answers = generate_enriched_batch(prompt, len(batch))
+        except Exception as e:
+            print(f"Error enriching batch of {len(batch)} chunks: {e}")
+            return batch
+
+        failed = []
+        for position, metadata in zip(batch, answers):
+            if metadata is None:
+                failed.append(position)
+            else:
+                store(position, metadata.model_dump())
+                if journal is not None:
+                    journal.record(journal.key(*prepared[position]), results[position])
+        return failed
+
+    def run_single(position: int, fallback: bool = False) -> List[int]:
+        prompt = full_prompt(chunk_enricher(*prepared[position]))
+        # The cache was already checked above, so don't count a second miss.
+        store(
+            position,
+            _process_single_chunk(
+                chunks[position],
+                journal=journal,
+                max_attempts=max_attempts,
+                router=router,
+                on_attempt=lambda: record_call(prompt, fallback=fallback),
+            ),
+        )
+        return []
+
+    # Batches and singles are submitted in chunk order; a batch's failed
+    # entries are retried as singles as soon as that batch returns.
+    work = sorted(
+        [(batch[0], batch) for batch in batches] + [(p, p) for p in singles],
+        key=lambda item: item[0],
+    )
+    with ThreadPoolExecutor(max_workers=get_backend().limits.concurrency) as executor:
+        futures = [
+            executor.submit(run_batch, item) if isinstance(item, list) else executor.submit(run_single, item)
+            for _, item in work
+        ]
+        fallbacks = [
+            executor.submit(run_single, position, True)
+            for future in as_completed(futures)
+            for position in future.result()
+        ]
+        for future in fallbacks:
+            future.result()
+
+    print(stats.report())
+    return results
@@ -2,31 +2,56 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
+import re
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, List, Sequence
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from agent.chunk_enrichment.chunk_store import ShardedChunkStore, record_id
+from agent.chunk_enrichment.columnar_store import ColumnarChunkStore
+from agent.chunk_enrichment.json_store import JsonChunkStore
+from agent.chunk_generation.table_splitter import chunk_content
+
+# unstructured's partitioners assign content hashes; elements built in memory get random UUIDs.
+_HASH_ID = re.compile(r"^[0-9a-f]{32}$")
+# Stamped on every element by parse_html and copied onto each stored chunk.
+PROVENANCE_FIELDS = ("source_file", "accession_number", "form_type", "filing_date")
+CHUNK_STORES = (ShardedChunkStore, ColumnarChunkStore, JsonChunkStore)
+ChunkOutput = str | Path | ShardedChunkStore | ColumnarChunkStore | JsonChunkStore
 
 
 def collect_enriched_chunks(
     file_path: str | Path,
     chunks: Sequence[Any],
     enriched_metadata: Sequence[dict[str, Any]],
-    output_path: str | Path,
+    output_path: ChunkOutput,
     *,
     filings_root: str | Path | None = None,
     append: bool = True,
 ) -> List[dict[str, Any]]:
-    """Combine chunk content with metadata and store the result in a JSON file."""
+    """Combine chunk content with metadata and store the result in a JSON file or chunk store."""
+
+    new_records = build_enriched_records(
+        file_path, chunks, enriched_metadata, filings_root=filings_root
+    )
+    return persist_enriched_records(
+        new_records, output_path, source=file_path, append=append
+    )
 
-    file_path = Path(file_path)
-    filings_root = Path(filings_root)
-    output_path = Path(output_path)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    persisted_data: List[dict[str, Any]] = []
-    if append and output_path.exists():
-        with output_path.open("r", encoding="utf-8") as existing_file:
-            persisted_data = json.load(existing_file)
+def build_enriched_records(
+    file_path: str | Path,
+    chunks: Sequence[Any],
+    enriched_metadata: Sequence[dict[str, Any]],
+    *,
+    filings_root: str | Path | None = None,
+) -> List[dict[str, Any]]:
+    """Combine chunk content with metadata without touching disk."""
+
+    file_path = Path(file_path)
+    filings_root = _root(filings_root)
 
     new_records: List[dict[str, Any]] = []
     for index, chunk in enumerate(chunks):
@@ -37,44 +62,309 @@ def collect_enriched_chunks(
         if final_chunk:
             new_records.append(final_chunk)
 
-    combined_records = persisted_data + new_records if append else new_records
+    dropped = len(chunks) - len(new_records)
+    if dropped:
+        print(f"Dropped {dropped} of {len(chunks)} chunks from {file_path} with no enrichment metadata.")
+    return new_records
+
+
+def stored_enrichments(
+    file_path: str | Path,
+    chunks: Sequence[Any],
+    output_path: ChunkOutput,
+    *,
+    filings_root: str | Path | None = None,
+) -> List[dict[str, Any] | None]:
+    """Enrichment metadata already stored for each chunk, or ``None`` for chunks not stored.
+
+    Chunks are matched by ``chunk_id``, so re-ingesting an unchanged filing
+    reuses its metadata instead of enriching it again.
+    """
+
+    file_path = Path(file_path)
+    filings_root = _root(filings_root)
+    base_records = [_base_record(file_path, filings_root, chunk) for chunk in chunks]
+    stored = _open_store(output_path).get_many(
+        [record["chunk_id"] for record in base_records], sources=_sources(base_records)
+    )
+    enrichments: List[dict[str, Any] | None] = []
+    for base in base_records:
+        record = stored.get(base["chunk_id"])
+        enrichments.append(
+            None if record is None else {k: v for k, v in record.items() if k not in base}
+        )
+    return enrichments
+
+
+def _open_store(output_path: ChunkOutput) -> ShardedChunkStore | ColumnarChunkStore | JsonChunkStore:
+    # A JSON path is loaded for this call only; main opens a JsonChunkStore once per run instead.
+    if isinstance(output_path, CHUNK_STORES):
+        return output_path
+    return JsonChunkStore(output_path)
+
+
+def _sources(records: Iterable[dict[str, Any]]) -> Optional[Set[str]]:
+    """Source labels of ``records``, which scope columnar lookups; ``None`` if any is unlabelled."""
 
-    with output_path.open("w", encoding="utf-8") as outfile:
-        json.dump(combined_records, outfile, indent=2)
+    sources = set()
+    for record in records:
+        if not record.get("source"):
+            return None
+        sources.add(record["source"])
+    return sources
 
+
+def unenriched_records(
+    file_path: str | Path,
+    chunks: Sequence[Any],
+    enriched_metadata: Sequence[dict[str, Any]],
+    *,
+    filings_root: str | Path | None = None,
+) -> List[dict[str, Any]]:
+    """Records, without metadata, of the chunks ``build_enriched_records`` drops.
+
+    They carry the ``chunk_id``, provenance and content of chunks whose
+    enrichment failed, so their earlier points are not treated as stale.
+    """
+
+    file_path = Path(file_path)
+    filings_root = _root(filings_root)
+    return [
+        _base_record(file_path, filings_root, chunk)
+        for index, chunk in enumerate(chunks)
+        if not (enriched_metadata[index] if index < len(enriched_metadata) else {})
+    ]
+
+
+def record_ids_by_file(records: Iterable[dict[str, Any]]) -> Dict[str, Set[str]]:
+    """Record ids grouped by ``source_file``; records without one are left out."""
+
+    ids_by_file: Dict[str, Set[str]] = {}
+    for record in records:
+        if record.get("source_file"):
+            ids_by_file.setdefault(record["source_file"], set()).add(record_id(record))
+    return ids_by_file
+
+
+def delete_stale_records(
+    output_path: ChunkOutput,
+    source_file: str,
+    keep_ids: Set[str],
+    *,
+    filings_root: str | Path | None = None,
+) -> int:
+    """Delete stored records of ``source_file`` whose ids are not in ``keep_ids``; return how many.
+
+    Run after re-ingesting a filing, with the ids of every chunk it produced
+    (enriched or not), so chunks it no longer has do not stay in the store
+    after their points leave Qdrant.
+    """
+
+    store = _open_store(output_path)
+    sources = [_derive_source_label(Path(source_file), _root(filings_root))]
+    stale = store.file_ids(source_file, sources=sources) - set(keep_ids)
+    removed = store.remove(stale, sources=sources) if stale else 0
+    if store is not output_path:
+        store.flush()
+    if removed:
+        print(f"Deleted {removed} stale enriched chunks of {source_file}.")
+    return removed
+
+
+@dataclass
+class UpsertResult:
+    """What an upsert did; ``changed`` holds the inserted and updated records."""
+
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    changed: List[dict[str, Any]] = field(default_factory=list)
+
+    def report(self) -> str:
+        return (
+            f"Upserted enriched chunks: {self.inserted} inserted, {self.updated} updated, "
+            f"{self.unchanged} unchanged."
+        )
+
+
+def _same_record(stored: dict[str, Any] | None, record: dict[str, Any]) -> bool:
+    # Columnar stores return every column, so missing and None fields compare equal.
+    if stored is None:
+        return False
+    return {k: v for k, v in stored.items() if v is not None} == {
+        k: v for k, v in record.items() if v is not None
+    }
+
+
+def upsert_enriched_chunks(
+    new_records: List[dict[str, Any]],
+    output_path: ChunkOutput,
+    *,
+    source: str | Path = "",
+) -> UpsertResult:
+    """Insert or replace records by ``chunk_id``; unchanged records cost no write.
+
+    Stores look ids up in their index; a JSON path is loaded and, only when
+    something changed, rewritten on every call, so pass a ``JsonChunkStore``
+    to write it once per run. Embed ``changed`` from the result to skip
+    re-embedding unchanged chunks.
+    """
+
+    store = _open_store(output_path)
+    result = _upsert(new_records, store)
+    if store is not output_path:
+        store.flush()
+    destination = store.path if isinstance(store, JsonChunkStore) else store.directory
     print(
-        f"Persisted {len(new_records)} enriched chunks from {file_path} to '{output_path}'. "
-        f"Total stored: {len(combined_records)}"
+        f"Upserted enriched chunks from {source} into '{destination}': {result.inserted} inserted, "
+        f"{result.updated} updated, {result.unchanged} unchanged."
     )
+    return result
+
+
+def _upsert(
+    records: List[dict[str, Any]], store: ShardedChunkStore | ColumnarChunkStore | JsonChunkStore
+) -> UpsertResult:
+    stored = store.get_many((record_id(record) for record in records), sources=_sources(records))
+    result = _diff(records, stored)
+    replaced = [record_id(record) for record in result.changed if record_id(record) in stored]
+    if replaced and isinstance(store, ColumnarChunkStore):
+        # Columnar files are immutable, so replaced rows are removed before the new ones land.
+        store.remove(replaced, sources={stored[rid]["source"] for rid in replaced})
+    store.append(result.changed)
+    return result
+
 
-    return combined_records
+def _diff(records: List[dict[str, Any]], stored: Dict[str, dict[str, Any]]) -> UpsertResult:
+    result = UpsertResult()
+    # A repeated id within one batch keeps its last record.
+    latest = {record_id(record): record for record in records}
+    for record in latest.values():
+        previous = stored.get(record_id(record))
+        if _same_record(previous, record):
+            result.unchanged += 1
+            continue
+        if previous is None:
+            result.inserted += 1
+        else:
+            result.updated += 1
+        result.changed.append(record)
+    return result
+
+
+def persist_enriched_records(
+    new_records: List[dict[str, Any]],
+    output_path: ChunkOutput,
+    *,
+    source: str | Path = "",
+    append: bool = True,
+) -> List[dict[str, Any]]:
+    """Store enriched records, replacing earlier records with the same ``chunk_id``.
+
+    ``append=False`` clears the output first. A JSON path returns everything
+    stored; a chunk store returns only the inserted and updated records,
+    since re-reading a store is what it avoids.
+    """
+
+    if isinstance(output_path, CHUNK_STORES):
+        if not append:
+            output_path.clear()
+        return upsert_enriched_chunks(new_records, output_path, source=source).changed
+
+    store = JsonChunkStore(output_path)
+    if not append:
+        store.clear()
+    result = _upsert(new_records, store)
+    store.flush()
+
+    print(
+        f"Persisted {len(result.changed)} of {len(new_records)} enriched chunks from {source} "
+        f"to '{store.path}' ({result.unchanged} unchanged). Total stored: {len(store)}"
+    )
+
+    return list(store)
+
+
+def chunk_id(source_path: str, chunk: Any, content: str) -> str:
+    """Stable id of a chunk: a hash of its source path, element ids and content.
+
+    Element ids are those of the chunk's original elements, and only the
+    deterministic ones, so re-parsing an unchanged filing gives the same id.
+    """
+
+    orig_elements = getattr(chunk.metadata, "orig_elements", None) or []
+    element_ids = [element.id for element in orig_elements if _HASH_ID.match(str(element.id))]
+    payload = json.dumps([source_path, element_ids, content], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def _root(filings_root: str | Path | None) -> Path | None:
+    return Path(filings_root) if filings_root is not None else None
+
+
+def _relative_parts(file_path: Path, filings_root: Path | None) -> Tuple[str, ...]:
+    # Without a filings root, or outside it, the whole path is used.
+    if filings_root is not None:
+        try:
+            return file_path.relative_to(filings_root).parts
+        except ValueError:
+            pass
+    return file_path.parts
+
+
+def _source_path(file_path: Path, filings_root: Path | None, chunk: Any) -> str:
+    path = Path(*_relative_parts(file_path, filings_root)).as_posix()
+    # A whole folder is aggregated at once outside streaming; the element's filename tells files apart.
+    filename = getattr(chunk.metadata, "filename", None)
+    return f"{path}:{filename}" if filename else path
+
+
+def chunk_provenance(chunk: Any) -> dict[str, Any]:
+    """Filing provenance of a chunk; missing fields are ``None``.
+
+    Chunking drops the provenance parse_html stamps on elements, so it is
+    read from the chunk's original elements when the chunk has none.
+    """
+
+    sources = [chunk.metadata] + [
+        getattr(element, "metadata", None)
+        for element in getattr(chunk.metadata, "orig_elements", None) or []
+    ]
+    provenance: dict[str, Any] = {}
+    for name in PROVENANCE_FIELDS:
+        values = (getattr(metadata, name, None) for metadata in sources)
+        provenance[name] = next((value for value in values if value), None)
+    return provenance
 
 
 def _finalize_chunk_data(
-    file_path: Path, filings_root: Path, chunk: Any, enrichment_data: dict[str, Any]
+    file_path: Path, filings_root: Path | None, chunk: Any, enrichment_data: dict[str, Any]
 ):
     if not enrichment_data:
         return None
+    return {**_base_record(file_path, filings_root, chunk), **enrichment_data}
+
 
-    chunk_metadata = chunk.metadata.to_dict()
-    is_table = "text_as_html" in chunk_metadata
-    content = getattr(chunk.metadata, "text_as_html", None) if is_table else chunk.text
+def _base_record(file_path: Path, filings_root: Path | None, chunk: Any) -> dict[str, Any]:
+    content, is_table = chunk_content(chunk)
 
+    # Label each chunk by the filing it came from, not by the folder being ingested.
+    provenance = chunk_provenance(chunk)
+    if provenance["source_file"]:
+        file_path = Path(provenance["source_file"])
     source = _derive_source_label(file_path, filings_root)
 
     return {
+        "chunk_id": chunk_id(_source_path(file_path, filings_root, chunk), chunk, content),
         "source": source,
-        "content": (content or ""),
+        **provenance,
+        "content": content,
         "is_table": is_table,
-        **enrichment_data,
     }
 
 
-def _derive_source_label(file_path: Path, filings_root: Path) -> str:
-    try:
-        relative_parts = file_path.relative_to(filings_root).parts
-    except ValueError:
-        relative_parts = file_path.parts
+def _derive_source_label(file_path: Path, filings_root: Path | None) -> str:
+    relative_parts = _relative_parts(file_path, filings_root)
 
     if len(relative_parts) >= 3:
         return "/".join(relative_parts[1:3])
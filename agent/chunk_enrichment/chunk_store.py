@@ -0,0 +1,463 @@
+"""Append-only, sharded JSONL store for enriched chunk records."""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+import tempfile
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+SHARD_MAX_RECORDS = 5000
+INDEX_NAME = "index.jsonl"
+
+_SHARD = re.compile(r"shard-(\d{5})\.jsonl(\.zst)?$")
+
+
+def record_id(record: Dict[str, Any]) -> str:
+    """The record's ``chunk_id``, or for older records a hash of its source and content."""
+
+    if record.get("chunk_id"):
+        return record["chunk_id"]
+    payload = json.dumps(
+        [record.get("source"), record.get("content"), record.get("is_table")], ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+def _zstd():
+    # zstandard is optional; only stores created with compression="zstd" need it.
+    try:
+        import zstandard
+    except ImportError as exc:
+        raise ImportError(
+            "Compressed chunk stores need the 'zstandard' package: pip install zstandard"
+        ) from exc
+    return zstandard
+
+
+def _fsync_directory(directory: Path) -> None:
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+@dataclass
+class ChunkStoreStats:
+    """Records appended, shards sealed and records migrated in one process."""
+
+    appended: int = 0
+    sealed_shards: int = 0
+    migrated: int = 0
+
+    def report(self) -> str:
+        return (
+            f"Chunk store: {self.appended} records appended, "
+            f"{self.sealed_shards} shards sealed, {self.migrated} migrated."
+        )
+
+
+class ShardedChunkStore:
+    """Enriched chunk records in append-only JSONL shards under ``directory``.
+
+    New records are appended to the open shard ``shard-NNNNN.jsonl`` and
+    fsynced, so a crash loses at most the batch being written and never
+    touches earlier records. A shard holding ``shard_max_records`` records is
+    sealed and the next one opened; with ``compression="zstd"`` the sealed
+    shard is compressed to ``shard-NNNNN.jsonl.zst`` through a temporary file
+    and an atomic rename. ``index.jsonl`` maps each record id to its shard and
+    line offset so ``get`` reads a single line instead of scanning. A record
+    appended again under the same id replaces the earlier one: the index
+    points at the newest copy and readers skip the rest. ``remove`` appends
+    tombstones to the index, and the index also records each record's
+    ``source_file`` so ``file_ids`` answers without reading shards.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        *,
+        shard_max_records: int = SHARD_MAX_RECORDS,
+        compression: Optional[str] = None,
+        fsync: bool = True,
+    ) -> None:
+        if compression not in (None, "zstd"):
+            raise ValueError(f"Unknown chunk store compression '{compression}'; use zstd or none.")
+        if compression:
+            _zstd()
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.shard_max_records = shard_max_records
+        self.compression = compression
+        self.fsync = fsync
+        self.stats = ChunkStoreStats()
+
+        self._lock = threading.Lock()
+        self._index: Dict[str, Tuple[int, int]] = {}
+        self._file_of: Dict[str, Optional[str]] = {}
+        self._files: Dict[Optional[str], Set[str]] = {}
+        # Indexes written before source files were recorded are filled in by one scan on demand.
+        self._files_complete = True
+        # Highest offset indexed per shard, including copies since replaced or removed.
+        self._indexed_end: Dict[int, int] = {}
+        self._open_shard = self._recover()
+        self._open_records = 0
+        self._index_file = (self.directory / INDEX_NAME).open("a", encoding="utf-8")
+        self._shard_file = self._shard_path(self._open_shard).open("ab")
+        self._reindex_open_shard()
+
+    def _shard_path(self, number: int, sealed: bool = False) -> Path:
+        suffix = ".jsonl.zst" if sealed else ".jsonl"
+        return self.directory / f"shard-{number:05d}{suffix}"
+
+    def shards(self) -> List[Path]:
+        """Shard files in append order."""
+
+        numbered = []
+        for path in self.directory.iterdir():
+            match = _SHARD.match(path.name)
+            if match:
+                numbered.append((int(match.group(1)), path))
+        return [path for _, path in sorted(numbered)]
+
+    def _recover(self) -> int:
+        """Finish an interrupted seal, drop a torn last record, load the index.
+
+        Returns the number of the shard new records go to.
+        """
+
+        for tmp in self.directory.glob("*.tmp"):
+            tmp.unlink()
+        for sealed in self.directory.glob("shard-*.jsonl.zst"):
+            # The rename already completed, so the uncompressed copy is redundant.
+            sealed.with_suffix("").unlink(missing_ok=True)
+
+        shards = self.shards()
+        if not shards:
+            open_shard = 0
+        elif shards[-1].suffix == ".zst":
+            open_shard = int(_SHARD.match(shards[-1].name).group(1)) + 1
+        else:
+            open_shard = int(_SHARD.match(shards[-1].name).group(1))
+
+        open_path = self._shard_path(open_shard)
+        if open_path.exists():
+            data = open_path.read_bytes()
+            complete = data.rfind(b"\n") + 1
+            if complete < len(data):
+                print(f"Dropping a torn record at the end of {open_path}")
+                with open_path.open("r+b") as shard_file:
+                    shard_file.truncate(complete)
+
+        index_path = self.directory / INDEX_NAME
+        if index_path.exists():
+            with index_path.open("rb") as index_file:
+                data = index_file.read()
+            if data and not data.endswith(b"\n"):
+                with index_path.open("ab") as index_file:
+                    index_file.write(b"\n")
+            for line in data.decode("utf-8").splitlines():
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if entry.get("removed"):
+                    self._index.pop(entry["id"], None)
+                    self._untrack(entry["id"])
+                    continue
+                self._index[entry["id"]] = (entry["shard"], entry["offset"])
+                self._indexed_end[entry["shard"]] = max(
+                    self._indexed_end.get(entry["shard"], -1), entry["offset"]
+                )
+                if "file" in entry:
+                    self._track(entry["id"], entry["file"])
+                else:
+                    self._files_complete = False
+        return open_shard
+
+    def _reindex_open_shard(self) -> None:
+        """Count the open shard's records and index any written just before a crash."""
+
+        last_indexed = self._indexed_end.get(self._open_shard, -1)
+        missing = []
+        offset = 0
+        with self._shard_path(self._open_shard).open("rb") as shard_file:
+            for line in shard_file:
+                if offset > last_indexed:
+                    record = json.loads(line)
+                    missing.append(
+                        (record_id(record), self._open_shard, offset, record.get("source_file"))
+                    )
+                offset += len(line)
+                self._open_records += 1
+        if missing:
+            print(f"Re-indexing {len(missing)} records of {self._shard_path(self._open_shard)}")
+            self._write_index(missing)
+
+    def _write_index(self, entries: List[Tuple[str, int, int, Optional[str]]]) -> None:
+        self._index_file.write(
+            "".join(
+                json.dumps({"id": rid, "shard": shard, "offset": offset, "file": source_file}) + "\n"
+                for rid, shard, offset, source_file in entries
+            )
+        )
+        self._sync_index()
+        for rid, shard, offset, source_file in entries:
+            self._index[rid] = (shard, offset)
+            self._track(rid, source_file)
+
+    def _sync_index(self) -> None:
+        self._index_file.flush()
+        if self.fsync:
+            os.fsync(self._index_file.fileno())
+
+    def _track(self, rid: str, source_file: Optional[str]) -> None:
+        self._untrack(rid)
+        self._file_of[rid] = source_file
+        self._files.setdefault(source_file, set()).add(rid)
+
+    def _untrack(self, rid: str) -> None:
+        if rid in self._file_of:
+            self._files[self._file_of.pop(rid)].discard(rid)
+
+    def append(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Append ``records`` and return how many were written."""
+
+        written = 0
+        with self._lock:
+            pending: List[Tuple[str, int, int, Optional[str]]] = []
+            for record in records:
+                if self._open_records >= self.shard_max_records:
+                    self._flush(pending)
+                    pending = []
+                    self._seal()
+                line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+                pending.append(
+                    (record_id(record), self._open_shard, self._shard_file.tell(), record.get("source_file"))
+                )
+                self._shard_file.write(line)
+                self._open_records += 1
+                written += 1
+            if pending:
+                self._flush(pending)
+            self.stats.appended += written
+        return written
+
+    def _flush(self, pending: List[Tuple[str, int, int, Optional[str]]]) -> None:
+        # Records reach disk before their index entries, so the index never points past the data.
+        self._shard_file.flush()
+        if self.fsync:
+            os.fsync(self._shard_file.fileno())
+        if pending:
+            self._write_index(pending)
+
+    def _seal(self) -> None:
+        self._shard_file.close()
+        shard_path = self._shard_path(self._open_shard)
+        if self.compression == "zstd":
+            sealed_path = self._shard_path(self._open_shard, sealed=True)
+            fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as tmp_file, shard_path.open("rb") as shard_file:
+                    _zstd().ZstdCompressor().copy_stream(shard_file, tmp_file)
+                    tmp_file.flush()
+                    os.fsync(tmp_file.fileno())
+                os.replace(tmp_name, sealed_path)
+            except BaseException:
+                Path(tmp_name).unlink(missing_ok=True)
+                raise
+            _fsync_directory(self.directory)
+            shard_path.unlink()
+        self.stats.sealed_shards += 1
+        self._open_shard += 1
+        self._open_records = 0
+        self._shard_file = self._shard_path(self._open_shard).open("ab")
+
+    def _open_for_reading(self, path: Path, offset: int = 0) -> io.BufferedIOBase:
+        if path.suffix != ".zst":
+            shard_file = path.open("rb")
+            shard_file.seek(offset)
+            return shard_file
+        reader = _zstd().ZstdDecompressor().stream_reader(path.open("rb"), closefd=True)
+        # Decompression streams only seek forward, by decompressing up to the offset.
+        reader.seek(offset)
+        return io.BufferedReader(reader)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Stream the newest copy of every record in append order, one shard at a time."""
+
+        with self._lock:
+            self._shard_file.flush()
+        for path in self.shards():
+            shard = int(_SHARD.match(path.name).group(1))
+            offset = 0
+            with self._open_for_reading(path) as shard_file:
+                for line in shard_file:
+                    record = json.loads(line)
+                    if self._index.get(record_id(record)) == (shard, offset):
+                        yield record
+                    offset += len(line)
+
+    def get(self, rid: str) -> Optional[Dict[str, Any]]:
+        """Return the most recent record with id ``rid``, or ``None``."""
+
+        with self._lock:
+            location = self._index.get(rid)
+            self._shard_file.flush()
+        if location is None:
+            return None
+        shard, offset = location
+        path = self._shard_path(shard)
+        if not path.exists():
+            path = self._shard_path(shard, sealed=True)
+        with self._open_for_reading(path, offset) as shard_file:
+            return json.loads(shard_file.readline())
+
+    def get_many(
+        self, rids: Iterable[str], sources: Optional[Iterable[str]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Return the stored records among ``rids``, keyed by id.
+
+        ``sources`` is accepted for parity with the columnar store; the index
+        already locates every id. Ids are grouped by shard and each shard is read once, front to back,
+        so a compressed shard is decompressed once per call rather than once
+        per id.
+        """
+
+        by_shard: Dict[int, List[Tuple[int, str]]] = {}
+        with self._lock:
+            for rid in set(rids):
+                location = self._index.get(rid)
+                if location is not None:
+                    by_shard.setdefault(location[0], []).append((location[1], rid))
+            self._shard_file.flush()
+        found: Dict[str, Dict[str, Any]] = {}
+        for shard, wanted in by_shard.items():
+            path = self._shard_path(shard)
+            if not path.exists():
+                path = self._shard_path(shard, sealed=True)
+            wanted.sort()
+            with self._open_for_reading(path) as shard_file:
+                position = 0
+                for offset, rid in wanted:
+                    # Offsets only grow, so the stream is skipped forward, never rewound.
+                    shard_file.read(offset - position)
+                    line = shard_file.readline()
+                    position = offset + len(line)
+                    found[rid] = json.loads(line)
+        return found
+
+    def remove(self, rids: Iterable[str], sources: Optional[Iterable[str]] = None) -> int:
+        """Drop ``rids`` by appending tombstones to the index; return how many were stored.
+
+        Shards are append-only, so the removed lines stay on disk and readers skip them.
+        """
+
+        with self._lock:
+            removed = sorted(rid for rid in set(rids) if rid in self._index)
+            if removed:
+                self._index_file.write(
+                    "".join(json.dumps({"id": rid, "removed": True}) + "\n" for rid in removed)
+                )
+                self._sync_index()
+                for rid in removed:
+                    del self._index[rid]
+                    self._untrack(rid)
+        return len(removed)
+
+    def file_ids(self, source_file: str, sources: Optional[Iterable[str]] = None) -> Set[str]:
+        """Ids of the records stored for ``source_file``, answered from the index."""
+
+        if not self._files_complete:
+            for record in self:
+                rid = record_id(record)
+                if rid not in self._file_of:
+                    self._track(rid, record.get("source_file"))
+            self._files_complete = True
+        with self._lock:
+            return set(self._files.get(source_file, ()))
+
+    def __contains__(self, rid: str) -> bool:
+        return rid in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def clear(self) -> None:
+        """Delete every shard and the index."""
+
+        with self._lock:
+            self._shard_file.close()
+            self._index_file.close()
+            for path in self.shards():
+                path.unlink()
+            (self.directory / INDEX_NAME).unlink(missing_ok=True)
+            self._index.clear()
+            self._file_of.clear()
+            self._files.clear()
+            self._indexed_end.clear()
+            self._files_complete = True
+            self._open_shard, self._open_records = 0, 0
+            self._index_file = (self.directory / INDEX_NAME).open("a", encoding="utf-8")
+            self._shard_file = self._shard_path(0).open("ab")
+
+    def close(self) -> None:
+        with self._lock:
+            self._shard_file.close()
+            self._index_file.close()
+
+
+def migrate_json_file(json_path: str | Path, store: Any) -> int:
+    """Copy records from a legacy ``enriched_chunks.json`` into ``store``.
+
+    ``store`` is a ``ShardedChunkStore`` or ``ColumnarChunkStore``. Records
+    already in the store are skipped, so an interrupted migration can be
+    rerun. The JSON file is renamed to ``*.migrated`` afterwards. Returns
+    the number of records copied.
+    """
+
+    json_path = Path(json_path)
+    with json_path.open("r", encoding="utf-8") as legacy_file:
+        records = json.load(legacy_file)
+    # The sharded store answers from its index; other stores are scanned once.
+    known = store if isinstance(store, ShardedChunkStore) else {record_id(r) for r in store}
+    migrated = store.append(record for record in records if record_id(record) not in known)
+    store.stats.migrated += migrated
+    os.replace(json_path, json_path.with_name(json_path.name + ".migrated"))
+    print(f"Migrated {migrated} of {len(records)} records from {json_path} to {store.directory}")
+    return migrated
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage the sharded enriched chunk store.")
+    parser.add_argument("command", choices=["migrate", "stats"])
+    parser.add_argument("--path", required=True, help="Chunk store directory")
+    parser.add_argument("--json", help="With migrate, the legacy enriched_chunks.json")
+    parser.add_argument("--compression", choices=["zstd"], default=None)
+    args = parser.parse_args()
+
+    store = ShardedChunkStore(args.path, compression=args.compression)
+    if args.command == "migrate":
+        if not args.json:
+            parser.error("migrate needs --json")
+        migrate_json_file(args.json, store)
+    else:
+        print(f"{len(store)} records in {len(store.shards())} shards under {store.directory}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""Decide per chunk whether LLM enrichment is worth a call, and enrich cheap chunks locally."""
+
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from agent.chunk_generation.table_splitter import chunk_content
+
+FULL = "full"
+CHEAP = "cheap"
+SKIP = "skip"
+
+# Same placeholder as SKIP_ENRICHMENT, so the embedder embeds content only.
+SKIPPED_METADATA: Dict[str, Any] = {
+    "summary": "No summary available (enrichment skipped)",
+    "keywords": [],
+    "hypothetical_questions": [],
+    "table_summary": None,
+}
+
+_WORD = re.compile(r"[a-z][a-z'-]{2,}")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+_CHECKBOX = re.compile(r"[☐☒☑■□✓✔]")
+_CHECK_MARK_PROMPT = re.compile(r"indicate by check mark", re.IGNORECASE)
+_SIGNATURE = re.compile(
+    r"(^|\s)/s/\s*\w|pursuant to the requirements of the securities exchange act.{0,200}duly caused",
+    re.IGNORECASE | re.DOTALL,
+)
+_EXHIBIT_NUMBER = re.compile(r"(^|\s)\d{1,3}\.\d{1,3}(\.\d+)?\*{0,2}\s+\w", re.MULTILINE)
+_EXHIBIT_PHRASE = re.compile(r"filed herewith|furnished herewith|incorporated (herein )?by reference", re.IGNORECASE)
+_STOPWORDS = frozenset(
+    """the and for that this with from have has were was are which their there about would
+    these other into than then them such also been more most over under only some each our
+    its any all may not per can will shall could should upon who whom what when where
+    while during including includes included within without between through company""".split()
+)
+
+
+@dataclass(frozen=True)
+class TriageThresholds:
+    """Cut-offs for the rule-based triage; all measured on the chunk's text.
+
+    Text shorter than ``skip_below_chars`` or with less than
+    ``min_alpha_ratio`` letters is skipped; text shorter than
+    ``cheap_below_chars`` only gets local keywords. Tables are enriched fully
+    unless they are shorter than ``skip_below_chars``.
+    """
+
+    skip_below_chars: int = 80
+    cheap_below_chars: int = 300
+    min_alpha_ratio: float = 0.5
+    min_checkboxes: int = 2
+    min_exhibit_lines: int = 3
+
+
+@dataclass
+class TriageStats:
+    """How many chunks took each path, and why."""
+
+    decisions: Counter = field(default_factory=Counter)
+    reasons: Counter = field(default_factory=Counter)
+
+    @property
+    def llm_calls_avoided(self) -> int:
+        return self.decisions[CHEAP] + self.decisions[SKIP]
+
+    def report(self) -> str:
+        total = sum(self.decisions.values())
+        reasons = ", ".join(f"{reason}: {count}" for reason, count in self.reasons.most_common())
+        return (
+            f"Chunk triage: {self.decisions[FULL]} full, {self.decisions[CHEAP]} cheap, "
+            f"{self.decisions[SKIP]} skipped of {total} chunks "
+            f"({self.llm_calls_avoided} LLM calls avoided; {reasons or 'no rules fired'})."
+        )
+
+
+class ChunkTriage:
+    """Score chunks with cheap rules and route them to full, cheap or no enrichment.
+
+    Signature blocks and cover-page checkboxes are skipped; exhibit indexes
+    get local keywords only. Statistics accumulate across calls.
+    """
+
+    def __init__(self, thresholds: TriageThresholds = TriageThresholds()) -> None:
+        self.thresholds = thresholds
+        self.stats = TriageStats()
+
+    def classify(self, text: str, is_table: bool) -> Tuple[str, str]:
+        """Return ``(decision, reason)`` for one chunk's text."""
+
+        limits = self.thresholds
+        stripped = " ".join(text.split())
+        if len(stripped) < limits.skip_below_chars:
+            return SKIP, "fragment"
+        if is_table:
+            return FULL, "table"
+        if _SIGNATURE.search(stripped):
+            return SKIP, "signature"
+        if (
+            len(_CHECKBOX.findall(stripped)) >= limits.min_checkboxes
+            or _CHECK_MARK_PROMPT.search(stripped)
+        ):
+            return SKIP, "checkboxes"
+        letters = sum(char.isalpha() for char in stripped)
+        if letters / len(stripped) < limits.min_alpha_ratio:
+            return SKIP, "mostly numbers"
+        if (
+            len(_EXHIBIT_NUMBER.findall(text)) >= limits.min_exhibit_lines
+            and _EXHIBIT_PHRASE.search(stripped)
+        ):
+            return CHEAP, "exhibit index"
+        if len(stripped) < limits.cheap_below_chars:
+            return CHEAP, "short"
+        return FULL, "prose"
+
+
+def _terms(text: str) -> List[str]:
+    return [word for word in _WORD.findall(text.lower()) if word not in _STOPWORDS]
+
+
+def tfidf_keywords(texts: Sequence[str], top_k: int = 5) -> List[List[str]]:
+    """Top ``top_k`` TF-IDF terms of each text, with document frequencies over ``texts``."""
+
+    term_lists = [_terms(text) for text in texts]
+    document_frequency = Counter(term for terms in term_lists for term in set(terms))
+    smoothed = len(term_lists) + 1
+    keywords = []
+    for terms in term_lists:
+        counts = Counter(terms)
+        scores = {
+            term: (count / len(terms)) * (math.log(smoothed / (1 + document_frequency[term])) + 1)
+            for term, count in counts.items()
+        }
+        # Ties keep first-appearance order, so results are deterministic.
+        keywords.append(sorted(scores, key=lambda term: -scores[term])[:top_k])
+    return keywords
+
+
+def cheap_metadata(text: str, keywords: List[str]) -> Dict[str, Any]:
+    """Metadata built without the LLM: the first sentence as summary plus local keywords."""
+
+    summary = _SENTENCE_END.split(" ".join(text.split()), maxsplit=1)[0][:300]
+    return {
+        "summary": summary,
+        "keywords": keywords,
+        "hypothetical_questions": [],
+        "table_summary": None,
+    }
+
+
+def enrich_with_triage(
+    chunks: Sequence[Any],
+    enrich_fn: Callable[[Sequence[Any]], List[Dict[str, Any]]],
+    triage: ChunkTriage,
+) -> List[Dict[str, Any]]:
+    """Send only chunks triaged as full to ``enrich_fn``; results keep input order.
+
+    Cheap chunks get ``cheap_metadata`` with TF-IDF keywords computed over
+    this batch of chunks, skipped chunks get ``SKIPPED_METADATA``. Every
+    result records its path in ``enrichment``.
+    """
+
+    decisions = []
+    for chunk in chunks:
+        _, is_table = chunk_content(chunk)
+        decision, reason = triage.classify(chunk.text, is_table)
+        triage.stats.decisions[decision] += 1
+        triage.stats.reasons[reason] += 1
+        decisions.append(decision)
+
+    full = [position for position, decision in enumerate(decisions) if decision == FULL]
+    enriched = dict(zip(full, enrich_fn([chunks[position] for position in full]) if full else []))
+    keywords = tfidf_keywords([chunk.text for chunk in chunks])
+
+    results: List[Dict[str, Any]] = []
+    for position, (chunk, decision) in enumerate(zip(chunks, decisions)):
+        if decision == FULL:
+            metadata = enriched[position]
+        elif decision == CHEAP:
+            metadata = cheap_metadata(chunk.text, keywords[position])
+        else:
+            metadata = dict(SKIPPED_METADATA)
+        results.append({**metadata, "enrichment": decision} if metadata else {})
+
+    print(
+        f"Triage sent {len(full)} of {len(chunks)} chunks to the LLM; "
+        f"{len(chunks) - len(full)} enriched locally or skipped."
+    )
+    return results
@@ -0,0 +1,285 @@
+"""Columnar store for enriched chunks: Parquet or Arrow IPC files partitioned by source."""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set
+
+FORMATS = {"parquet": "parquet", "arrow": "arrow"}
+COLUMNS = (
+    "chunk_id",
+    "source",
+    "source_file",
+    "accession_number",
+    "form_type",
+    "filing_date",
+    "content",
+    "is_table",
+    "summary",
+    "keywords",
+    "hypothetical_questions",
+    "table_summary",
+    "extra",
+)
+
+
+def _pyarrow():
+    # pyarrow is optional; only the columnar store needs it.
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.dataset
+        import pyarrow.fs
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise ImportError(
+            "The columnar chunk store needs the 'pyarrow' package: pip install pyarrow"
+        ) from exc
+    return pyarrow
+
+
+def _schema(pa):
+    return pa.schema([
+        ("chunk_id", pa.string()),
+        ("source", pa.string()),
+        ("source_file", pa.string()),
+        ("accession_number", pa.string()),
+        ("form_type", pa.string()),
+        ("filing_date", pa.string()),
+        ("content", pa.string()),
+        ("is_table", pa.bool_()),
+        ("summary", pa.string()),
+        ("keywords", pa.list_(pa.string())),
+        ("hypothetical_questions", pa.list_(pa.string())),
+        ("table_summary", pa.string()),
+        # Any other record fields, as a JSON object.
+        ("extra", pa.string()),
+    ])
+
+
+def _row(record: Dict[str, Any]) -> Dict[str, Any]:
+    row = {column: record.get(column) for column in COLUMNS if column != "extra"}
+    extra = {key: value for key, value in record.items() if key not in COLUMNS}
+    row["extra"] = json.dumps(extra, ensure_ascii=False) if extra else None
+    return row
+
+
+def _record(row: Dict[str, Any]) -> Dict[str, Any]:
+    extra = row.pop("extra", None)
+    return {**row, **json.loads(extra)} if extra else row
+
+
+@dataclass
+class ColumnarStoreStats:
+    """Rows and files written, and records migrated, in one process."""
+
+    rows: int = 0
+    files: int = 0
+    migrated: int = 0
+
+    def report(self) -> str:
+        return (
+            f"Columnar chunk store: {self.rows} rows written in {self.files} files, "
+            f"{self.migrated} migrated."
+        )
+
+
+class ColumnarChunkStore:
+    """Enriched chunk records as a hive-partitioned dataset under ``directory``.
+
+    Every ``append`` writes one file per source (``source=<name>/``), in
+    Parquet or, with ``format="arrow"``, uncompressed Arrow IPC. Files are
+    written to a hidden staging directory and renamed into place, so readers
+    never see a partial file. Reads select columns and sources and go
+    through memory-mapped files; Arrow IPC columns are used without copying,
+    Parquet columns are decoded but only the requested ones.
+    """
+
+    def __init__(self, directory: str | Path, *, format: str = "parquet") -> None:
+        if format not in FORMATS:
+            raise ValueError(f"Unknown columnar format '{format}'; choose one of {', '.join(FORMATS)}.")
+        self.pa = _pyarrow()
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.format = format
+        self.schema = _schema(self.pa)
+        self.stats = ColumnarStoreStats()
+        self._partitioning = self.pa.dataset.partitioning(
+            self.pa.schema([("source", self.pa.string())]), flavor="hive"
+        )
+        self._filesystem = self.pa.fs.LocalFileSystem(use_mmap=True)
+
+    def append(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Write ``records`` as new files and return how many rows were written."""
+
+        rows = [_row(record) for record in records]
+        if not rows:
+            return 0
+        table = self.pa.Table.from_pylist(rows, schema=self.schema)
+        staging = self.directory / f".staging-{uuid.uuid4().hex}"
+        extension = FORMATS[self.format]
+        try:
+            self.pa.dataset.write_dataset(
+                table,
+                staging,
+                format="ipc" if self.format == "arrow" else "parquet",
+                partitioning=self._partitioning,
+                # Time-ordered names keep append order when the dataset lists files.
+                basename_template=f"part-{time.time_ns():020d}-{uuid.uuid4().hex[:8]}-{{i}}.{extension}",
+            )
+            for written in sorted(staging.rglob(f"*.{extension}")):
+                target = self.directory / written.relative_to(staging)
+                target.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(written, target)
+                self.stats.files += 1
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        self.stats.rows += len(rows)
+        return len(rows)
+
+    def dataset(self):
+        """The store as a ``pyarrow.dataset.Dataset``; staging directories are ignored."""
+
+        return self.pa.dataset.dataset(
+            self.directory,
+            schema=self.schema,
+            format="ipc" if self.format == "arrow" else "parquet",
+            partitioning=self._partitioning,
+            filesystem=self._filesystem,
+        )
+
+    def _filter(self, sources: Optional[Sequence[str]]):
+        if sources is None:
+            return None
+        return self.pa.dataset.field("source").isin(self.pa.array(list(sources), self.pa.string()))
+
+    def read(
+        self, columns: Optional[Sequence[str]] = None, sources: Optional[Sequence[str]] = None
+    ):
+        """Return the selected ``columns`` (default all) of ``sources`` (default all) as a Table."""
+
+        return self.dataset().to_table(
+            columns=list(columns) if columns else None, filter=self._filter(sources)
+        )
+
+    def iter_batches(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        sources: Optional[Sequence[str]] = None,
+        batch_size: int = 1024,
+    ) -> Iterator[Any]:
+        """Stream ``pyarrow.RecordBatch`` objects of at most ``batch_size`` rows."""
+
+        return self.dataset().to_batches(
+            columns=list(columns) if columns else None,
+            filter=self._filter(sources),
+            batch_size=batch_size,
+        )
+
+    def iter_records(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        sources: Optional[Sequence[str]] = None,
+        batch_size: int = 1024,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """Stream lists of record dicts, one batch at a time; ``extra`` is expanded."""
+
+        for batch in self.iter_batches(columns, sources, batch_size):
+            yield [_record(row) for row in batch.to_pylist()]
+
+    def get_many(
+        self, chunk_ids: Iterable[str], sources: Optional[Iterable[str]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Return the stored records among ``chunk_ids``, keyed by chunk id.
+
+        With ``sources``, only those ``source=`` partitions are read instead
+        of the whole dataset.
+        """
+
+        chunk_ids = list(chunk_ids)
+        if not chunk_ids:
+            return {}
+        condition = self.pa.dataset.field("chunk_id").isin(chunk_ids)
+        if sources is not None:
+            condition = condition & self._filter(sorted(set(sources)))
+        found = self.dataset().to_table(filter=condition).to_pylist()
+        return {row["chunk_id"]: _record(row) for row in found}
+
+    def file_ids(self, source_file: str, sources: Optional[Iterable[str]] = None) -> Set[str]:
+        """Chunk ids of the rows stored for ``source_file``, read from ``sources`` if given."""
+
+        condition = self.pa.dataset.field("source_file") == source_file
+        if sources is not None:
+            condition = condition & self._filter(sorted(set(sources)))
+        table = self.dataset().to_table(columns=["chunk_id"], filter=condition)
+        return set(table.column("chunk_id").to_pylist())
+
+    def remove(self, chunk_ids: Iterable[str], sources: Optional[Iterable[str]] = None) -> int:
+        """Rewrite the files holding ``chunk_ids`` without them; return rows removed.
+
+        Only the ``source=`` partitions of ``sources`` are scanned; when they
+        are not given they are looked up by chunk id. Files in those
+        partitions without a matching row are left untouched.
+        """
+
+        chunk_ids = list(chunk_ids)
+        if not chunk_ids:
+            return 0
+        pa, removed = self.pa, 0
+        condition = pa.dataset.field("chunk_id").isin(chunk_ids)
+        if sources is None:
+            sources = self.dataset().to_table(columns=["source"], filter=condition).column("source").to_pylist()
+        sources = sorted(set(sources))
+        if not sources:
+            return 0
+        value_set = pa.array(chunk_ids, pa.string())
+        for fragment in self.dataset().get_fragments(filter=self._filter(sources)):
+            if not fragment.count_rows(filter=condition):
+                continue
+            path = Path(fragment.path)
+            if self.format == "arrow":
+                with pa.OSFile(str(path)) as source:
+                    table = pa.ipc.open_file(source).read_all()
+            else:
+                table = pa.parquet.read_table(path)
+            keep = pa.compute.invert(pa.compute.is_in(table.column("chunk_id"), value_set=value_set))
+            kept = table.filter(keep)
+            removed += table.num_rows - kept.num_rows
+            if not kept.num_rows:
+                path.unlink()
+                continue
+            tmp_path = path.with_name(f".{path.name}.tmp")
+            if self.format == "arrow":
+                with pa.ipc.new_file(str(tmp_path), kept.schema) as writer:
+                    writer.write_table(kept)
+            else:
+                pa.parquet.write_table(kept, tmp_path)
+            os.replace(tmp_path, path)
+        return removed
+
+    def sources(self) -> List[str]:
+        return sorted(set(self.read(columns=["source"]).column("source").to_pylist()))
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for records in self.iter_records():
+            yield from records
+
+    def __len__(self) -> int:
+        return self.dataset().count_rows()
+
+    def clear(self) -> None:
+        """Delete every partition."""
+
+        for path in self.directory.iterdir():
+            if path.is_dir():
+                shutil.rmtree(path)
+
+    def close(self) -> None:
+        """Nothing is held open between calls; kept for parity with the JSONL store."""
@@ -0,0 +1,169 @@
+"""SQLite-backed cache of LLM enrichment results keyed by content, prompt and model."""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from llm.backends import get_backend
+from llm.qwen_ollama_chunking import PROMPT_VERSION
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS enrichments (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    prompt_version TEXT NOT NULL,
+    metadata TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used_at REAL NOT NULL
+)
+"""
+
+
+def enrichment_key(
+    content: str, is_table: bool, expert: str, prompt_version: str, model: str
+) -> str:
+    """Hash everything that determines an enrichment result."""
+
+    payload = json.dumps([content, is_table, expert, prompt_version, model], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class EnrichmentCacheStats:
+    """Hit/miss counters for one process."""
+
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def report(self) -> str:
+        return (
+            f"Enrichment cache: {self.hits} hits, {self.misses} misses "
+            f"(hit rate {self.hit_rate:.1%})."
+        )
+
+
+class EnrichmentCache:
+    """Persist enrichment metadata in SQLite so unchanged chunks skip the LLM.
+
+    Keys hash the truncated chunk content together with ``is_table``, the
+    expert role, the prompt template version and the model name, so changing
+    any of them is a miss. The database runs in WAL mode and is safe to share
+    between threads of one process and between processes.
+    """
+
+    def __init__(
+        self,
+        db_path: str | Path,
+        *,
+        model: Optional[str] = None,
+        prompt_version: str = PROMPT_VERSION,
+    ) -> None:
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.model = model or get_backend().model
+        self.prompt_version = prompt_version
+        self.stats = EnrichmentCacheStats()
+
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            self.db_path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(_SCHEMA)
+
+    def key(self, content: str, is_table: bool, expert: str) -> str:
+        return enrichment_key(content, is_table, expert, self.prompt_version, self.model)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return cached metadata for ``key`` or ``None``, counting the lookup."""
+
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT metadata FROM enrichments WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.stats.misses += 1
+                return None
+            self._connection.execute(
+                "UPDATE enrichments SET last_used_at = ? WHERE key = ?", (time.time(), key)
+            )
+            self.stats.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, metadata: Dict[str, Any]) -> None:
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO enrichments VALUES (?, ?, ?, ?, ?, ?)",
+                (key, self.model, self.prompt_version, json.dumps(metadata), now, now),
+            )
+
+    def prune(self, max_age_days: Optional[float] = None) -> int:
+        """Delete entries for other models or prompt versions, and optionally old ones.
+
+        ``max_age_days`` removes entries not used within that many days.
+        Returns the number of entries removed.
+        """
+
+        query = "DELETE FROM enrichments WHERE model != ? OR prompt_version != ?"
+        params: list = [self.model, self.prompt_version]
+        if max_age_days is not None:
+            query += " OR last_used_at < ?"
+            params.append(time.time() - max_age_days * 86400)
+        with self._lock:
+            removed = self._connection.execute(query, params).rowcount
+            self._connection.execute("VACUUM")
+        return removed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM enrichments")
+            self._connection.execute("VACUUM")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM enrichments").fetchone()[0]
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage the SQLite enrichment cache.")
+    parser.add_argument("command", choices=["clear", "prune", "stats"])
+    parser.add_argument("--path", required=True, help="Enrichment cache database")
+    parser.add_argument(
+        "--max-age-days",
+        type=float,
+        default=None,
+        help="With prune, also drop entries unused for this many days",
+    )
+    args = parser.parse_args()
+
+    cache = EnrichmentCache(args.path)
+    if args.command == "clear":
+        cache.clear()
+        print(f"Cleared enrichment cache at {cache.db_path}")
+    elif args.command == "prune":
+        print(f"Pruned {cache.prune(args.max_age_days)} entries from {cache.db_path}")
+    else:
+        print(f"{len(cache)} entries in {cache.db_path}")
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Append-only JSONL journal of enrichment results so interrupted runs can resume."""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from agent.chunk_enrichment.enrichment_cache import enrichment_key
+from llm.backends import get_backend
+from llm.qwen_ollama_chunking import PROMPT_VERSION
+
+
+@dataclass
+class EnrichmentJournalStats:
+    """Replayed and newly recorded journal entries for one run."""
+
+    replayed: int = 0
+    replayed_failures: int = 0
+    recorded: int = 0
+    failures: int = 0
+
+    def report(self) -> str:
+        return (
+            f"Enrichment journal: {self.replayed} results replayed "
+            f"({self.replayed_failures} earlier failures retried), "
+            f"{self.recorded} recorded, {self.failures} failed."
+        )
+
+
+class EnrichmentJournal:
+    """Record every enrichment result and failure the moment it finishes.
+
+    Each entry is one JSON line, flushed and fsynced before ``record`` or
+    ``record_failure`` returns, so a crash loses at most the line being
+    written. With ``resume`` the existing journal is replayed: ``get`` answers
+    chunks that succeeded before, while chunks that failed or never finished
+    return ``None`` and go back to the LLM. Without ``resume`` the journal
+    starts empty; a non-empty journal is first renamed to
+    ``<name>.<timestamp>`` so it can still be resumed from. Keys are the same
+    as ``EnrichmentCache`` keys.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        resume: bool = False,
+        model: Optional[str] = None,
+        prompt_version: str = PROMPT_VERSION,
+        fsync: bool = True,
+    ) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.model = model or get_backend().model
+        self.prompt_version = prompt_version
+        self.fsync = fsync
+        self.stats = EnrichmentJournalStats()
+
+        self._completed: Dict[str, Dict[str, Any]] = {}
+        if resume and self.path.exists():
+            self._replay()
+        elif not resume and self.path.exists() and self.path.stat().st_size:
+            self._rotate()
+        self._lock = threading.Lock()
+        self._file = self.path.open("a" if resume else "w", encoding="utf-8")
+
+    def _rotate(self) -> None:
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        rotated = self.path.with_name(f"{self.path.name}.{stamp}")
+        suffix = 1
+        while rotated.exists():
+            suffix += 1
+            rotated = self.path.with_name(f"{self.path.name}.{stamp}-{suffix}")
+        os.replace(self.path, rotated)
+        print(f"Moved the previous enrichment journal to {rotated}; resume from it with RESUME_ENRICHMENT=true.")
+
+    def _replay(self) -> None:
+        with self.path.open("rb") as journal_file:
+            journal_file.seek(0, os.SEEK_END)
+            if journal_file.tell():
+                journal_file.seek(-1, os.SEEK_END)
+                if journal_file.read(1) != b"\n":
+                    # Terminate a torn last line so new entries start on their own line.
+                    with self.path.open("a", encoding="utf-8") as torn_file:
+                        torn_file.write("\n")
+
+        failed = set()
+        with self.path.open("r", encoding="utf-8") as journal_file:
+            for line_number, line in enumerate(journal_file, start=1):
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Usually the last line, cut short by the crash being resumed from.
+                    print(f"Skipping unreadable line {line_number} of {self.path}")
+                    continue
+                if entry["status"] == "ok":
+                    self._completed[entry["key"]] = entry["metadata"]
+                    failed.discard(entry["key"])
+                else:
+                    failed.add(entry["key"])
+        self.stats.replayed = len(self._completed)
+        self.stats.replayed_failures = len(failed - self._completed.keys())
+
+    def key(self, content: str, is_table: bool, expert: str) -> str:
+        return enrichment_key(content, is_table, expert, self.prompt_version, self.model)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the metadata of an earlier successful enrichment, if any."""
+
+        return self._completed.get(key)
+
+    def record(self, key: str, metadata: Dict[str, Any], attempts: int = 1) -> None:
+        self._append({"key": key, "status": "ok", "attempts": attempts, "metadata": metadata})
+
+    def record_failure(self, key: str, error: Exception, attempts: int = 1) -> None:
+        self._append({"key": key, "status": "failed", "attempts": attempts, "error": repr(error)})
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        line = json.dumps({**entry, "time": time.time()}, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            if entry["status"] == "ok":
+                self._completed[entry["key"]] = entry["metadata"]
+                self.stats.recorded += 1
+            else:
+                self.stats.failures += 1
+
+    def close(self) -> None:
+        self._file.close()
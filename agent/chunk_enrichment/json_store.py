@@ -0,0 +1,132 @@
+"""Enriched chunk records in a single JSON file, indexed in memory."""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Set
+
+from agent.chunk_enrichment.chunk_store import record_id
+
+
+@dataclass
+class JsonStoreStats:
+    """Records appended and removed, and times the file was written, in one process."""
+
+    appended: int = 0
+    removed: int = 0
+    writes: int = 0
+
+    def report(self) -> str:
+        return (
+            f"JSON chunk store: {self.appended} records appended, {self.removed} removed, "
+            f"file written {self.writes} times."
+        )
+
+
+class JsonChunkStore:
+    """The ``enriched_chunks.json`` file, loaded once and written back on ``flush``.
+
+    Records are held in a dict keyed by record id, in file order, so lookups
+    and upserts touch no disk and a replaced record keeps its position; a
+    second index maps each ``source_file`` to its record ids.
+    ``flush`` (and ``close``) rewrites the file through a temporary file and
+    an atomic rename, and only when something changed, so a run writes the
+    file once instead of once per document or batch.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.stats = JsonStoreStats()
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._files: Dict[str, Set[str]] = {}
+        if self.path.exists():
+            with self.path.open("r", encoding="utf-8") as existing_file:
+                self._insert(json.load(existing_file))
+        self._dirty = not self.path.exists()
+
+    def get_many(
+        self, rids: Iterable[str], sources: Optional[Iterable[str]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Return the stored records among ``rids``, keyed by id; ``sources`` is not needed."""
+
+        return {rid: self._records[rid] for rid in rids if rid in self._records}
+
+    def append(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Insert ``records``, replacing any stored under the same id; return how many."""
+
+        written = self._insert(records)
+        if written:
+            self._dirty = True
+            self.stats.appended += written
+        return written
+
+    def remove(self, rids: Iterable[str], sources: Optional[Iterable[str]] = None) -> int:
+        """Drop the records with ids in ``rids``; return how many were stored."""
+
+        removed = 0
+        for rid in set(rids):
+            record = self._records.pop(rid, None)
+            if record is not None:
+                self._files.get(record.get("source_file"), set()).discard(rid)
+                removed += 1
+        if removed:
+            self._dirty = True
+            self.stats.removed += removed
+        return removed
+
+    def file_ids(self, source_file: str, sources: Optional[Iterable[str]] = None) -> Set[str]:
+        """Ids of the records stored for ``source_file``."""
+
+        return set(self._files.get(source_file, ()))
+
+    def _insert(self, records: Iterable[Dict[str, Any]]) -> int:
+        inserted = 0
+        for record in records:
+            rid = record_id(record)
+            previous = self._records.get(rid)
+            if previous is not None:
+                self._files.get(previous.get("source_file"), set()).discard(rid)
+            self._records[rid] = record
+            self._files.setdefault(record.get("source_file"), set()).add(rid)
+            inserted += 1
+        return inserted
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(list(self._records.values()))
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, rid: str) -> bool:
+        return rid in self._records
+
+    def clear(self) -> None:
+        """Drop every record; the file is emptied on the next ``flush``."""
+
+        self._records.clear()
+        self._files.clear()
+        self._dirty = True
+
+    def flush(self) -> None:
+        """Write the records back if they changed since the last write."""
+
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as outfile:
+                json.dump(list(self._records.values()), outfile, indent=2)
+            os.replace(tmp_name, self.path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        self._dirty = False
+        self.stats.writes += 1
+
+    def close(self) -> None:
+        self.flush()
@@ -1,36 +1,136 @@
-from typing import Any, Dict, List, Optional
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pydantic import BaseModel, Field
-from llm.qwen_ollama_chunking import chunk_enricher, generate_enriched_chunk
+from agent.chunk_enrichment.enrichment_cache import EnrichmentCache
+from agent.chunk_enrichment.enrichment_journal import EnrichmentJournal
+from agent.chunk_enrichment.model_routing import ModelRouter
+from agent.chunk_generation.table_splitter import chunk_content
+from llm.backends import generate_enriched_chunk, get_backend
+from llm.qwen_ollama_chunking import chunk_enricher
 
+# Backoff for retried chunks: 1s, 2s, 4s, ... never more than 30s between attempts
+RETRY_DELAY = 1.0
+MAX_RETRY_DELAY = 30.0
 
-def _process_single_chunk(chunk) -> Dict[str, Any]:
-    """Helper to process a single chunk for parallel execution."""
+
+def _prepare_chunk(chunk) -> Tuple[str, bool, str]:
+    """Returns the (truncated content, is_table, expert role) sent to the LLM."""
     # Have to change chunker for different file types
-    is_table = 'text_as_html' in chunk.metadata.to_dict()
-    content = chunk.metadata.text_as_html if is_table else chunk.text
+    content, is_table = chunk_content(chunk)
     expert = "financial analyst"
 
     # Adjust this value to avoid flooding long chunks to LLM
-    truncated_content = content[:3000]
+    return content[:3000], is_table, expert
+
+
+def _retry_delay(attempt: int, retry_delay: float = RETRY_DELAY, max_delay: float = MAX_RETRY_DELAY) -> float:
+    """Exponential backoff after failed ``attempt`` (1-based), capped at ``max_delay``."""
+    return min(retry_delay * 2 ** (attempt - 1), max_delay)
+
 
+def _enrich_single_chunk(
+    chunk,
+    max_attempts: int = 1,
+    retry_delay: float = RETRY_DELAY,
+    router: Optional[ModelRouter] = None,
+    on_attempt: Optional[Callable[[], None]] = None,
+) -> Tuple[Dict[str, Any], int]:
+    """Enriches one chunk, retrying failures with capped exponential backoff.
+
+    With ``router`` the chunk goes to the model its policy picks;
+    ``on_attempt`` is called before every LLM call. Returns the metadata and
+    the number of attempts used; raises the last error once ``max_attempts``
+    attempts have failed.
+    """
+    truncated_content, is_table, expert = _prepare_chunk(chunk)
     prompt = chunk_enricher(truncated_content, is_table, expert)
+    if router is not None:
+        generate = partial(router.generate, content=truncated_content, is_table=is_table)
+    else:
+        generate = generate_enriched_chunk
+
+    for attempt in range(1, max_attempts + 1):
+        if on_attempt is not None:
+            on_attempt()
+        try:
+            return generate(prompt).model_dump(), attempt
+        except Exception as e:
+            if attempt == max_attempts:
+                raise
+            print(f"Error enriching chunk (attempt {attempt} of {max_attempts}), retrying: {e}")
+            time.sleep(_retry_delay(attempt, retry_delay))
+
+
+def _process_single_chunk(
+    chunk,
+    cache: Optional[EnrichmentCache] = None,
+    journal: Optional[EnrichmentJournal] = None,
+    max_attempts: int = 1,
+    router: Optional[ModelRouter] = None,
+    on_attempt: Optional[Callable[[], None]] = None,
+) -> Dict[str, Any]:
+    """Helper to process a single chunk for parallel execution.
+
+    With ``cache``, a chunk enriched before with the same prompt and model is
+    answered from the cache instead of the LLM. With ``journal``, chunks that
+    succeeded in a resumed run are replayed, and every new result or failure
+    is recorded as soon as it finishes. ``router`` picks the model per chunk
+    and ``on_attempt`` is called before every LLM call.
+    """
+    truncated_content, is_table, expert = _prepare_chunk(chunk)
+
+    key = cache.key(truncated_content, is_table, expert) if cache is not None else None
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    journal_key = journal.key(truncated_content, is_table, expert) if journal is not None else None
+    if journal is not None:
+        replayed = journal.get(journal_key)
+        if replayed is not None:
+            return replayed
 
     try:
-        metadata = generate_enriched_chunk(prompt)
-        return metadata.model_dump()
+        metadata, attempts = _enrich_single_chunk(
+            chunk, max_attempts, router=router, on_attempt=on_attempt
+        )
     except Exception as e:
         print(f"Error enriching chunk: {e}")
+        if journal is not None:
+            journal.record_failure(journal_key, e, max_attempts)
         return {}
 
+    if cache is not None:
+        cache.put(key, metadata)
+    if journal is not None:
+        journal.record(journal_key, metadata, attempts)
+    return metadata
 
-def enrich_chunk(chunks) -> List[Dict[str, Any]]:
+
+def enrich_chunk(
+    chunks,
+    cache: Optional[EnrichmentCache] = None,
+    journal: Optional[EnrichmentJournal] = None,
+    max_attempts: int = 1,
+    router: Optional[ModelRouter] = None,
+) -> List[Dict[str, Any]]:
     """Generates chunk metadata using LLM in parallel"""
-    
-    # Adjust max_workers based on your Ollama server's capacity
+
+    # Concurrency comes from the backend's limits (ENRICHMENT_WORKERS for Ollama)
     # Too many workers might cause timeouts or OOM errors on the server
-    with ThreadPoolExecutor(max_workers=4) as executor:
+    # The shared Ollama client keeps the same number of pooled connections alive
+    process = partial(
+        _process_single_chunk,
+        cache=cache,
+        journal=journal,
+        max_attempts=max_attempts,
+        router=router,
+    )
+    with ThreadPoolExecutor(max_workers=get_backend().limits.concurrency) as executor:
         # map ensures the results are returned in the same order as the input chunks
-        enriched_chunks = list(executor.map(_process_single_chunk, chunks))
+        enriched_chunks = list(executor.map(process, chunks))
     
-    return enriched_chunks
\ No newline at end of file
+    return enriched_chunks
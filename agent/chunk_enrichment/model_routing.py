@@ -0,0 +1,141 @@
+"""Route chunks to a small or large enrichment model and escalate failed answers."""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, TypeVar
+
+from pydantic import ValidationError
+
+from llm.backends import EnrichmentBackend, get_backend
+from llm.qwen_ollama_chunking import ChunkMetadata
+
+DEFAULT_LARGE_MODEL = "qwen2.5:7b"
+LONG_CHUNK_CHARS = 2000
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class RoutingPolicy:
+    """Which model a chunk starts on, and whether failures escalate.
+
+    Tables (with ``tables_to_large``) and chunks of at least
+    ``long_chunk_chars`` characters go to ``large_model``; everything else
+    goes to ``small_model``. With ``escalate``, a small-model answer that
+    fails validation is retried once on the large model.
+    """
+
+    small_model: str
+    large_model: str = DEFAULT_LARGE_MODEL
+    long_chunk_chars: int = LONG_CHUNK_CHARS
+    tables_to_large: bool = True
+    escalate: bool = True
+
+    @classmethod
+    def from_env(cls, small_model: Optional[str] = None) -> "RoutingPolicy":
+        """Read ROUTING_SMALL_MODEL, ROUTING_LARGE_MODEL, ROUTING_LONG_CHUNK_CHARS,
+        ROUTING_TABLES (large|small) and ROUTING_ESCALATE; the small model
+        defaults to the backend's model."""
+        return cls(
+            small_model=os.getenv("ROUTING_SMALL_MODEL") or small_model or get_backend().model,
+            large_model=os.getenv("ROUTING_LARGE_MODEL", DEFAULT_LARGE_MODEL),
+            long_chunk_chars=int(os.getenv("ROUTING_LONG_CHUNK_CHARS", str(LONG_CHUNK_CHARS))),
+            tables_to_large=os.getenv("ROUTING_TABLES", "large").lower() == "large",
+            escalate=os.getenv("ROUTING_ESCALATE", "true").lower() == "true",
+        )
+
+    def choose(self, content: str, is_table: bool) -> str:
+        if (is_table and self.tables_to_large) or len(content) >= self.long_chunk_chars:
+            return self.large_model
+        return self.small_model
+
+    def describe(self) -> str:
+        """Stable description used in cache keys, so changing the policy is a miss."""
+        tables = "large" if self.tables_to_large else "small"
+        return (
+            f"route:{self.small_model}>{self.large_model}"
+            f"@{self.long_chunk_chars}:tables={tables}:escalate={self.escalate}"
+        )
+
+
+@dataclass
+class ModelStats:
+    """Calls, invalid answers and total latency of one model."""
+
+    calls: int = 0
+    invalid: int = 0
+    seconds: float = 0.0
+
+    @property
+    def mean_latency(self) -> float:
+        return self.seconds / self.calls if self.calls else 0.0
+
+
+class ModelRouter:
+    """Send each chunk to the model ``policy`` picks and keep per-model statistics."""
+
+    def __init__(self, policy: RoutingPolicy, backend: Optional[EnrichmentBackend] = None) -> None:
+        self.policy = policy
+        self.backend = backend
+        self.stats: Dict[str, ModelStats] = defaultdict(ModelStats)
+        self.escalations = 0
+        self._lock = threading.Lock()
+
+    def _timed(self, model: str, call: Callable[[], T]) -> T:
+        started = time.perf_counter()
+        try:
+            return call()
+        finally:
+            with self._lock:
+                self.stats[model].calls += 1
+                self.stats[model].seconds += time.perf_counter() - started
+
+    def _invalid(self, model: str) -> None:
+        with self._lock:
+            self.stats[model].invalid += 1
+
+    def generate(self, metadata_prompt: str, content: str, is_table: bool) -> ChunkMetadata:
+        """Enrich one prompt on the routed model, escalating an invalid small-model answer."""
+
+        backend = self.backend or get_backend()
+        model = self.policy.choose(content, is_table)
+        try:
+            metadata = self._timed(model, lambda: backend.generate(metadata_prompt, model))
+            if metadata.summary.strip():
+                return metadata
+            error: Exception = ValueError("empty summary")
+        except ValidationError as exc:
+            error = exc
+        self._invalid(model)
+
+        if not self.policy.escalate or model == self.policy.large_model:
+            raise error
+        with self._lock:
+            self.escalations += 1
+        large = self.policy.large_model
+        try:
+            return self._timed(large, lambda: backend.generate(metadata_prompt, large))
+        except ValidationError:
+            self._invalid(large)
+            raise
+
+    def generate_batch(self, batch_prompt: str, count: int) -> List[Optional[ChunkMetadata]]:
+        """Enrich a batch of small-model chunks; failed entries are retried one by one."""
+
+        backend = self.backend or get_backend()
+        small = self.policy.small_model
+        return self._timed(small, lambda: backend.generate_batch(batch_prompt, count, small))
+
+    def report(self) -> str:
+        lines = [f"Model routing ({self.escalations} escalations to {self.policy.large_model}):"]
+        for model, stats in sorted(self.stats.items()):
+            lines.append(
+                f"  {model}: {stats.calls} calls, {stats.invalid} invalid, "
+                f"mean latency {stats.mean_latency:.2f}s"
+            )
+        return "\n".join(lines)
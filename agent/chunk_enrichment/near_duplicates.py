@@ -0,0 +1,186 @@
+"""Detect near-duplicate chunks with MinHash/LSH so enrichment can be reused."""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_TOKEN = re.compile(r"\w+")
+
+
+@dataclass
+class DedupStats:
+    """Running totals for the near-duplicate stage."""
+
+    chunks_seen: int = 0
+    duplicates: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.duplicates / self.chunks_seen if self.chunks_seen else 0.0
+
+    def report(self) -> str:
+        return (
+            f"Near-duplicate stage reused enrichment for {self.duplicates}/{self.chunks_seen} "
+            f"chunks (hit rate {self.hit_rate:.1%})."
+        )
+
+
+def _optimal_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """Pick (bands, rows) with the highest LSH S-curve midpoint not above ``threshold``.
+
+    Candidates are verified against the threshold afterwards, so the midpoint
+    errs low to favour recall over fewer comparisons.
+    """
+
+    def midpoint(bands_rows: Tuple[int, int]) -> float:
+        bands, rows = bands_rows
+        return (1 / bands) ** (1 / rows)
+
+    candidates = [
+        (bands, num_perm // bands) for bands in range(1, num_perm + 1) if num_perm % bands == 0
+    ]
+    below = [br for br in candidates if midpoint(br) <= threshold]
+    return max(below, key=midpoint) if below else min(candidates, key=midpoint)
+
+
+class NearDuplicateIndex:
+    """MinHash signatures with a banded LSH index over every chunk seen so far.
+
+    ``assign`` returns the id of the canonical entry a text belongs to: either a
+    previously indexed entry whose estimated Jaccard similarity (over word
+    ``shingle_size``-grams) is at least ``threshold``, or a new entry. Callers
+    store per-entry results (such as enrichment metadata) with ``set_payload``.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.9,
+        num_perm: int = 128,
+        shingle_size: int = 5,
+        seed: int = 1,
+    ) -> None:
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.rows = _optimal_bands(threshold, num_perm)
+        self.stats = DedupStats()
+
+        generator = np.random.RandomState(seed)
+        self._a = generator.randint(1, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = generator.randint(0, _MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+        self._signatures: List[np.ndarray] = []
+        self._groups: List[str] = []
+        self._payloads: Dict[int, Dict[str, Any]] = {}
+        self._buckets: List[Dict[bytes, List[int]]] = [defaultdict(list) for _ in range(self.bands)]
+
+    def signature(self, text: str) -> np.ndarray:
+        """Return the MinHash signature of ``text`` as a uint32 vector."""
+
+        tokens = _TOKEN.findall(text.lower())
+        size = self.shingle_size
+        shingles = {" ".join(tokens[i : i + size]) for i in range(max(1, len(tokens) - size + 1))}
+        hashes = np.array(
+            [
+                int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little")
+                for s in shingles
+            ],
+            dtype=np.uint64,
+        )
+        # Universal hashing (a*x + b) mod p per permutation; uint64 overflow is intended.
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        rows = self.rows
+        return [signature[band * rows : (band + 1) * rows].tobytes() for band in range(self.bands)]
+
+    def query(self, signature: np.ndarray) -> Optional[int]:
+        """Return the most similar indexed entry above ``threshold``, if any."""
+
+        candidates = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            candidates.update(self._buckets[band].get(key, ()))
+
+        best, best_similarity = None, self.threshold
+        for candidate in sorted(candidates):
+            similarity = float(np.mean(self._signatures[candidate] == signature))
+            if similarity >= best_similarity:
+                best, best_similarity = candidate, similarity
+        return best
+
+    def assign(self, text: str) -> Tuple[int, bool]:
+        """Return ``(entry_id, is_duplicate)`` for ``text``, indexing it if new."""
+
+        signature = self.signature(text)
+        self.stats.chunks_seen += 1
+
+        match = self.query(signature)
+        if match is not None:
+            self.stats.duplicates += 1
+            return match, True
+
+        entry_id = len(self._signatures)
+        self._signatures.append(signature)
+        self._groups.append(hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest())
+        for band, key in enumerate(self._band_keys(signature)):
+            self._buckets[band][key].append(entry_id)
+        return entry_id, False
+
+    def group(self, entry_id: int) -> str:
+        """Stable content hash of the canonical text for ``entry_id``."""
+        return self._groups[entry_id]
+
+    def payload(self, entry_id: int) -> Dict[str, Any]:
+        return self._payloads.get(entry_id, {})
+
+    def set_payload(self, entry_id: int, payload: Dict[str, Any]) -> None:
+        self._payloads[entry_id] = payload
+
+
+def enrich_with_near_duplicates(
+    chunks: Sequence[Any],
+    enrich_fn: Callable[[Sequence[Any]], List[Dict[str, Any]]],
+    index: NearDuplicateIndex,
+) -> List[Dict[str, Any]]:
+    """Enrich only canonical chunks and copy their metadata onto near-duplicates.
+
+    Every returned metadata dict carries a ``dedup_group`` so the embedder can
+    reuse one vector per group. A duplicate whose canonical enrichment failed
+    is enriched itself, and a success is stored for later duplicates.
+    """
+
+    entries: List[int] = []
+    to_enrich: List[int] = []
+    pending = set()
+    for position, chunk in enumerate(chunks):
+        entry_id, is_duplicate = index.assign(chunk.text)
+        entries.append(entry_id)
+        if not is_duplicate or (not index.payload(entry_id) and entry_id not in pending):
+            pending.add(entry_id)
+            to_enrich.append(position)
+
+    enriched = enrich_fn([chunks[position] for position in to_enrich]) if to_enrich else []
+    own_results = dict(zip(to_enrich, enriched))
+    for position, metadata in own_results.items():
+        if metadata and not index.payload(entries[position]):
+            index.set_payload(entries[position], metadata)
+
+    results: List[Dict[str, Any]] = []
+    for position, entry_id in enumerate(entries):
+        metadata = own_results.get(position) or index.payload(entry_id)
+        results.append({**metadata, "dedup_group": index.group(entry_id)} if metadata else {})
+
+    print(
+        f"Enriched {len(to_enrich)} of {len(chunks)} chunks; "
+        f"{len(chunks) - len(to_enrich)} reused from near-duplicates."
+    )
+    return results
@@ -0,0 +1,143 @@
+"""Drop repeated page headers, footers and navigation boilerplate before chunking."""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Set, Tuple
+
+from unstructured.documents.elements import Element
+
+_NON_WORD = re.compile(r"[^\w#]+")
+# "Page 3" / "Page 3 of 90" inside a longer footer such as "Microsoft | Page 3 of 90".
+_PAGE_REFERENCE = re.compile(r"\bpage\s+\d{1,4}(\s+of\s+\d{1,4})?\b", re.IGNORECASE)
+# A whole element that is only a page marker: "Page 3 of 90", "- 3 -", "F-3".
+_PAGE_MARKER = re.compile(
+    r"^(page\s+\d{1,4}(\s+of\s+\d{1,4})?|[-–—]\s*\d{1,4}\s*[-–—]|[a-z]{1,2}-\d{1,4})$",
+    re.IGNORECASE,
+)
+# A bare number is only taken for a page number when it ends its page.
+_BARE_PAGE_NUMBER = re.compile(r"^\d{1,3}$")
+_TABLE_OF_CONTENTS = re.compile(
+    r"^((back|return)\s+to\s+)?table\s+of\s+contents$", re.IGNORECASE
+)
+
+
+@dataclass
+class BoilerplateStats:
+    """Running totals of what the filter has removed."""
+
+    elements_seen: int = 0
+    elements_removed: int = 0
+    characters_removed: int = 0
+    chars_per_chunk: int = 1800
+
+    @property
+    def estimated_llm_calls_saved(self) -> int:
+        """Approximate chunks (and therefore LLM calls) the removed text would have filled."""
+        return math.ceil(self.characters_removed / self.chars_per_chunk)
+
+    def report(self) -> str:
+        return (
+            f"Boilerplate filter removed {self.elements_removed}/{self.elements_seen} elements "
+            f"({self.characters_removed} characters, ~{self.estimated_llm_calls_saved} LLM calls saved)."
+        )
+
+
+def _normalize(text: str) -> str:
+    """Lowercase and mask page references so 'Page 3 of 90' and 'Page 4 of 90' hash alike.
+
+    Other digits are kept: 'Note 3' and 'Note 4' are different content.
+    """
+    return _NON_WORD.sub(" ", _PAGE_REFERENCE.sub("page # of #", text.lower())).strip()
+
+
+def _fingerprint(text: str) -> str:
+    return hashlib.blake2b(_normalize(text).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _document_key(element: Element) -> Tuple[str, str]:
+    metadata = element.metadata
+    return (metadata.file_directory or "", metadata.filename or "")
+
+
+class BoilerplateFilter:
+    """Detect and drop elements repeated across pages and documents.
+
+    An element is boilerplate when its normalized text hash appears on at least
+    ``min_page_repeats`` pages of one document, or on two or more pages while
+    also recurring in ``min_document_repeats`` documents seen so far (section
+    titles shared across filings appear once per document and are kept).
+    Page markers ("Page 3 of 90", "- 3 -", or a bare number ending a page) and
+    "Table of Contents" links are always dropped.
+    Tables and elements longer than ``max_chars`` are never removed. The filter
+    keeps its document counts between calls, so it also works on a stream of
+    documents.
+    """
+
+    def __init__(
+        self,
+        min_page_repeats: int = 3,
+        min_document_repeats: int = 3,
+        max_chars: int = 200,
+        chars_per_chunk: int = 1800,
+    ) -> None:
+        self.min_page_repeats = min_page_repeats
+        self.min_document_repeats = min_document_repeats
+        self.max_chars = max_chars
+        self.stats = BoilerplateStats(chars_per_chunk=chars_per_chunk)
+        self._document_counts: Counter[str] = Counter()
+
+    def _is_candidate(self, element: Element) -> bool:
+        text = element.text.strip()
+        return bool(text) and element.category != "Table" and len(text) <= self.max_chars
+
+    def filter(self, elements: List[Element]) -> List[Element]:
+        """Return ``elements`` without boilerplate, updating ``stats``."""
+
+        pages: Dict[Tuple[str, str], Dict[str, Set[int]]] = defaultdict(lambda: defaultdict(set))
+        fingerprints: List[str | None] = []
+        page_breaks: Counter[Tuple[str, str]] = Counter()
+
+        for element in elements:
+            document = _document_key(element)
+            if element.category == "PageBreak":
+                page_breaks[document] += 1
+            if not self._is_candidate(element):
+                fingerprints.append(None)
+                continue
+            fingerprint = _fingerprint(element.text)
+            fingerprints.append(fingerprint)
+            page = element.metadata.page_number or page_breaks[document] + 1
+            pages[document][fingerprint].add(page)
+
+        for document_pages in pages.values():
+            self._document_counts.update(document_pages.keys())
+
+        kept: List[Element] = []
+        for index, (element, fingerprint) in enumerate(zip(elements, fingerprints)):
+            self.stats.elements_seen += 1
+            ends_page = index + 1 < len(elements) and elements[index + 1].category == "PageBreak"
+            if fingerprint is not None and self._is_boilerplate(
+                element, fingerprint, pages, ends_page
+            ):
+                self.stats.elements_removed += 1
+                self.stats.characters_removed += len(element.text)
+                continue
+            kept.append(element)
+
+        return kept
+
+    def _is_boilerplate(self, element, fingerprint, pages, ends_page: bool = False) -> bool:
+        text = element.text.strip()
+        if _PAGE_MARKER.match(text) or _TABLE_OF_CONTENTS.match(text):
+            return True
+        if ends_page and _BARE_PAGE_NUMBER.match(text):
+            return True
+        page_count = len(pages[_document_key(element)][fingerprint])
+        return page_count >= self.min_page_repeats or (
+            page_count >= 2 and self._document_counts[fingerprint] >= self.min_document_repeats
+        )
@@ -0,0 +1,161 @@
+"""Split large table chunks into row groups rendered as compact markdown, TSV or smaller HTML tables."""
+
+from __future__ import annotations
+
+import copy
+import re
+from html import escape
+from typing import Any, Callable, List, Sequence, Tuple
+
+from lxml import html as lxml_html
+from unstructured.documents.elements import Element, Table
+
+TABLE_CATEGORIES = ("Table", "TableChunk")
+TABLE_FORMATS = ("markdown", "tsv", "html")
+# Matches the content cut applied before embedding.
+DEFAULT_MAX_SIZE = 1000
+
+_WHITESPACE = re.compile(r"\s+")
+
+Row = List[str]
+
+
+def chunk_content(chunk: Any) -> Tuple[str, bool]:
+    """Return ``(content, is_table)`` for a chunk as enrichment and storage see it.
+
+    HTML tables use their ``text_as_html``; tables already split into compact
+    text by ``split_table_chunks`` are still tables but use their text.
+    """
+
+    has_html = "text_as_html" in chunk.metadata.to_dict()
+    is_table = has_html or getattr(chunk, "category", None) in TABLE_CATEGORIES
+    content = chunk.metadata.text_as_html if has_html else chunk.text
+    return content or "", is_table
+
+
+def _table_rows(table_html: str) -> Tuple[List[Row], int]:
+    """Parse ``table_html`` into cell-text rows and the number of leading header rows."""
+
+    root = lxml_html.fromstring(table_html)
+    rows: List[Row] = []
+    header_rows = 0
+    for tr in root.iter("tr"):
+        cells = tr.xpath("./th|./td")
+        row = [_WHITESPACE.sub(" ", cell.text_content()).strip() for cell in cells]
+        if not any(row):
+            continue
+        if len(rows) == header_rows and cells and all(cell.tag == "th" for cell in cells):
+            header_rows += 1
+        rows.append(row)
+
+    # Spacer columns (empty in every row) only cost tokens.
+    width = max((len(row) for row in rows), default=0)
+    rows = [row + [""] * (width - len(row)) for row in rows]
+    keep = [column for column in range(width) if any(row[column] for row in rows)]
+    rows = [[row[column] for column in keep] for row in rows]
+
+    # Without <th> cells, treat the first row as the header.
+    return rows, header_rows or min(1, len(rows))
+
+
+def render_rows(rows: Sequence[Row], header_rows: int, table_format: str = "markdown") -> str:
+    """Render rows as a markdown table (header + separator), TSV lines or an HTML table."""
+
+    if table_format == "tsv":
+        return "\n".join("\t".join(row) for row in rows)
+    if table_format == "html":
+        html_rows = []
+        for index, row in enumerate(rows):
+            tag = "th" if index < header_rows else "td"
+            html_rows.append("<tr>" + "".join(f"<{tag}>{escape(cell, quote=False)}</{tag}>" for cell in row) + "</tr>")
+        return "<table>" + "".join(html_rows) + "</table>"
+
+    lines = ["| " + " | ".join(cell.replace("|", "/") for cell in row) + " |" for row in rows]
+    if header_rows and rows:
+        lines.insert(header_rows, "|" + " --- |" * len(rows[0]))
+    return "\n".join(lines)
+
+
+def split_table_rows(
+    rows: Sequence[Row],
+    header_rows: int,
+    max_size: int = DEFAULT_MAX_SIZE,
+    table_format: str = "markdown",
+    measure: Callable[[str], int] = len,
+) -> List[str]:
+    """Group body rows so each rendered group, header included, fits ``max_size``.
+
+    A single row larger than the budget still gets a group of its own.
+    """
+
+    header, body = list(rows[:header_rows]), list(rows[header_rows:])
+    if not body:
+        return [render_rows(header, header_rows, table_format)] if header else []
+
+    groups: List[str] = []
+    current: List[Row] = []
+    for row in body:
+        candidate = render_rows(header + current + [row], header_rows, table_format)
+        if current and measure(candidate) > max_size:
+            groups.append(render_rows(header + current, header_rows, table_format))
+            current = []
+        current.append(row)
+    groups.append(render_rows(header + current, header_rows, table_format))
+    return groups
+
+
+def split_table_chunks(
+    chunks: List[Element],
+    max_size: int = DEFAULT_MAX_SIZE,
+    table_format: str = "markdown",
+    measure: Callable[[str], int] = len,
+) -> List[Element]:
+    """Replace HTML table chunks with compact row-group ``Table`` chunks.
+
+    Each group repeats the table's header rows and is rendered as markdown or
+    TSV instead of HTML, so every row fits the embedder and LLM budgets
+    (``max_size`` in units of ``measure``, characters by default). With
+    ``table_format="html"`` the groups stay HTML tables in ``text_as_html``.
+    Other chunks pass through unchanged and chunk order is preserved.
+    """
+
+    if table_format not in TABLE_FORMATS:
+        raise ValueError(f"table_format must be one of {TABLE_FORMATS}, got {table_format!r}")
+
+    result: List[Element] = []
+    tables_split = 0
+    html_chars = 0
+    compact_chars = 0
+    for chunk in chunks:
+        table_html = getattr(chunk.metadata, "text_as_html", None)
+        try:
+            rows, header_rows = _table_rows(table_html) if table_html else ([], 0)
+        except Exception as exc:
+            print(f"Error splitting table chunk: {exc}")
+            rows = []
+        if not rows:
+            result.append(chunk)
+            continue
+
+        groups = split_table_rows(rows, header_rows, max_size, table_format, measure)
+        tables_split += 1
+        html_chars += len(table_html)
+        compact_chars += sum(len(group) for group in groups)
+        for group in groups:
+            metadata = copy.deepcopy(chunk.metadata)
+            if table_format == "html":
+                metadata.text_as_html = group
+                text = " ".join(
+                    piece.strip() for piece in lxml_html.fromstring(group).itertext() if piece.strip()
+                )
+            else:
+                metadata.text_as_html = None
+                text = group
+            result.append(Table(text=text, metadata=metadata))
+
+    if tables_split:
+        print(
+            f"Split {tables_split} tables into {len(result) - len(chunks) + tables_split} "
+            f"row groups ({html_chars} HTML characters -> {compact_chars} {table_format})."
+        )
+    return result
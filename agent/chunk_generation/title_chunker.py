@@ -1,8 +1,9 @@
 from unstructured.chunking.title import chunk_by_title
 from unstructured.documents.elements import Element
-from typing import List
+from pathlib import Path
+from typing import Iterable, Iterator, List, Tuple
 
-def title_chunker(parsed_elements: List[Element]):
+def title_chunker(parsed_elements: List[Element], verbose: bool = True):
     """Chunks parsed elements based on titles."""
 
     chunks = chunk_by_title(
@@ -14,6 +15,9 @@ def title_chunker(parsed_elements: List[Element]):
     
     print(f"Document chunked into {len(chunks)} sections.")
 
+    if not verbose:
+        return chunks
+
     text_chunk_sample = None
     table_chunk_sample = None
 
@@ -40,3 +44,14 @@ def title_chunker(parsed_elements: List[Element]):
         print(f"Metadata: {table_chunk_sample.metadata.to_dict()}")
 
     return chunks
+
+
+def iter_title_chunks(
+    documents: Iterable[Tuple[Path, List[Element]]],
+) -> Iterator[Tuple[Path, List[Element]]]:
+    """Chunks a stream of (file_path, elements) documents one document at a time."""
+
+    for file_path, elements in documents:
+        if not elements:
+            continue
+        yield file_path, title_chunker(elements, verbose=False)
@@ -0,0 +1,248 @@
+"""Chunk by title with sizes measured in embedding-model tokens instead of characters."""
+
+from __future__ import annotations
+
+import math
+from functools import cached_property, lru_cache
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, Optional, Protocol, Tuple
+
+from unstructured.documents.elements import Element
+
+from agent.chunk_generation.table_splitter import chunk_content, split_table_chunks
+
+EMBEDDING_MAX_TOKENS = 512
+# Room left for the "Summary: ... Keywords: ..." prefix prepended before embedding.
+ENRICHMENT_PREFIX_TOKENS = 128
+# Matches the ~3000 character cut applied to LLM enrichment prompts.
+LLM_CONTENT_TOKENS = 750
+
+
+class TokenCounter(Protocol):
+    def count(self, text: str) -> int: ...
+
+    def validate(self) -> None: ...
+
+
+class EmbeddingTokenCounter:
+    """Count tokens with the embedding model's own (untruncated) tokenizer."""
+
+    def __init__(self, tokenizer) -> None:
+        from tokenizers import Tokenizer
+
+        # fastembed configures truncation and padding for inference; count raw text instead.
+        self._tokenizer = Tokenizer.from_str(tokenizer.to_str())
+        self._tokenizer.no_truncation()
+        self._tokenizer.no_padding()
+
+    def count(self, text: str) -> int:
+        return len(self._tokenizer.encode(text, add_special_tokens=False).ids)
+
+    def validate(self) -> None:
+        """The tokenizer is already loaded; nothing to resolve."""
+
+
+class ModelTokenCounter:
+    """Count tokens with fastembed's public ``TextEmbedding.token_count``.
+
+    fastembed truncates to the model window, so counts stop growing there;
+    budgets below the window (see ``chunk_token_budget``) are still exact.
+    """
+
+    def __init__(self, model) -> None:
+        self._model = model
+        # Special tokens the model adds to every text, e.g. [CLS] and [SEP].
+        self._special_tokens = model.token_count("")
+
+    def count(self, text: str) -> int:
+        return self._model.token_count(text) - self._special_tokens
+
+    def validate(self) -> None:
+        """The model is already loaded; nothing to resolve."""
+
+
+class ApproximateTokenCounter:
+    """Fallback of roughly four characters per token when no tokenizer is available."""
+
+    def __init__(self, chars_per_token: float = 4.0) -> None:
+        self.chars_per_token = chars_per_token
+
+    def count(self, text: str) -> int:
+        return math.ceil(len(text) / self.chars_per_token)
+
+    def validate(self) -> None:
+        """Nothing to resolve."""
+
+
+def _fastembed_tokenizer(model) -> Optional[Any]:
+    """The tokenizer fastembed loaded for ``model``, if this fastembed version exposes it.
+
+    ``TextEmbedding.model.tokenizer`` is not public API, so its absence is expected.
+    """
+
+    tokenizer = getattr(getattr(model, "model", None), "tokenizer", None)
+    return tokenizer if hasattr(tokenizer, "to_str") else None
+
+
+@lru_cache(maxsize=1)
+def load_embedding_token_counter() -> TokenCounter:
+    """Return a counter backed by the configured fastembed model's tokenizer.
+
+    Uses the raw tokenizer when fastembed exposes it, otherwise the public
+    (window-capped) ``token_count``.
+    """
+
+    try:
+        from agent.embedder.fast_embed_qdrant import get_embedding_model
+
+        model = get_embedding_model()
+        tokenizer = _fastembed_tokenizer(model)
+        if tokenizer is not None:
+            return EmbeddingTokenCounter(tokenizer)
+        return ModelTokenCounter(model)
+    except Exception as exc:
+        print(f"Embedding tokenizer unavailable ({exc}); approximating 4 characters per token.")
+        return ApproximateTokenCounter()
+
+
+def chunk_token_budget(
+    embedding_max_tokens: int = EMBEDDING_MAX_TOKENS,
+    prefix_tokens: int = ENRICHMENT_PREFIX_TOKENS,
+    llm_content_tokens: int = LLM_CONTENT_TOKENS,
+) -> int:
+    """Largest chunk that fits both the embedding window and the LLM prompt budget."""
+    return min(embedding_max_tokens - prefix_tokens, llm_content_tokens)
+
+
+@lru_cache(maxsize=1)
+def _token_chunking_options() -> Optional[type]:
+    """chunk_by_title options measured with our counter, or ``None`` on unsupported versions.
+
+    ``unstructured`` only exposes tiktoken tokenizers by name, so this builds on
+    its private ``_ByTitleChunkingOptions``. The class is only used when it
+    still has the ``new``/``token_counter``/``measure`` hooks relied on here.
+    """
+
+    try:
+        from unstructured.chunking.title import _ByTitleChunkingOptions
+    except ImportError:
+        return None
+    if not all(hasattr(_ByTitleChunkingOptions, name) for name in ("new", "token_counter", "measure")):
+        return None
+
+    class _TokenChunkingOptions(_ByTitleChunkingOptions):
+        def __init__(self, counter: TokenCounter, **kwargs) -> None:
+            self._counter = counter
+            super().__init__(**kwargs)
+
+        @classmethod
+        def new(cls, counter: TokenCounter, **kwargs) -> "_TokenChunkingOptions":
+            self = cls(counter, **kwargs)
+            self._validate()
+            return self
+
+        @cached_property
+        def token_counter(self) -> TokenCounter:
+            return self._counter
+
+    return _TokenChunkingOptions
+
+
+def _chunk_by_tokens(
+    parsed_elements: List[Element], counter: TokenCounter, max_tokens: int
+) -> List[Element]:
+    options_cls = _token_chunking_options()
+    if options_cls is not None:
+        from unstructured.chunking.title import _chunk_by_title
+
+        opts = options_cls.new(
+            counter,
+            max_tokens=max_tokens,
+            new_after_n_tokens=int(max_tokens * 0.9),
+            # Only used to label the counter; measuring goes through ``counter``.
+            tokenizer="embedding-model",
+            combine_text_under_n_chars=min(256, max_tokens),
+        )
+        return _chunk_by_title(parsed_elements, opts)
+
+    from unstructured.chunking.title import chunk_by_title
+
+    print("This unstructured version lacks token-counter hooks; chunking by ~4 characters per token.")
+    max_characters = max_tokens * 4
+    return chunk_by_title(
+        parsed_elements,
+        max_characters=max_characters,
+        new_after_n_chars=int(max_characters * 0.9),
+        combine_text_under_n_chars=min(256, max_characters),
+    )
+
+
+def _fit_tables(
+    chunks: List[Element], counter: TokenCounter, max_tokens: int, table_format: str = "html"
+) -> List[Element]:
+    """Split HTML table chunks whose embedded HTML exceeds ``max_tokens`` into row groups.
+
+    Chunking measures ``chunk.text``, but tables are embedded from ``text_as_html``.
+    Row groups are rendered in ``table_format``.
+    """
+
+    fitted: List[Element] = []
+    for chunk in chunks:
+        table_html = getattr(chunk.metadata, "text_as_html", None)
+        if table_html and counter.count(table_html) > max_tokens:
+            fitted.extend(
+                split_table_chunks(
+                    [chunk], max_size=max_tokens, table_format=table_format, measure=counter.count
+                )
+            )
+        else:
+            fitted.append(chunk)
+    return fitted
+
+
+def token_chunker(
+    parsed_elements: List[Element],
+    max_tokens: Optional[int] = None,
+    counter: Optional[TokenCounter] = None,
+    verbose: bool = True,
+    table_format: str = "html",
+) -> List[Element]:
+    """Chunks parsed elements based on titles with a token budget.
+
+    Chunk size is measured with the embedding model's tokenizer so every chunk
+    fits the embedder's window (after the enrichment prefix) and the LLM
+    prompt budget, and nothing is cut off downstream. HTML tables are measured
+    as the HTML that gets embedded and split into ``table_format`` row groups
+    when too large.
+    """
+
+    counter = counter or load_embedding_token_counter()
+    max_tokens = max_tokens or chunk_token_budget()
+
+    chunks = _fit_tables(
+        _chunk_by_tokens(parsed_elements, counter, max_tokens), counter, max_tokens, table_format
+    )
+
+    if verbose:
+        sizes = [counter.count(chunk_content(chunk)[0]) for chunk in chunks]
+        print(
+            f"Document chunked into {len(chunks)} sections of at most {max_tokens} tokens "
+            f"(largest {max(sizes, default=0)})."
+        )
+    return chunks
+
+
+def iter_token_chunks(
+    documents: Iterable[Tuple[Path, List[Element]]],
+    max_tokens: Optional[int] = None,
+    counter: Optional[TokenCounter] = None,
+    table_format: str = "html",
+) -> Iterator[Tuple[Path, List[Element]]]:
+    """Token-budget counterpart of ``iter_title_chunks``."""
+
+    for file_path, elements in documents:
+        if not elements:
+            continue
+        yield file_path, token_chunker(
+            elements, max_tokens, counter, verbose=False, table_format=table_format
+        )
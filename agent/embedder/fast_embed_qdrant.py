@@ -1,68 +1,407 @@
-from fastembed import TextEmbedding
-from typing import List
-from qdrant_client import QdrantClient, models
+"""Embed enriched chunks with fastembed and store them in Qdrant.
 
-embedding_model = TextEmbedding(model_name="BAAI/bge-small-en-v1.5")
+The embedding model, the Qdrant client and the collection are created on
+first use by ``get_embedding_model`` and ``get_qdrant_client``, so importing
+this module stays cheap. ``embedding_model`` and ``client`` remain available
+as module attributes for existing callers.
 
-client = QdrantClient(":memory:") # Change this to Qdrant instance else where for production
+Qdrant runs in memory unless QDRANT_PATH (local on-disk storage) or
+QDRANT_URL (a server) is set. Point ids are derived from the chunk and the
+text that is embedded, so ``sync_chunks`` only embeds chunks whose points
+are missing and removes points a re-ingested filing no longer has.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import threading
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Collection, Dict, Iterable, List, Optional, Set
+
+from agent.chunk_enrichment.chunk_store import record_id
+
+if TYPE_CHECKING:
+    from fastembed import TextEmbedding
+    from qdrant_client import QdrantClient, models
+
+EMBEDDING_MODEL_NAME = "BAAI/bge-small-en-v1.5"
 COLLECTION_NAME = "financial_reports"
 
-client.create_collection(
-    collection_name=COLLECTION_NAME,
-    vectors_config=models.VectorParams(
-        size=embedding_model.embedding_size,
-        distance=models.Distance.COSINE
-    )
-)
+# Fixed namespace for uuid5 point ids; changing it orphans every stored point.
+POINT_ID_NAMESPACE = uuid.UUID("6f1c2f4e-8a53-5b7e-9d0a-3c4b2e1f7a90")
+_RETRIEVE_BATCH = 256
 
-print(f"Qdrant collection '{COLLECTION_NAME}' created.")
 
+@dataclass(frozen=True)
+class QdrantSettings:
+    """Where points live: in memory by default, else a local ``path`` or a server ``url``."""
 
-def create_embedding_from_chunks(chunks : List[dict]) -> str:
-    """Generates embedding from enriched chunk using fast_embed."""
+    path: Optional[str] = None
+    url: Optional[str] = None
+    api_key: Optional[str] = None
 
-    texts_to_embed = []
-    chunks_to_upsert = []
+    @classmethod
+    def from_env(cls) -> "QdrantSettings":
+        """Read QDRANT_PATH, QDRANT_URL and QDRANT_API_KEY."""
+        return cls(
+            path=os.getenv("QDRANT_PATH") or None,
+            url=os.getenv("QDRANT_URL") or None,
+            api_key=os.getenv("QDRANT_API_KEY") or None,
+        )
 
-    for i, chunk in enumerate(chunks):
-        summary = chunk.get('summary', '')
-        keywords = chunk.get('keywords', [])
+    def describe(self) -> str:
+        return self.url or self.path or ":memory:"
 
-        # Check if enrichment was skipped (based on the default message set in main.py)
-        if summary == "No summary available (enrichment skipped)":
-            string_to_embed = f"Content: {chunk['content'][:1000]}"
-        else:
-            string_to_embed = f"""
+
+_lock = threading.Lock()
+_settings: Optional[QdrantSettings] = None
+_embedding_model: Optional[TextEmbedding] = None
+_client: Optional[QdrantClient] = None
+
+
+def get_embedding_model() -> TextEmbedding:
+    """Return the shared fastembed model, loading (and if needed downloading) it on first use."""
+
+    global _embedding_model
+    with _lock:
+        if _embedding_model is None:
+            from fastembed import TextEmbedding
+
+            _embedding_model = TextEmbedding(model_name=EMBEDDING_MODEL_NAME)
+        return _embedding_model
+
+
+def get_qdrant_client() -> QdrantClient:
+    """Return the shared Qdrant client, creating it and, if missing, the collection on first use."""
+
+    global _client, _settings
+    with _lock:
+        if _client is None:
+            from fastembed import TextEmbedding
+            from qdrant_client import QdrantClient, models
+
+            if _settings is None:
+                _settings = QdrantSettings.from_env()
+            if _settings.url:
+                client = QdrantClient(url=_settings.url, api_key=_settings.api_key)
+            elif _settings.path:
+                client = QdrantClient(path=_settings.path)
+            else:
+                client = QdrantClient(":memory:")
+            if client.collection_exists(COLLECTION_NAME):
+                print(f"Using Qdrant collection '{COLLECTION_NAME}' at {_settings.describe()}.")
+            else:
+                # The size comes from fastembed's model list, so the model itself is not loaded here.
+                client.create_collection(
+                    collection_name=COLLECTION_NAME,
+                    vectors_config=models.VectorParams(
+                        size=TextEmbedding.get_embedding_size(EMBEDDING_MODEL_NAME),
+                        distance=models.Distance.COSINE
+                    )
+                )
+                print(f"Qdrant collection '{COLLECTION_NAME}' created at {_settings.describe()}.")
+            if _settings.url:
+                # Stale-point deletes and filing filters match on these; local mode has no indexes.
+                # Collections created before the indexes existed get them on first use.
+                indexed = client.get_collection(COLLECTION_NAME).payload_schema or {}
+                for field_name in ("source_file", "accession_number"):
+                    if field_name not in indexed:
+                        client.create_payload_index(
+                            COLLECTION_NAME, field_name, models.PayloadSchemaType.KEYWORD
+                        )
+            _client = client
+        return _client
+
+
+def reset_qdrant_client(settings: Optional[QdrantSettings] = None) -> None:
+    """Close the shared client and use ``settings`` (or re-read the environment) next time."""
+
+    global _client, _settings
+    with _lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+        _settings = settings
+
+
+# Local mode flushes and unlocks its storage on close, which fails once interpreter teardown starts.
+atexit.register(reset_qdrant_client)
+
+
+def __getattr__(name: str) -> Any:
+    # PEP 562: keep `from ... import embedding_model, client` working without eager loading.
+    if name == "embedding_model":
+        return get_embedding_model()
+    if name == "client":
+        return get_qdrant_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _embedding_text(chunk: dict, content_char_limit: Optional[int]) -> str:
+    content = chunk['content'][:content_char_limit]
+    summary = chunk.get('summary', '')
+    keywords = chunk.get('keywords', [])
+
+    # Check if enrichment was skipped (based on the default message set in main.py)
+    if summary == "No summary available (enrichment skipped)":
+        return f"Content: {content}"
+    return f"""
             Summary: {summary}
             Keywords: {', '.join(keywords)}
-            Content: {chunk['content'][:1000]}
-            """
-        
-        texts_to_embed.append(string_to_embed.strip())
-        chunks_to_upsert.append(models.PointStruct(
-            id=i,
+            Content: {content}
+            """.strip()
+
+
+def point_id(chunk: dict) -> str:
+    """UUID of the chunk's point, derived from its chunk id and content.
+
+    Re-ingesting an unchanged chunk maps to the same point whatever the LLM
+    wrote for it; pass records whose metadata changed to ``sync_chunks`` as
+    ``changed`` to refresh their points.
+    """
+
+    key = json.dumps([record_id(chunk), chunk.get("content")], ensure_ascii=False)
+    return str(uuid.uuid5(POINT_ID_NAMESPACE, key))
+
+
+def embed_chunks(
+    chunks : List[dict],
+    vector_cache: Optional[Dict[str, List[float]]] = None,
+    content_char_limit: Optional[int] = 1000,
+) -> List[models.PointStruct]:
+    """Embeds enriched chunks with fast_embed and returns Qdrant points.
+
+    Point ids come from ``point_id``, so embedding a chunk again overwrites
+    its point instead of adding a copy.
+    Chunks sharing a ``dedup_group`` (near-duplicates) are embedded once and
+    reuse that vector; pass ``vector_cache`` to share vectors across calls.
+    Content is cut to ``content_char_limit`` characters; pass ``None`` when
+    chunks were already sized to the model's token window.
+    """
+
+    from qdrant_client import models
+
+    texts_to_embed = []
+    points = []
+    vectors = vector_cache if vector_cache is not None else {}
+    # Point index -> position in texts_to_embed, or the dedup group to copy from.
+    sources = []
+    embed_positions = {}
+
+    for chunk in chunks:
+        group = chunk.get('dedup_group')
+        if group is not None and (group in vectors or group in embed_positions):
+            sources.append(group)
+        else:
+            if group is not None:
+                embed_positions[group] = len(texts_to_embed)
+            sources.append(len(texts_to_embed))
+            texts_to_embed.append(_embedding_text(chunk, content_char_limit))
+        points.append(models.PointStruct(
+            id=point_id(chunk),
             vector=[],
             payload=chunk
         ))
 
-    print(f"Prepared chunk {i+1} for embedding.")
+    print(f"Prepared {len(points)} chunks for embedding.")
 
-    embeddings = list(embedding_model.embed(texts_to_embed, batch_size=32))
+    embeddings = [e.tolist() for e in get_embedding_model().embed(texts_to_embed, batch_size=32)]
+    for group, position in embed_positions.items():
+      vectors[group] = embeddings[position]
 
-    print(f"Embeddings completed. Sample embedding {embeddings[0][:5]}. Upserting into Qdrant.")
+    for point, source in zip(points, sources):
+      point.vector = vectors[source] if isinstance(source, str) else embeddings[source]
+
+    reused = len(points) - len(embeddings)
+    print(
+      f"Embeddings completed ({len(embeddings)} computed, {reused} reused from near-duplicates)."
+    )
+    return points
 
-    for i, embedding in enumerate(embeddings):
-      chunks_to_upsert[i].vector = embedding.tolist()
 
-    client.upsert(
+def upsert_points(points: List[models.PointStruct]) -> None:
+    """Upserts embedded points into the Qdrant collection."""
+
+    get_qdrant_client().upsert(
       collection_name=COLLECTION_NAME,
-      points=chunks_to_upsert,
+      points=points,
       wait=True,
     )
 
-    print("Upsert into Qdrant completed.")
+    print(f"Upserted {len(points)} points into Qdrant.")
 
-    collection_info = client.get_collection(collection_name=COLLECTION_NAME)
-    print(f"Collection '{COLLECTION_NAME}' info: {collection_info}")
 
-    
\ No newline at end of file
+def provenance_filter(
+    accession_number: Optional[str] = None,
+    form_type: Optional[str] = None,
+    source_file: Optional[str] = None,
+    filed_from: Optional[str] = None,
+    filed_to: Optional[str] = None,
+) -> Optional[models.Filter]:
+    """Builds a payload filter on filing provenance; dates are ISO ``YYYY-MM-DD``, inclusive.
+
+    Returns ``None`` when no condition is given.
+    """
+
+    from qdrant_client import models
+
+    conditions = [
+      models.FieldCondition(key=key, match=models.MatchValue(value=value))
+      for key, value in (
+        ("accession_number", accession_number),
+        ("form_type", form_type),
+        ("source_file", source_file),
+      )
+      if value is not None
+    ]
+    if filed_from or filed_to:
+      conditions.append(models.FieldCondition(
+        key="filing_date",
+        range=models.DatetimeRange(gte=filed_from, lte=filed_to),
+      ))
+    return models.Filter(must=conditions) if conditions else None
+
+
+def search_chunks(query: str, limit: int = 5, **filters) -> List[models.ScoredPoint]:
+    """Searches stored chunks, optionally restricted with ``provenance_filter`` arguments."""
+
+    query_vector = next(iter(get_embedding_model().query_embed(query))).tolist()
+    return get_qdrant_client().query_points(
+      collection_name=COLLECTION_NAME,
+      query=query_vector,
+      query_filter=provenance_filter(**filters),
+      limit=limit,
+    ).points
+
+
+def delete_filing(accession_number: str) -> None:
+    """Deletes every point of one filing, e.g. before re-ingesting it."""
+
+    from qdrant_client import models
+
+    get_qdrant_client().delete(
+      collection_name=COLLECTION_NAME,
+      points_selector=models.FilterSelector(filter=provenance_filter(accession_number=accession_number)),
+      wait=True,
+    )
+    print(f"Deleted points of filing {accession_number} from Qdrant.")
+
+
+def existing_point_ids(ids: Iterable[str]) -> Set[str]:
+    """Return the ids among ``ids`` that already have a point in the collection."""
+
+    ids = list(dict.fromkeys(ids))
+    found = set()
+    for start in range(0, len(ids), _RETRIEVE_BATCH):
+        records = get_qdrant_client().retrieve(
+          collection_name=COLLECTION_NAME,
+          ids=ids[start:start + _RETRIEVE_BATCH],
+          with_payload=False,
+          with_vectors=False,
+        )
+        found.update(str(record.id) for record in records)
+    return found
+
+
+def delete_stale_points(source_file: str, keep_ids: Collection[str]) -> int:
+    """Delete points of ``source_file`` whose ids are not in ``keep_ids``; return how many.
+
+    Run after re-ingesting a filing, so chunks that were removed or changed
+    do not linger next to their replacements; an empty ``keep_ids`` deletes
+    every point of a filing that no longer produces chunks.
+    """
+
+    from qdrant_client import models
+
+    stale = models.Filter(
+      must=[models.FieldCondition(key="source_file", match=models.MatchValue(value=source_file))],
+      must_not=[models.HasIdCondition(has_id=list(keep_ids))] if keep_ids else None,
+    )
+    client = get_qdrant_client()
+    count = client.count(collection_name=COLLECTION_NAME, count_filter=stale, exact=True).count
+    if count:
+        client.delete(
+          collection_name=COLLECTION_NAME,
+          points_selector=models.FilterSelector(filter=stale),
+          wait=True,
+        )
+        print(f"Deleted {count} stale points of {source_file} from Qdrant.")
+    return count
+
+
+@dataclass
+class SyncResult:
+    """Points embedded, already present, and deleted as stale by ``sync_chunks``."""
+
+    embedded: int = 0
+    present: int = 0
+    deleted: int = 0
+
+    def report(self) -> str:
+        return (
+            f"Qdrant sync: {self.embedded} chunks embedded, {self.present} already stored, "
+            f"{self.deleted} stale points deleted."
+        )
+
+
+def sync_chunks(
+    chunks: List[dict],
+    vector_cache: Optional[Dict[str, List[float]]] = None,
+    content_char_limit: Optional[int] = 1000,
+    delete_stale: bool = True,
+    changed: Iterable[dict] = (),
+    keep: Iterable[dict] = (),
+) -> SyncResult:
+    """Embed and upsert the chunks whose points are missing from Qdrant or are ``changed``.
+
+    ``changed`` holds records whose metadata was rewritten, e.g. the
+    ``changed`` list of an ``UpsertResult``; their points are re-embedded.
+    ``chunks`` and ``keep`` must hold every chunk of the files they come
+    from: with ``delete_stale``, other points of the same ``source_file`` are
+    deleted. ``keep`` lists chunks that are not embedded now but whose
+    existing points stay, such as chunks whose enrichment failed.
+    """
+
+    ids = [point_id(chunk) for chunk in chunks]
+    present = existing_point_ids(ids) - {point_id(chunk) for chunk in changed}
+    missing = [chunk for chunk, id_ in zip(chunks, ids) if id_ not in present]
+    result = SyncResult(present=len(chunks) - len(missing))
+    if missing:
+        upsert_points(embed_chunks(missing, vector_cache, content_char_limit))
+        result.embedded = len(missing)
+
+    if delete_stale:
+        ids_by_file = defaultdict(set)
+        for chunk, id_ in zip(chunks, ids):
+            if chunk.get("source_file"):
+                ids_by_file[chunk["source_file"]].add(id_)
+        for chunk in keep:
+            if chunk.get("source_file") in ids_by_file:
+                ids_by_file[chunk["source_file"]].add(point_id(chunk))
+        for source_file, keep_ids in ids_by_file.items():
+            result.deleted += delete_stale_points(source_file, keep_ids)
+    print(result.report())
+    return result
+
+
+def create_embedding_from_chunks(
+    chunks : List[dict],
+    vector_cache: Optional[Dict[str, List[float]]] = None,
+    content_char_limit: Optional[int] = 1000,
+) -> str:
+    """Generates embedding from enriched chunk using fast_embed and stores them in Qdrant.
+
+    See ``embed_chunks`` for how point ids, near-duplicates and
+    ``content_char_limit`` are handled.
+    """
+
+    points = embed_chunks(chunks, vector_cache, content_char_limit)
+    print(f"Sample embedding {points[0].vector[:5]}. Upserting into Qdrant.")
+    upsert_points(points)
+
+    collection_info = get_qdrant_client().get_collection(collection_name=COLLECTION_NAME)
+    print(f"Collection '{COLLECTION_NAME}' info: {collection_info}")
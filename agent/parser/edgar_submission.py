@@ -0,0 +1,219 @@
+"""Split EDGAR full-submission files into their individual <DOCUMENT> sections."""
+
+from __future__ import annotations
+
+import re
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Collection, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_DOCUMENT_TYPES = (
+    "10-K",
+    "10-K/A",
+    "10-Q",
+    "10-Q/A",
+    "8-K",
+    "DEF 14A",
+    "EX-99.1",
+)
+
+_SUBMISSION_MARKER = b"<SEC-DOCUMENT>"
+_WRAPPER_TAGS = (b"XBRL", b"XML")
+_ACCESSION_NUMBER = re.compile(r"^\d{10}-\d{2}-\d{6}$")
+_HEADER_FIELDS = {
+    "ACCESSION NUMBER": "accession_number",
+    "CONFORMED SUBMISSION TYPE": "form_type",
+    "FILED AS OF DATE": "filing_date",
+}
+# The header sits at the top of the submission; stop looking after this many lines.
+_MAX_HEADER_LINES = 500
+
+
+@dataclass(frozen=True)
+class SubmissionDocument:
+    """Location and header tags of one <DOCUMENT> inside a full submission."""
+
+    type: str
+    sequence: Optional[int]
+    filename: Optional[str]
+    description: Optional[str]
+    text_start: int
+    text_end: int
+
+    @property
+    def size(self) -> int:
+        return self.text_end - self.text_start
+
+
+@dataclass(frozen=True)
+class FilingProvenance:
+    """Which filing a document came from; ``filing_date`` is ISO ``YYYY-MM-DD``."""
+
+    source_file: str
+    accession_number: Optional[str] = None
+    form_type: Optional[str] = None
+    filing_date: Optional[str] = None
+
+    def as_metadata(self) -> Dict[str, str]:
+        """The fields that are known, for stamping on element metadata."""
+        return {name: value for name, value in asdict(self).items() if value is not None}
+
+
+def read_submission_header(file_path: str | Path) -> Dict[str, str]:
+    """Return accession number, form type and filing date from a submission's <SEC-HEADER>."""
+
+    fields: Dict[str, str] = {}
+    with Path(file_path).open("rb") as handle:
+        for line_number, line in enumerate(handle):
+            stripped = line.strip()
+            if stripped.upper() in (b"</SEC-HEADER>", b"<DOCUMENT>") or line_number >= _MAX_HEADER_LINES:
+                break
+            name, separator, value = stripped.decode("utf-8", "ignore").partition(":")
+            field = _HEADER_FIELDS.get(name.strip().upper()) if separator else None
+            if field and value.strip():
+                fields[field] = value.strip()
+
+    filed = fields.get("filing_date", "")
+    if len(filed) == 8 and filed.isdigit():
+        fields["filing_date"] = f"{filed[:4]}-{filed[4:6]}-{filed[6:]}"
+    return fields
+
+
+def filing_provenance(file_path: str | Path) -> FilingProvenance:
+    """Provenance of a file, from its submission header or its download path.
+
+    sec-edgar-downloader stores filings as ``<ticker>/<form>/<accession>/<file>``;
+    values in a full submission's header take precedence over the path.
+    """
+
+    file_path = Path(file_path)
+    fields: Dict[str, str] = {}
+    parts = file_path.parts
+    if len(parts) >= 3 and _ACCESSION_NUMBER.match(parts[-2]):
+        fields = {"accession_number": parts[-2], "form_type": parts[-3]}
+    if is_full_submission(file_path):
+        fields.update(read_submission_header(file_path))
+    return FilingProvenance(source_file=file_path.as_posix(), **fields)
+
+
+def is_full_submission(file_path: str | Path) -> bool:
+    """Return True if ``file_path`` looks like an EDGAR full-submission file."""
+
+    file_path = Path(file_path)
+    if file_path.name == "full-submission.txt":
+        return True
+    try:
+        with file_path.open("rb") as handle:
+            return handle.read(len(_SUBMISSION_MARKER)) == _SUBMISSION_MARKER
+    except OSError:
+        return False
+
+
+def index_submission(file_path: str | Path) -> List[SubmissionDocument]:
+    """Stream a submission once and record each document's tags and byte range.
+
+    Only the header lines of each document are decoded; the bodies (including
+    uuencoded binaries) are skipped over and never held in memory.
+    """
+
+    documents: List[SubmissionDocument] = []
+    tags: dict[str, str] = {}
+    in_document = False
+    text_start: Optional[int] = None
+    offset = 0
+
+    with Path(file_path).open("rb") as handle:
+        for line in handle:
+            line_start = offset
+            offset += len(line)
+            stripped = line.strip()
+
+            if text_start is not None:
+                # Body lines are only compared by length first so large payloads stay cheap.
+                if len(stripped) == 7 and stripped.upper() == b"</TEXT>":
+                    documents.append(_build_document(tags, text_start, line_start))
+                    text_start = None
+                continue
+
+            if stripped.upper() == b"<DOCUMENT>":
+                in_document = True
+                tags = {}
+            elif stripped.upper() == b"</DOCUMENT>":
+                in_document = False
+            elif in_document and stripped.upper() == b"<TEXT>":
+                text_start = offset
+            elif in_document and stripped.startswith(b"<") and b">" in stripped:
+                name, _, value = stripped[1:].partition(b">")
+                tags[name.decode("ascii", "ignore").upper()] = value.decode(
+                    "utf-8", "ignore"
+                ).strip()
+
+    return documents
+
+
+def read_document(file_path: str | Path, document: SubmissionDocument) -> bytes:
+    """Return the body of ``document`` with any <XBRL>/<XML> wrapper removed."""
+
+    with Path(file_path).open("rb") as handle:
+        handle.seek(document.text_start)
+        body = handle.read(document.size)
+
+    return _unwrap(body)
+
+
+def iter_selected_documents(
+    file_path: str | Path,
+    document_types: Collection[str] = DEFAULT_DOCUMENT_TYPES,
+) -> Iterator[Tuple[SubmissionDocument, bytes]]:
+    """Yield ``(document, body)`` for documents whose TYPE is in ``document_types``.
+
+    Uuencoded payloads are always skipped, even when their type is selected.
+    """
+
+    wanted = {doc_type.upper() for doc_type in document_types}
+    documents = index_submission(file_path)
+    skipped = 0
+
+    for document in documents:
+        if document.type.upper() not in wanted:
+            skipped += 1
+            continue
+
+        body = read_document(file_path, document)
+        if _is_uuencoded(body):
+            skipped += 1
+            continue
+        yield document, body
+
+    print(
+        f"Selected {len(documents) - skipped} of {len(documents)} documents "
+        f"from submission {file_path}"
+    )
+
+
+def _build_document(tags: dict[str, str], start: int, end: int) -> SubmissionDocument:
+    sequence = tags.get("SEQUENCE")
+    return SubmissionDocument(
+        type=tags.get("TYPE", ""),
+        sequence=int(sequence) if sequence and sequence.isdigit() else None,
+        filename=tags.get("FILENAME"),
+        description=tags.get("DESCRIPTION"),
+        text_start=start,
+        text_end=end,
+    )
+
+
+def _unwrap(body: bytes) -> bytes:
+    stripped = body.strip()
+    for tag in _WRAPPER_TAGS:
+        opening, closing = b"<" + tag + b">", b"</" + tag + b">"
+        head = stripped[: len(opening)].upper()
+        tail = stripped[-len(closing) :].upper()
+        if head == opening and tail == closing:
+            return stripped[len(opening) : -len(closing)].strip()
+    return body
+
+
+def _is_uuencoded(body: bytes) -> bool:
+    head = body.lstrip()[:16].lower()
+    return head.startswith(b"begin ") or head.startswith(b"<pdf>")
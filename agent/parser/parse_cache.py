@@ -0,0 +1,194 @@
+"""Content-addressed on-disk cache for partitioned Element lists."""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, List, Mapping, Optional
+
+from unstructured.__version__ import __version__ as UNSTRUCTURED_VERSION
+from unstructured.documents.elements import Element
+from unstructured.staging.base import elements_from_dicts, elements_to_dicts
+
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+_HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def file_digest(file_path: str | Path) -> str:
+    """Return the SHA-256 hex digest of a file's content, read in blocks."""
+
+    digest = hashlib.sha256()
+    with Path(file_path).open("rb") as source:
+        for block in iter(lambda: source.read(_HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """Store serialized Element lists keyed by file content and partition parameters.
+
+    Entries live under a directory named after the installed ``unstructured``
+    version, so an upgrade never serves elements produced by an older
+    partitioner. Stale ``unstructured-*`` version directories are removed on
+    construction unless ``prune_stale_versions`` is disabled; anything else
+    under ``cache_dir`` is left alone. The cache is bounded to ``max_bytes``
+    and evicts least recently used entries first. Its size is scanned once
+    and then tracked per ``put``, so a full scan only happens when the
+    tracked size crosses the bound. Each process tracks only its own writes,
+    which makes the bound approximate when several processes share a cache.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | Path,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        *,
+        version: str = UNSTRUCTURED_VERSION,
+        prune_stale_versions: bool = True,
+    ) -> None:
+        self.root = Path(cache_dir)
+        self.version = version
+        self.max_bytes = max_bytes
+        # Bytes under entries_dir as last scanned plus what this process wrote since.
+        self._total_bytes: Optional[int] = None
+        self.entries_dir.mkdir(parents=True, exist_ok=True)
+        if prune_stale_versions:
+            self.invalidate_stale_versions()
+
+    @property
+    def entries_dir(self) -> Path:
+        return self.root / f"unstructured-{self.version}"
+
+    def key(
+        self,
+        file_path: str | Path,
+        params: Mapping[str, Any],
+        *,
+        content_digest: Optional[str] = None,
+    ) -> str:
+        """Return the cache key for ``file_path`` partitioned with ``params``.
+
+        Callers deriving several keys from one file (e.g. per page range) can
+        pass a precomputed ``content_digest`` to avoid rehashing the file.
+        """
+
+        digest = hashlib.sha256()
+        digest.update((content_digest or file_digest(file_path)).encode("ascii"))
+        digest.update(json.dumps(params, sort_keys=True, default=str).encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[List[Element]]:
+        """Return cached elements for ``key`` or ``None`` on a miss."""
+
+        entry = self._entry_path(key)
+        try:
+            with entry.open("r", encoding="utf-8") as cached:
+                payload = json.load(cached)
+        except (OSError, ValueError):
+            return None
+
+        # Refresh the access time used for LRU eviction.
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        return elements_from_dicts(payload)
+
+    def put(self, key: str, elements: List[Element]) -> None:
+        """Persist ``elements`` under ``key`` and enforce the size bound."""
+
+        entry = self._entry_path(key)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+
+        try:
+            replaced_bytes = entry.stat().st_size
+        except OSError:
+            replaced_bytes = 0
+
+        # Write to a temporary file first so concurrent readers never see a partial entry.
+        fd, tmp_name = tempfile.mkstemp(dir=entry.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as tmp_file:
+                json.dump(elements_to_dicts(elements), tmp_file)
+            written_bytes = os.path.getsize(tmp_name)
+            os.replace(tmp_name, entry)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+        if self._total_bytes is None:
+            self.evict()
+        else:
+            self._total_bytes += written_bytes - replaced_bytes
+            if self._total_bytes > self.max_bytes:
+                self.evict()
+
+    def evict(self) -> int:
+        """Delete least recently used entries until the cache fits ``max_bytes``."""
+
+        entries = []
+        total_bytes = 0
+        for entry in self.entries_dir.glob("*/*.json"):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+            total_bytes += stat.st_size
+
+        removed = 0
+        for _, size, entry in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            entry.unlink(missing_ok=True)
+            total_bytes -= size
+            removed += 1
+
+        self._total_bytes = total_bytes
+        return removed
+
+    def invalidate_stale_versions(self) -> int:
+        """Remove entries written by other ``unstructured`` versions."""
+
+        removed = 0
+        for version_dir in self.root.glob("unstructured-*"):
+            if version_dir.is_dir() and version_dir != self.entries_dir:
+                shutil.rmtree(version_dir, ignore_errors=True)
+                removed += 1
+        if removed:
+            print(f"Removed {removed} stale parse cache version(s) from {self.root}")
+        return removed
+
+    def clear(self) -> None:
+        """Remove every cached entry for the current version."""
+
+        shutil.rmtree(self.entries_dir, ignore_errors=True)
+        self.entries_dir.mkdir(parents=True, exist_ok=True)
+        self._total_bytes = 0
+
+    def _entry_path(self, key: str) -> Path:
+        return self.entries_dir / key[:2] / f"{key}.json"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage the on-disk parse cache.")
+    parser.add_argument("command", choices=["clear", "prune"])
+    parser.add_argument("--dir", required=True, help="Parse cache directory")
+    parser.add_argument("--max-mb", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024))
+    args = parser.parse_args()
+
+    cache = ParseCache(args.dir, max_bytes=args.max_mb * 1024 * 1024)
+    if args.command == "clear":
+        cache.clear()
+        print(f"Cleared parse cache at {cache.entries_dir}")
+    else:
+        print(f"Evicted {cache.evict()} entries from {cache.entries_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,45 +1,251 @@
+import io
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import List
+from typing import Collection, Deque, Generator, Iterator, List, Sequence, Tuple
 
 from unstructured.documents.elements import Element
-from unstructured.partition.auto import partition
 
+from agent.parser.edgar_submission import (
+    DEFAULT_DOCUMENT_TYPES,
+    filing_provenance,
+    is_full_submission,
+    iter_selected_documents,
+)
+from agent.parser.parse_cache import ParseCache
+from agent.parser.parse_ixbrl import HTML_SUFFIXES, parse_ixbrl_html
+from agent.parser.parse_pdf import PDF_SUFFIXES, parse_pdf_file
+from agent.parser.partition_options import PARTITION_KWARGS
 
-def _parse_file(file_path: Path) -> List[Element]:
-    """Parse a single document into unstructured Element objects."""
+
+def partition(**kwargs) -> List[Element]:
+    """``unstructured``'s auto partition, imported on first call since it is slow to import."""
+
+    from unstructured.partition.auto import partition as auto_partition
+
+    return auto_partition(**kwargs)
+
+
+def _partition_html_aware(
+    filename: str, fast_html: bool, data: bytes | None = None
+) -> List[Element]:
+    """Partition a file (or in-memory document), using the lxml path for HTML if enabled."""
+
+    if fast_html and Path(filename).suffix.lower() in HTML_SUFFIXES:
+        source = data if data is not None else Path(filename)
+        return parse_ixbrl_html(source, filename=Path(filename).name)
+    if data is not None:
+        return partition(file=io.BytesIO(data), metadata_filename=filename, **PARTITION_KWARGS)
+    return partition(filename=filename, **PARTITION_KWARGS)
+
+
+def _add_provenance(elements: List[Element], file_path: Path) -> List[Element]:
+    """Stamp source file, accession number, form type and filing date on every element."""
+
+    provenance = filing_provenance(file_path).as_metadata()
+    for element in elements:
+        for name, value in provenance.items():
+            setattr(element.metadata, name, value)
+    return elements
+
+
+def _parse_file(
+    file_path: Path,
+    cache: ParseCache | None = None,
+    document_types: Collection[str] = DEFAULT_DOCUMENT_TYPES,
+    fast_html: bool = False,
+) -> List[Element]:
+    """Parse a single document into unstructured Element objects with filing provenance."""
 
     try:
+        if file_path.suffix.lower() in PDF_SUFFIXES:
+            # PDFs are split into page ranges that are parsed and cached individually.
+            return _add_provenance(parse_pdf_file(file_path, cache=cache), file_path)
+
+        submission = is_full_submission(file_path)
+        cache_params = dict(PARTITION_KWARGS)
+        if submission:
+            cache_params["document_types"] = sorted(document_types)
+        if fast_html:
+            cache_params["html_parser"] = "lxml"
+        cache_key = cache.key(file_path, cache_params) if cache else None
+        if cache_key:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                print(f"Loaded cached elements for file: {file_path}")
+                return _add_provenance(cached, file_path)
+
         print(f"Parsing file: {file_path}")
-        return partition(
-            filename=str(file_path),
-            strategy="fast",
-            infer_table_structure=True,
-            include_page_breaks=True,
-            extract_images_in_pdf=False,
-        )
+        if submission:
+            elements = _parse_submission(file_path, document_types, fast_html)
+        else:
+            elements = _partition_html_aware(str(file_path), fast_html)
+
+        if cache_key:
+            cache.put(cache_key, elements)
+        return _add_provenance(elements, file_path)
     except Exception as exc:  # pragma: no cover - diagnostic logging only
         print(f"Error parsing file {file_path}: {exc}")
         return []
 
 
-def parse_html_file(file_path: str | Path) -> List[Element]:
+def _parse_submission(
+    file_path: Path, document_types: Collection[str], fast_html: bool = False
+) -> List[Element]:
+    """Partition only the selected <DOCUMENT> sections of a full submission."""
+
+    elements: List[Element] = []
+    for document, body in iter_selected_documents(file_path, document_types):
+        # Types such as 10-K/A contain a slash, which must not become a path separator.
+        filename = document.filename or f"{file_path.stem}-{document.type.replace('/', '_')}.txt"
+        elements.extend(_partition_html_aware(filename, fast_html, data=body))
+    return elements
+
+
+def _resolve_workers(workers: int | None) -> int:
+    """Translate the requested worker count into a concrete pool size."""
+
+    if workers is None:
+        return os.cpu_count() or 1
+    return max(1, workers)
+
+
+def _iter_parse_parallel(
+    files: Sequence[Path],
+    workers: int,
+    cache: ParseCache | None = None,
+    document_types: Collection[str] = DEFAULT_DOCUMENT_TYPES,
+    fast_html: bool = False,
+) -> Iterator[Tuple[Path, List[Element]]]:
+    """Parse files across a process pool, yielding results in input order.
+
+    At most ``2 * workers`` files are in flight so that parsed documents never
+    pile up faster than the consumer handles them. A file whose parse raises
+    is reported and yields no elements. A worker that dies breaks the whole
+    pool; the next unfinished file is then retried alone in a fresh process
+    (and skipped if that dies too) and the rest resume on a new pool.
+    """
+
+    remaining = deque(files)
+    args = (cache, document_types, fast_html)
+    while remaining:
+        broken = yield from _iter_pool(remaining, workers, args)
+        if broken:
+            file_path = remaining.popleft()
+            yield file_path, _parse_isolated(file_path, args)
+
+
+def _iter_pool(
+    remaining: Deque[Path], workers: int, args: tuple
+) -> Generator[Tuple[Path, List[Element]], None, bool]:
+    """Drain ``remaining`` through one pool; return ``True`` if the pool broke."""
+
+    window = 2 * workers
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # futures[i] parses remaining[i]; files leave ``remaining`` once yielded.
+        futures: Deque[Future] = deque()
+        while remaining:
+            while len(futures) < min(window, len(remaining)):
+                futures.append(executor.submit(_parse_file, remaining[len(futures)], *args))
+            try:
+                elements = futures.popleft().result()
+            except BrokenProcessPool:
+                print(f"A parser worker died; restarting the pool at {remaining[0]}")
+                return True
+            except Exception as exc:
+                print(f"Error parsing file {remaining[0]} in worker process: {exc}")
+                elements = []
+            yield remaining.popleft(), elements
+    return False
+
+
+def _parse_isolated(file_path: Path, args: tuple) -> List[Element]:
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        try:
+            return executor.submit(_parse_file, file_path, *args).result()
+        except BrokenProcessPool:
+            print(f"Error parsing file {file_path}: the worker process died")
+        except Exception as exc:
+            print(f"Error parsing file {file_path} in worker process: {exc}")
+    return []
+
+
+def parse_html_file(
+    file_path: str | Path,
+    cache: ParseCache | None = None,
+    document_types: Collection[str] = DEFAULT_DOCUMENT_TYPES,
+    fast_html: bool = False,
+) -> List[Element]:
     """Parse a single file into Element objects (public helper wrapper)."""
 
-    return _parse_file(Path(file_path))
+    return _parse_file(Path(file_path), cache, document_types, fast_html)
 
 
-def parse_html(path: str) -> List[Element]:
-    """Parse a file or directory of filings and return Element objects."""
+def iter_parse_html(
+    path: str | Path,
+    workers: int | None = 1,
+    cache: ParseCache | None = None,
+    document_types: Collection[str] = DEFAULT_DOCUMENT_TYPES,
+    fast_html: bool = False,
+) -> Iterator[Tuple[Path, List[Element]]]:
+    """Yield ``(file_path, elements)`` for each document under ``path``.
+
+    Documents are produced one at a time in sorted file order, so callers can
+    process a corpus with memory bounded by the largest document rather than
+    the whole tree. The remaining arguments behave as in ``parse_html``.
+    """
 
     path_obj = Path(path)
     if not path_obj.exists():
         raise FileNotFoundError(f"Path does not exist: {path}")
 
     if path_obj.is_file():
-        return _parse_file(path_obj)
+        yield path_obj, _parse_file(path_obj, cache, document_types, fast_html)
+        return
+
+    files = sorted(p for p in path_obj.rglob("*") if p.is_file())
+    pool_size = min(_resolve_workers(workers), len(files))
+
+    if pool_size <= 1:
+        for file_path in files:
+            yield file_path, _parse_file(file_path, cache, document_types, fast_html)
+    else:
+        print(f"Parsing {len(files)} files with {pool_size} worker processes")
+        yield from _iter_parse_parallel(
+            files, pool_size, cache, document_types, fast_html
+        )
+
+
+def parse_html(
+    path: str,
+    workers: int | None = 1,
+    cache: ParseCache | None = None,
+    document_types: Collection[str] = DEFAULT_DOCUMENT_TYPES,
+    fast_html: bool = False,
+) -> List[Element]:
+    """Parse a file or directory of filings and return Element objects.
+
+    ``workers`` controls how many processes parse files in parallel; ``1`` keeps
+    the original in-process behaviour and ``None`` uses every available core.
+    Elements are always returned in sorted file order. When ``cache`` is given,
+    unchanged files are served from it instead of being partitioned again.
+    EDGAR full-submission files are split first and only the ``document_types``
+    sections are partitioned; exhibits, XBRL and binary payloads are skipped.
+    With ``fast_html`` HTML documents go through the lxml iXBRL parser instead
+    of ``partition``.
+    """
 
     elements: List[Element] = []
-    for file_path in sorted(p for p in path_obj.rglob("*") if p.is_file()):
-        elements.extend(_parse_file(file_path))
+    documents = iter_parse_html(
+        path,
+        workers=workers,
+        cache=cache,
+        document_types=document_types,
+        fast_html=fast_html,
+    )
+    for _, parsed in documents:
+        elements.extend(parsed)
 
     return elements
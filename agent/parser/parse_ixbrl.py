@@ -0,0 +1,235 @@
+"""Fast lxml-based parser for inline-XBRL and plain HTML SEC filings.
+
+This is a streaming alternative to ``unstructured.partition.auto`` for HTML
+filings. It walks the document once with ``lxml.etree.iterparse``, drops hidden
+XBRL sections and styling, and emits the ``Title``/``NarrativeText``/``Table``
+(plus ``PageBreak``) elements that ``title_chunker`` consumes.
+"""
+
+from __future__ import annotations
+
+import html
+import io
+import re
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from lxml import etree
+from unstructured.documents.elements import (
+    Element,
+    ElementMetadata,
+    NarrativeText,
+    PageBreak,
+    Table,
+    Title,
+    assign_and_map_hash_ids,
+)
+
+HTML_SUFFIXES = {".htm", ".html", ".xhtml"}
+
+_SKIPPED_TAGS = {"head", "script", "style", "title", "ix:header"}
+_HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+_BLOCK_TAGS = _HEADING_TAGS | {
+    "p", "div", "li", "center", "blockquote", "pre", "section", "article", "body", "html"
+}
+_BOLD_TAGS = {"b", "strong"}
+
+_HIDDEN_STYLE = re.compile(r"display\s*:\s*none", re.IGNORECASE)
+_BOLD_STYLE = re.compile(r"font-weight\s*:\s*(bold|[6-9]00)", re.IGNORECASE)
+_BREAK_BEFORE = re.compile(r"(page-)?break-before\s*:\s*(always|page)", re.IGNORECASE)
+_BREAK_AFTER = re.compile(r"(page-)?break-after\s*:\s*(always|page)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+_MAX_TITLE_CHARS = 200
+
+
+def _normalize(text: str) -> str:
+    return _WHITESPACE.sub(" ", text.replace("\xa0", " ")).strip()
+
+
+def _style(elem) -> str:
+    return elem.get("style") or ""
+
+
+def _is_bold_node(elem) -> bool:
+    return elem.tag in _BOLD_TAGS or bool(_BOLD_STYLE.search(_style(elem)))
+
+
+def _bold_text(elem) -> str:
+    """Text of ``elem`` (without its tail) that sits inside bold markup."""
+
+    if _is_bold_node(elem):
+        return "".join(elem.itertext())
+    return "".join(_bold_text(child) for child in elem if isinstance(child.tag, str))
+
+
+def _is_title(tag: str, text: str, bold_text: str) -> bool:
+    if tag in _HEADING_TAGS:
+        return True
+    if len(text) > _MAX_TITLE_CHARS or text[-1] in ".,;:":
+        return False
+    # Bold only counts when it covers the whole block, not one emphasised word.
+    fully_bold = "".join(bold_text.split()) == "".join(text.split())
+    return fully_bold or (text.isupper() and any(c.isalpha() for c in text))
+
+
+def _table_rows(table) -> Tuple[List[List[str]], int]:
+    """Cell texts by row, and how many leading rows are headers.
+
+    Cells keep their positions; only columns that are empty in every row are
+    dropped. Leading rows of ``<th>`` cells are headers, otherwise the first row is.
+    """
+
+    rows, header_flags = [], []
+    for row in table.iter("tr"):
+        cells = [
+            cell for cell in row if isinstance(cell.tag, str) and cell.tag in ("td", "th")
+        ]
+        texts = [_normalize("".join(cell.itertext())) for cell in cells]
+        if any(texts):
+            rows.append(texts)
+            header_flags.append(all(cell.tag == "th" for cell in cells))
+    width = max((len(row) for row in rows), default=0)
+    rows = [row + [""] * (width - len(row)) for row in rows]
+    keep = [column for column in range(width) if any(row[column] for row in rows)]
+    rows = [[row[column] for column in keep] for row in rows]
+
+    header_rows = 0
+    while header_rows < len(rows) and header_flags[header_rows]:
+        header_rows += 1
+    return rows, header_rows or min(1, len(rows))
+
+
+def _table_html(rows: List[List[str]], header_rows: int = 1) -> str:
+    body = "".join(
+        "<tr>"
+        + "".join(
+            f"<th>{html.escape(cell)}</th>" if index < header_rows else f"<td>{html.escape(cell)}</td>"
+            for cell in row
+        )
+        + "</tr>"
+        for index, row in enumerate(rows)
+    )
+    return f"<table>{body}</table>"
+
+
+def parse_ixbrl_html(
+    source: str | Path | bytes, filename: Optional[str] = None
+) -> List[Element]:
+    """Parse an HTML/iXBRL filing into unstructured Element objects.
+
+    ``source`` is a path or the raw document bytes; ``filename`` overrides the
+    name recorded in element metadata.
+    """
+
+    if isinstance(source, bytes):
+        stream = io.BytesIO(source)
+    else:
+        source = Path(source)
+        filename = filename or source.name
+        stream = source.open("rb")
+
+    elements: List[Element] = []
+    page_number = 1
+    hidden_depth = 0
+    table_depth = 0
+    # Open block elements, innermost last.
+    blocks: list = []
+
+    def metadata(**extra) -> ElementMetadata:
+        return ElementMetadata(
+            filename=filename, filetype="text/html", page_number=page_number, **extra
+        )
+
+    def page_break() -> None:
+        nonlocal page_number
+        # Collapse consecutive breaks so empty pages do not inflate page numbers.
+        if elements and not isinstance(elements[-1], PageBreak):
+            elements.append(PageBreak(text="", metadata=metadata()))
+            page_number += 1
+
+    def emit_leading(child) -> None:
+        """Emit the enclosing block's text that precedes ``child``, so output keeps document order."""
+
+        if not blocks:
+            return
+        parent = blocks[-1]
+        before = []
+        for node in parent:
+            if node is child:
+                break
+            before.append(node)
+        parts = [parent.text or ""]
+        for node in before:
+            if isinstance(node.tag, str):
+                parts.append("".join(node.itertext()))
+            parts.append(node.tail or "")
+        raw = "".join(parts)
+        text = _normalize(raw)
+        if text:
+            if _is_bold_node(parent):
+                bold_text = raw
+            else:
+                bold_text = "".join(_bold_text(node) for node in before if isinstance(node.tag, str))
+            element_cls = Title if _is_title(parent.tag, text, bold_text) else NarrativeText
+            elements.append(element_cls(text=text, metadata=metadata()))
+        parent.text = None
+        for node in before:
+            parent.remove(node)
+
+    with stream:
+        events = etree.iterparse(
+            stream, events=("start", "end"), html=True, recover=True, huge_tree=True
+        )
+        for event, elem in events:
+            tag = elem.tag if isinstance(elem.tag, str) else ""
+            style = _style(elem)
+
+            if event == "start":
+                if hidden_depth or tag in _SKIPPED_TAGS or _HIDDEN_STYLE.search(style):
+                    hidden_depth += 1
+                    continue
+                if not table_depth and (tag == "table" or tag in _BLOCK_TAGS):
+                    emit_leading(elem)
+                    if tag in _BLOCK_TAGS:
+                        blocks.append(elem)
+                if tag == "table":
+                    table_depth += 1
+                if _BREAK_BEFORE.search(style):
+                    page_break()
+                continue
+
+            if hidden_depth:
+                hidden_depth -= 1
+                elem.clear(keep_tail=True)
+                continue
+
+            if tag == "table":
+                table_depth -= 1
+                if table_depth == 0:
+                    rows, header_rows = _table_rows(elem)
+                    if rows:
+                        elements.append(
+                            Table(
+                                text=" ".join(cell for row in rows for cell in row if cell),
+                                metadata=metadata(text_as_html=_table_html(rows, header_rows)),
+                            )
+                        )
+                    elem.clear(keep_tail=True)
+            elif tag in _BLOCK_TAGS and not table_depth:
+                if blocks and blocks[-1] is elem:
+                    blocks.pop()
+                text = _normalize("".join(elem.itertext()))
+                if text:
+                    element_cls = Title if _is_title(tag, text, _bold_text(elem)) else NarrativeText
+                    elements.append(element_cls(text=text, metadata=metadata()))
+                # Clearing emitted blocks keeps their text out of enclosing blocks.
+                elem.clear(keep_tail=True)
+
+            if not table_depth and _BREAK_AFTER.search(style):
+                page_break()
+
+    if elements and isinstance(elements[-1], PageBreak):
+        elements.pop()
+
+    return assign_and_map_hash_ids(elements)
@@ -0,0 +1,198 @@
+"""Page-parallel PDF parsing that merges elements back in page order."""
+
+from __future__ import annotations
+
+import io
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, List, Optional, Sequence, Tuple
+
+from unstructured.documents.elements import (
+    Element,
+    ElementMetadata,
+    PageBreak,
+    assign_and_map_hash_ids,
+)
+
+from agent.parser.parse_cache import ParseCache, file_digest
+from agent.parser.partition_options import PARTITION_KWARGS
+
+PDF_SUFFIXES = {".pdf"}
+PAGES_PER_RANGE = 8
+
+PageRange = Tuple[int, int]
+
+
+def page_ranges(page_count: int, pages_per_range: int = PAGES_PER_RANGE) -> List[PageRange]:
+    """Split ``page_count`` pages into 1-based inclusive ``(first, last)`` ranges."""
+
+    return [
+        (first, min(first + pages_per_range - 1, page_count))
+        for first in range(1, page_count + 1, pages_per_range)
+    ]
+
+
+def _pypdf():
+    # pypdf is only needed for PDFs; importing it lazily keeps HTML-only runs free of it.
+    try:
+        import pypdf
+    except ImportError as exc:
+        raise ImportError("PDF parsing needs the 'pypdf' package: pip install pypdf") from exc
+    return pypdf
+
+
+def _extract_pages(reader: Any, page_range: PageRange) -> bytes:
+    """Write the pages in ``page_range`` of an open ``PdfReader`` to a standalone in-memory PDF."""
+
+    writer = _pypdf().PdfWriter()
+    first, last = page_range
+    for index in range(first - 1, last):
+        writer.add_page(reader.pages[index])
+
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def _partition_pdf_bytes(data: bytes, filename: str) -> List[Element]:
+    # partition_pdf needs the optional unstructured[pdf] extra, so import it lazily.
+    from unstructured.partition.pdf import partition_pdf
+
+    return partition_pdf(
+        file=io.BytesIO(data), metadata_filename=filename, **PARTITION_KWARGS
+    )
+
+
+def _parse_page_range(data: bytes, filename: str, page_range: PageRange) -> List[Element]:
+    """Parse one extracted page range and shift page numbers to document positions."""
+
+    elements = _partition_pdf_bytes(data, filename)
+    offset = page_range[0] - 1
+    for element in elements:
+        element.metadata.page_number = (element.metadata.page_number or 1) + offset
+    return elements
+
+
+def _resolve_workers(workers: Optional[int]) -> int:
+    if workers is not None:
+        return max(1, workers)
+    # Inside a parse_html worker process, stay single-process to avoid oversubscription.
+    if multiprocessing.parent_process() is not None:
+        return 1
+    return os.cpu_count() or 1
+
+
+def _parse_ranges(
+    file_path: Path, reader: Any, ranges: Sequence[PageRange], workers: int
+) -> List[Optional[List[Element]]]:
+    """Parse ranges in order; a failed range is reported and yields ``None``.
+
+    Pages are extracted from the one open ``reader``; workers only get the bytes.
+    """
+
+    results: List[Optional[List[Element]]] = []
+    if workers <= 1 or len(ranges) <= 1:
+        for page_range in ranges:
+            try:
+                data = _extract_pages(reader, page_range)
+                results.append(_parse_page_range(data, file_path.name, page_range))
+            except Exception as exc:
+                print(f"Error parsing pages {page_range} of {file_path}: {exc}")
+                results.append(None)
+        return results
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as executor:
+        futures: List[Future] = []
+        for page_range in ranges:
+            future: Future = Future()
+            try:
+                data = _extract_pages(reader, page_range)
+                future = executor.submit(_parse_page_range, data, file_path.name, page_range)
+            except Exception as exc:
+                future.set_exception(exc)
+            futures.append(future)
+        for page_range, future in zip(ranges, futures):
+            try:
+                results.append(future.result())
+            except Exception as exc:
+                print(f"Error parsing pages {page_range} of {file_path}: {exc}")
+                results.append(None)
+    return results
+
+
+def parse_pdf_file(
+    file_path: str | Path,
+    cache: ParseCache | None = None,
+    workers: Optional[int] = None,
+    pages_per_range: int = PAGES_PER_RANGE,
+) -> List[Element]:
+    """Parse a PDF into Element objects by splitting it into page ranges.
+
+    Ranges are partitioned in parallel worker processes (``None`` uses every
+    core) and merged back in page order with document-level ``page_number``
+    metadata. With ``cache``, each parsed range is stored separately, so a
+    re-run only parses ranges that were not completed before. Returns the same
+    ``List[Element]`` contract as ``parse_html_file``.
+    """
+
+    file_path = Path(file_path)
+    try:
+        reader = _pypdf().PdfReader(str(file_path))
+        page_count = len(reader.pages)
+    except ImportError:
+        raise
+    except Exception as exc:
+        print(f"Error reading PDF {file_path}: {exc}")
+        return []
+
+    ranges = page_ranges(page_count, pages_per_range)
+    digest = file_digest(file_path) if cache else None
+    keys = [
+        cache.key(
+            file_path,
+            {**PARTITION_KWARGS, "pages": list(page_range)},
+            content_digest=digest,
+        )
+        if cache
+        else None
+        for page_range in ranges
+    ]
+
+    parsed: List[Optional[List[Element]]] = [
+        cache.get(key) if cache else None for key in keys
+    ]
+    missing = [index for index, elements in enumerate(parsed) if elements is None]
+    print(
+        f"Parsing {len(missing)} of {len(ranges)} page ranges of {file_path} "
+        f"({page_count} pages)"
+    )
+
+    fresh = _parse_ranges(
+        file_path, reader, [ranges[i] for i in missing], _resolve_workers(workers)
+    )
+    for index, elements in zip(missing, fresh):
+        parsed[index] = elements
+        if cache and elements is not None:
+            cache.put(keys[index], elements)
+
+    merged: List[Element] = []
+    for elements in parsed:
+        if not elements:
+            continue
+        if merged and PARTITION_KWARGS["include_page_breaks"]:
+            # partition only inserts breaks within a range; restore the ones between ranges.
+            merged.append(
+                PageBreak(
+                    text="",
+                    metadata=ElementMetadata(
+                        filename=file_path.name,
+                        page_number=merged[-1].metadata.page_number,
+                    ),
+                )
+            )
+        merged.extend(elements)
+
+    # Rehash ids now that page numbers are document-wide rather than per range.
+    return assign_and_map_hash_ids(merged)
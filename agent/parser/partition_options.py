@@ -0,0 +1,8 @@
+"""Partition parameters shared by the HTML and PDF paths; they are part of every parse cache key."""
+
+PARTITION_KWARGS = {
+    "strategy": "fast",
+    "infer_table_structure": True,
+    "include_page_breaks": True,
+    "extract_images_in_pdf": False,
+}
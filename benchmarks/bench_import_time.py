@@ -0,0 +1,104 @@
+"""Measure how long the pipeline's modules take to import in a fresh interpreter.
+
+Runs ``python -X importtime -c "import <module>"`` once per module and reports
+the total import time and the slowest imports it pulled in. With ``--max-ms``
+it exits non-zero when a module takes longer, so it can guard against heavy
+imports creeping back into module scope.
+
+Usage:
+    uv run python -m benchmarks.bench_import_time
+    uv run python -m benchmarks.bench_import_time agent.embedder.fast_embed_qdrant --max-ms 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import List, Tuple
+
+MODULES = [
+    "main",
+    "agent.embedder.fast_embed_qdrant",
+    "agent.parser.parse_html",
+    "agent.chunk_generation.token_chunker",
+    "utils.sqlite_db",
+]
+
+_ROOT = Path(__file__).resolve().parent.parent
+# "import time: self [us] | cumulative | imported package"
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+_PROJECT_PACKAGES = {"agent", "llm", "utils", "main"}
+
+
+def import_times(module: str) -> List[Tuple[str, int, int]]:
+    """Return ``(name, cumulative_us, depth)`` for the imports made by ``import module``.
+
+    ``-X importtime`` lists a module after everything it imported, so the
+    entries are the ones between the previous top-level import and ``module``.
+    """
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    times = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        depth = len(match.group(3)) // 2
+        if depth == 0 and match.group(4) != module:
+            # A startup import (site, .pth files) rather than part of `module`.
+            times = []
+            continue
+        times.append((match.group(4), int(match.group(2)), depth))
+    return times
+
+
+def _project_module(name: str) -> bool:
+    return name.split(".")[0] in _PROJECT_PACKAGES
+
+
+def direct_dependencies(times: List[Tuple[str, int, int]]) -> List[Tuple[str, int]]:
+    """Third-party imports made directly by project modules, slowest first."""
+
+    dependencies = []
+    for position, (name, us, depth) in enumerate(times):
+        if _project_module(name):
+            continue
+        parent = next((other for other, _, d in times[position + 1:] if d < depth), None)
+        if parent is not None and _project_module(parent):
+            dependencies.append((name, us))
+    return sorted(dependencies, key=lambda item: item[1], reverse=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    parser.add_argument("--top", type=int, default=5, help="Slowest imports listed per module")
+    parser.add_argument("--max-ms", type=float, default=None, help="Fail when a module is slower")
+    args = parser.parse_args()
+
+    too_slow = []
+    for module in args.modules:
+        times = import_times(module)
+        total_ms = times[-1][1] / 1000 if times else 0.0
+        print(f"{module:<40} {total_ms:8.1f} ms")
+        for name, us in direct_dependencies(times)[:args.top]:
+            print(f"    {name:<36} {us / 1000:8.1f} ms")
+        if args.max_ms is not None and total_ms > args.max_ms:
+            too_slow.append(module)
+
+    if too_slow:
+        sys.exit(f"Slower to import than {args.max_ms:.0f} ms: {', '.join(too_slow)}")
+
+
+if __name__ == "__main__":
+    main()
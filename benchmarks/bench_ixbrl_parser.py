@@ -0,0 +1,118 @@
+"""Compare the lxml iXBRL parser against unstructured partition on HTML filings.
+
+Reports throughput (MB/s) for both paths and output parity: element counts by
+type, table counts and how much of partition's text the fast path recovers.
+
+Usage:
+    uv run python -m benchmarks.bench_ixbrl_parser path/to/msft-10k.htm [...]
+    uv run python -m benchmarks.bench_ixbrl_parser --synthetic 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Callable, List
+
+from unstructured.partition.auto import partition
+
+from agent.parser.parse_html import PARTITION_KWARGS
+from agent.parser.parse_ixbrl import parse_ixbrl_html
+
+_WORD = re.compile(r"[A-Za-z0-9$%,.]+")
+
+
+def _synthetic_ixbrl(rng: random.Random, sections: int) -> str:
+    hidden_facts = "".join(
+        f'<ix:nonNumeric name="dei:Fact{i}" contextRef="c{i}">{rng.random()}</ix:nonNumeric>'
+        for i in range(2000)
+    )
+    parts = [
+        '<?xml version="1.0" encoding="utf-8"?>',
+        '<html xmlns="http://www.w3.org/1999/xhtml" '
+        'xmlns:ix="http://www.xbrl.org/2013/inlineXBRL"><head><title>10-K</title></head><body>',
+        f'<div style="display:none"><ix:header><ix:hidden>{hidden_facts}</ix:hidden></ix:header></div>',
+    ]
+    for section in range(sections):
+        parts.append(
+            '<div style="margin-top:12pt"><span style="font-weight:700;font-size:10pt">'
+            f"Item {section + 1}. Section heading {section}</span></div>"
+        )
+        for paragraph in range(8):
+            parts.append(
+                '<div style="text-align:justify"><span style="font-size:10pt;color:#000000">'
+                f"Revenue for segment {paragraph} increased "
+                f'<ix:nonFraction name="us-gaap:Revenues" contextRef="c1" unitRef="usd" '
+                f'decimals="-6" scale="6">{rng.randint(100, 9999):,}</ix:nonFraction> '
+                "million driven by cloud services and continued demand.</span></div>"
+            )
+        parts.append('<table style="border-collapse:collapse">')
+        for row in range(10):
+            parts.append(
+                f'<tr><td style="padding:2px"><span>Line item {row}</span></td>'
+                f'<td></td><td style="text-align:right"><span>{rng.randint(1, 999):,}</span></td></tr>'
+            )
+        parts.append('</table><hr style="page-break-after:always"/>')
+    parts.append("</body></html>")
+    return "\n".join(parts)
+
+
+def _time(parse: Callable[[], List], repeats: int):
+    elements = []
+    start = time.perf_counter()
+    for _ in range(repeats):
+        elements = parse()
+    return elements, (time.perf_counter() - start) / repeats
+
+
+def _words(elements) -> Counter:
+    words: Counter = Counter()
+    for element in elements:
+        words.update(_WORD.findall(element.text))
+    return words
+
+
+def compare(path: Path, repeats: int) -> None:
+    size_mb = path.stat().st_size / (1024 * 1024)
+    reference, slow = _time(lambda: partition(filename=str(path), **PARTITION_KWARGS), repeats)
+    fast_elements, fast = _time(lambda: parse_ixbrl_html(path), repeats)
+
+    reference_words = _words(reference)
+    recovered = sum((reference_words & _words(fast_elements)).values())
+    recall = recovered / max(1, sum(reference_words.values()))
+
+    print(f"\n{path.name} ({size_mb:.2f} MB)")
+    print(f"  partition: {slow:8.3f}s  {size_mb / slow:8.2f} MB/s")
+    print(f"  lxml:      {fast:8.3f}s  {size_mb / fast:8.2f} MB/s  ({slow / fast:.1f}x)")
+    print(f"  element types (partition): {dict(Counter(e.category for e in reference))}")
+    print(f"  element types (lxml):      {dict(Counter(e.category for e in fast_elements))}")
+    print(f"  text recall vs partition:  {recall:.1%}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("paths", nargs="*", type=Path)
+    parser.add_argument("--synthetic", type=int, default=0, help="Number of synthetic filings")
+    parser.add_argument("--sections", type=int, default=40)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = list(args.paths)
+        rng = random.Random(0)
+        for index in range(args.synthetic or (0 if paths else 1)):
+            synthetic = Path(tmp) / f"synthetic-{index}.htm"
+            synthetic.write_text(_synthetic_ixbrl(rng, args.sections), encoding="utf-8")
+            paths.append(synthetic)
+
+        for path in paths:
+            compare(path, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
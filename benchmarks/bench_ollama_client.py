@@ -0,0 +1,74 @@
+"""Measure per-request client overhead: a new Client per call vs the shared pooled client.
+
+Runs against the local fake Ollama server with zero simulated latency, so the
+timings are pure client setup, connection and request overhead.
+
+Usage:
+    uv run python -m benchmarks.bench_ollama_client --requests 500 --workers 1 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from ollama import Client
+
+from llm.ollama_client import OllamaSettings, get_client, reset_clients
+from testing.fake_ollama_server import FakeOllamaServer
+
+_MESSAGES = [{"role": "user", "content": "Summarise: revenue increased 10%."}]
+
+
+def _per_call_client(host: str) -> None:
+    # Previous behaviour of generate_enriched_chunk: construct a Client for every chunk.
+    Client(host=host).chat(model="qwen2.5:1.5b", messages=_MESSAGES, format="json")
+
+
+def _shared_client(host: str) -> None:
+    get_client().chat(model="qwen2.5:1.5b", messages=_MESSAGES, format="json")
+
+
+def _run(call: Callable[[str], None], host: str, requests: int, workers: int) -> float:
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(lambda _: call(host), range(requests)))
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    args = parser.parse_args()
+
+    with FakeOllamaServer(latency=0, capacity=64, max_in_flight=1024) as server:
+        for workers in args.workers:
+            reset_clients(OllamaSettings(host=server.url, pool_size=workers))
+            # Warm up both paths so imports and the first connection are not timed.
+            _run(_per_call_client, server.url, workers, workers)
+            _run(_shared_client, server.url, workers, workers)
+
+            connections_before = len(server.connections)
+            per_call = _run(_per_call_client, server.url, args.requests, workers)
+            per_call_connections = len(server.connections) - connections_before
+
+            connections_before = len(server.connections)
+            shared = _run(_shared_client, server.url, args.requests, workers)
+            shared_connections = len(server.connections) - connections_before
+
+            print(
+                f"workers={workers:<3} "
+                f"per-call Client: {per_call / args.requests * 1000:6.2f} ms/request "
+                f"({per_call_connections} connections)  "
+                f"shared client: {shared / args.requests * 1000:6.2f} ms/request "
+                f"({shared_connections} connections)  "
+                f"overhead removed: {(per_call - shared) / args.requests * 1000:6.2f} ms/request"
+            )
+    reset_clients()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Measure parse_html wall-clock time against worker count on synthetic filings.
+
+Usage:
+    uv run python -m benchmarks.bench_parse_html --filings 64 --workers 1 2 4 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from agent.parser.parse_html import parse_html
+
+_SECTION_TITLES = [
+    "Management's Discussion and Analysis",
+    "Risk Factors",
+    "Quantitative and Qualitative Disclosures About Market Risk",
+    "Financial Statements and Supplementary Data",
+    "Controls and Procedures",
+]
+
+_SENTENCES = [
+    "Revenue increased driven by growth in cloud services and server products.",
+    "Operating expenses rose primarily due to investments in research and development.",
+    "We face intense competition across all markets for our products and services.",
+    "Foreign currency exchange rates affected reported results during the period.",
+    "Cash flows from operations were sufficient to fund capital expenditures.",
+    "Changes in tax law could adversely affect our effective tax rate.",
+]
+
+
+def _synthetic_filing(rng: random.Random, sections: int, paragraphs: int) -> str:
+    parts = ["<html><body>"]
+    for section in range(sections):
+        parts.append(f"<h2>Item {section + 1}. {rng.choice(_SECTION_TITLES)}</h2>")
+        for _ in range(paragraphs):
+            sentences = " ".join(rng.choice(_SENTENCES) for _ in range(6))
+            parts.append(f"<p>{sentences}</p>")
+        parts.append("<table><tr><th>Segment</th><th>2024</th><th>2023</th></tr>")
+        for row in range(12):
+            parts.append(
+                f"<tr><td>Segment {row}</td><td>{rng.randint(1, 999):,}</td>"
+                f"<td>{rng.randint(1, 999):,}</td></tr>"
+            )
+        parts.append("</table>")
+    parts.append("</body></html>")
+    return "\n".join(parts)
+
+
+def build_filing_set(root: Path, filings: int, sections: int, paragraphs: int) -> None:
+    """Write ``filings`` synthetic HTML filings in the sec-edgar-downloader layout."""
+
+    rng = random.Random(0)
+    for index in range(filings):
+        filing_dir = root / "MSFT" / "10-Q" / f"0000000000-24-{index:06d}"
+        filing_dir.mkdir(parents=True, exist_ok=True)
+        (filing_dir / "primary-document.html").write_text(
+            _synthetic_filing(rng, sections, paragraphs), encoding="utf-8"
+        )
+
+
+def run(filings: int, workers: List[int], sections: int, paragraphs: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        build_filing_set(root, filings, sections, paragraphs)
+
+        baseline = None
+        rows = []
+        for worker_count in workers:
+            start = time.perf_counter()
+            elements = parse_html(str(root), workers=worker_count)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            rows.append((worker_count, elapsed, baseline / elapsed, len(elements)))
+
+    print(f"\n{'workers':>8} {'seconds':>10} {'speedup':>8} {'elements':>9}")
+    for worker_count, elapsed, speedup, element_count in rows:
+        print(f"{worker_count:>8} {elapsed:>10.2f} {speedup:>7.2f}x {element_count:>9}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--filings", type=int, default=32)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--sections", type=int, default=8)
+    parser.add_argument("--paragraphs", type=int, default=10)
+    args = parser.parse_args()
+    run(args.filings, args.workers, args.sections, args.paragraphs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,332 @@
+"""Interchangeable LLM backends for chunk enrichment, each with its own rate limits.
+
+``ENRICHMENT_BACKEND`` selects the backend (ollama, gemini or fake). Every
+backend declares requests/minute, tokens/minute and concurrency limits, which
+can be overridden with ``<BACKEND>_REQUESTS_PER_MINUTE``,
+``<BACKEND>_TOKENS_PER_MINUTE`` and ``<BACKEND>_CONCURRENCY``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+from llm.ollama_client import get_settings
+from llm.qwen_ollama_chunking import (
+    ChunkMetadata,
+    chat_json,
+    full_prompt,
+    parse_batch,
+    parse_metadata,
+)
+
+# Rough prompt size in tokens, plus room for the JSON answer, charged to tokens/minute.
+CHARS_PER_TOKEN = 4
+RESPONSE_TOKENS = 256
+
+
+@dataclass(frozen=True)
+class RateLimits:
+    """Request and token budgets per minute (``None`` is unlimited) and concurrency."""
+
+    requests_per_minute: Optional[float] = None
+    tokens_per_minute: Optional[float] = None
+    concurrency: int = 4
+
+    def with_env(self, prefix: str) -> "RateLimits":
+        """Override limits from ``<prefix>_REQUESTS_PER_MINUTE``, ``_TOKENS_PER_MINUTE`` and ``_CONCURRENCY``."""
+        requests = os.getenv(f"{prefix}_REQUESTS_PER_MINUTE")
+        tokens = os.getenv(f"{prefix}_TOKENS_PER_MINUTE")
+        concurrency = os.getenv(f"{prefix}_CONCURRENCY")
+        return replace(
+            self,
+            requests_per_minute=float(requests) if requests else self.requests_per_minute,
+            tokens_per_minute=float(tokens) if tokens else self.tokens_per_minute,
+            concurrency=int(concurrency) if concurrency else self.concurrency,
+        )
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at ``per_minute``, holding at most one minute's worth."""
+
+    def __init__(
+        self,
+        per_minute: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self._tokens = per_minute
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """Block until ``amount`` tokens are available, take them and return the seconds waited.
+
+        Requests larger than the bucket are capped at its capacity so they can
+        still run, once the bucket is full.
+        """
+
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return waited
+                delay = (amount - self._tokens) / self.rate
+            self._sleep(delay)
+            waited += delay
+
+
+@dataclass
+class RateLimiterStats:
+    requests: int = 0
+    tokens: int = 0
+    waited_seconds: float = 0.0
+
+
+class RateLimiter:
+    """Apply ``RateLimits``: a concurrency cap plus request and token buckets."""
+
+    def __init__(self, limits: RateLimits) -> None:
+        self.limits = limits
+        self.stats = RateLimiterStats()
+        self._slots = threading.BoundedSemaphore(limits.concurrency)
+        self._requests = TokenBucket(limits.requests_per_minute) if limits.requests_per_minute else None
+        self._tokens = TokenBucket(limits.tokens_per_minute) if limits.tokens_per_minute else None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self, tokens: int) -> Iterator[None]:
+        """Hold one concurrency slot for a request expected to use ``tokens`` tokens."""
+
+        with self._slots:
+            waited = 0.0
+            if self._requests is not None:
+                waited += self._requests.acquire()
+            if self._tokens is not None:
+                waited += self._tokens.acquire(tokens)
+            with self._lock:
+                self.stats.requests += 1
+                self.stats.tokens += tokens
+                self.stats.waited_seconds += waited
+            yield
+
+
+class EnrichmentBackend:
+    """Base class: subclasses set ``name`` and ``model`` and implement ``_complete``.
+
+    ``generate`` and ``generate_batch`` share the prompts and validation of
+    ``llm.qwen_ollama_chunking`` and run every request through the backend's
+    rate limiter.
+    """
+
+    name = "base"
+    model = "base"
+
+    def __init__(self, limits: Optional[RateLimits] = None) -> None:
+        self.limits = limits or self.default_limits().with_env(self.name.upper())
+        self.limiter = RateLimiter(self.limits)
+
+    def default_limits(self) -> RateLimits:
+        return RateLimits()
+
+    def _complete(
+        self, prompt: str, schema: Optional[Type[BaseModel]] = None, model: Optional[str] = None
+    ) -> str:
+        """Return the JSON reply of ``model`` (default ``self.model``) to ``prompt``.
+
+        ``schema`` describes a single-chunk answer.
+        """
+        raise NotImplementedError
+
+    def _call(
+        self, prompt: str, schema: Optional[Type[BaseModel]] = None, model: Optional[str] = None
+    ) -> str:
+        with self.limiter.slot(len(prompt) // CHARS_PER_TOKEN + RESPONSE_TOKENS):
+            return self._complete(prompt, schema, model)
+
+    def generate(self, metadata_prompt: str, model: Optional[str] = None) -> ChunkMetadata:
+        """Enrich one ``chunk_enricher`` prompt."""
+        return parse_metadata(self._call(full_prompt(metadata_prompt), ChunkMetadata, model))
+
+    def generate_batch(
+        self, batch_prompt: str, count: int, model: Optional[str] = None
+    ) -> List[Optional[ChunkMetadata]]:
+        """Enrich one ``batch_chunk_enricher`` prompt; failed entries are None."""
+        return parse_batch(self._call(batch_prompt, model=model), count)
+
+
+class OllamaBackend(EnrichmentBackend):
+    """The shared Ollama client; concurrency follows ENRICHMENT_WORKERS and nothing else is limited."""
+
+    name = "ollama"
+
+    @property
+    def model(self) -> str:
+        return get_settings().model
+
+    def default_limits(self) -> RateLimits:
+        return RateLimits(concurrency=get_settings().pool_size)
+
+    def _complete(
+        self, prompt: str, schema: Optional[Type[BaseModel]] = None, model: Optional[str] = None
+    ) -> str:
+        return chat_json(prompt, model)
+
+
+class GeminiBackend(EnrichmentBackend):
+    """Google Gemini via google-generativeai, configured from GEMINI_API_KEY and GEMINI_MODEL.
+
+    Default limits match the free tier of gemini-2.0-flash-lite.
+    """
+
+    name = "gemini"
+
+    def __init__(
+        self,
+        model: Optional[str] = None,
+        api_key: Optional[str] = None,
+        limits: Optional[RateLimits] = None,
+    ) -> None:
+        # Imported here so the dependency is only needed when Gemini is selected
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key or os.getenv("GEMINI_API_KEY"))
+        self.model = model or os.getenv("GEMINI_MODEL", "gemini-2.0-flash-lite")
+        self._genai = genai
+        self._models: Dict[Tuple[str, bool], Any] = {}
+        self._models_lock = threading.Lock()
+        super().__init__(limits)
+
+    def default_limits(self) -> RateLimits:
+        return RateLimits(requests_per_minute=30, tokens_per_minute=1_000_000, concurrency=4)
+
+    def _generative_model(self, name: str, structured: bool):
+        with self._models_lock:
+            if (name, structured) not in self._models:
+                config = {"response_mime_type": "application/json"}
+                if structured:
+                    config["response_schema"] = ChunkMetadata
+                self._models[name, structured] = self._genai.GenerativeModel(
+                    name, generation_config=config
+                )
+            return self._models[name, structured]
+
+    def _complete(
+        self, prompt: str, schema: Optional[Type[BaseModel]] = None, model: Optional[str] = None
+    ) -> str:
+        generative_model = self._generative_model(model or self.model, schema is not None)
+        return generative_model.generate_content(prompt).text
+
+
+_BATCH_SECTION = re.compile(r"Chunk (\d+) \[(TABLE|TEXT)[^\]]*\]:\n---\n(.*?)\n---", re.DOTALL)
+_SINGLE_SECTION = re.compile(r"Chunk Content:\s*---\s*(.*?)\s*---", re.DOTALL)
+_WORD = re.compile(r"[A-Za-z][A-Za-z0-9'&-]{3,}")
+_STOPWORDS = frozenset(
+    "that this with from have were which their there about would these other into "
+    "than then them such also been more most over under only some each".split()
+)
+
+
+def _fake_metadata(text: str, is_table: bool) -> Dict[str, object]:
+    sentence = re.split(r"(?<=[.!?])\s", " ".join(text.split()), maxsplit=1)[0]
+    words = [w.lower() for w in _WORD.findall(text) if w.lower() not in _STOPWORDS]
+    keywords = [word for word, _ in Counter(words).most_common(5)]
+    return {
+        "summary": sentence[:200] or "Empty chunk.",
+        "keywords": keywords,
+        "hypothetical_questions": [f"What does the filing say about {word}?" for word in keywords[:3]],
+        "table_summary": f"Table covering {', '.join(keywords[:3])}." if is_table else None,
+    }
+
+
+class FakeBackend(EnrichmentBackend):
+    """Deterministic offline backend for tests and dry runs: metadata is derived from the chunk text."""
+
+    name = "fake"
+    model = "fake"
+
+    def default_limits(self) -> RateLimits:
+        return RateLimits(concurrency=8)
+
+    def _complete(
+        self, prompt: str, schema: Optional[Type[BaseModel]] = None, model: Optional[str] = None
+    ) -> str:
+        sections = _BATCH_SECTION.findall(prompt)
+        if sections:
+            return json.dumps({
+                "chunks": [
+                    {"id": int(index), **_fake_metadata(text, kind == "TABLE")}
+                    for index, kind, text in sections
+                ]
+            })
+        match = _SINGLE_SECTION.search(prompt)
+        text = match.group(1) if match else prompt
+        return json.dumps(_fake_metadata(text, "This chunk is a TABLE" in prompt))
+
+
+BACKENDS: Dict[str, Type[EnrichmentBackend]] = {
+    "ollama": OllamaBackend,
+    "gemini": GeminiBackend,
+    "fake": FakeBackend,
+}
+
+_lock = threading.Lock()
+_backend: Optional[EnrichmentBackend] = None
+
+
+def create_backend(name: str) -> EnrichmentBackend:
+    try:
+        backend_class = BACKENDS[name.lower()]
+    except KeyError:
+        raise ValueError(
+            f"Unknown enrichment backend '{name}'; choose one of {', '.join(BACKENDS)}."
+        ) from None
+    return backend_class()
+
+
+def get_backend() -> EnrichmentBackend:
+    """Return the process-wide backend named by ENRICHMENT_BACKEND (default ollama)."""
+
+    global _backend
+    with _lock:
+        if _backend is None:
+            _backend = create_backend(os.getenv("ENRICHMENT_BACKEND", "ollama"))
+        return _backend
+
+
+def reset_backend(backend: Optional[EnrichmentBackend] = None) -> None:
+    """Use ``backend`` from now on, or re-read ENRICHMENT_BACKEND on next use."""
+
+    global _backend
+    with _lock:
+        _backend = backend
+
+
+def generate_enriched_chunk(metadata_prompt: str, model: Optional[str] = None) -> ChunkMetadata:
+    """Enrich one chunk prompt with the configured backend."""
+    return get_backend().generate(metadata_prompt, model)
+
+
+def generate_enriched_batch(
+    batch_prompt: str, count: int, model: Optional[str] = None
+) -> List[Optional[ChunkMetadata]]:
+    """Enrich one multi-chunk prompt with the configured backend."""
+    return get_backend().generate_batch(batch_prompt, count, model)
@@ -0,0 +1,92 @@
+"""Shared, connection-pooled Ollama clients configured from the environment."""
+
+from __future__ import annotations
+
+import os
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+import httpx
+from ollama import AsyncClient, Client
+
+DEFAULT_HOST = "http://192.168.88.17:11434"
+DEFAULT_MODEL = "qwen2.5:1.5b"
+
+
+@dataclass(frozen=True)
+class OllamaSettings:
+    """Connection settings for the enrichment model server.
+
+    ``pool_size`` bounds the kept-alive connections and should match the
+    enrichment concurrency so no request waits for a connection.
+    """
+
+    host: str = DEFAULT_HOST
+    model: str = DEFAULT_MODEL
+    timeout: float = 120.0
+    keep_alive: Optional[str] = None
+    pool_size: int = 4
+
+    @classmethod
+    def from_env(cls) -> "OllamaSettings":
+        """Read OLLAMA_HOST, OLLAMA_MODEL, OLLAMA_TIMEOUT, OLLAMA_KEEP_ALIVE and ENRICHMENT_WORKERS."""
+        return cls(
+            host=os.getenv("OLLAMA_HOST", DEFAULT_HOST),
+            model=os.getenv("OLLAMA_MODEL", DEFAULT_MODEL),
+            timeout=float(os.getenv("OLLAMA_TIMEOUT", "120")),
+            keep_alive=os.getenv("OLLAMA_KEEP_ALIVE") or None,
+            pool_size=int(os.getenv("ENRICHMENT_WORKERS", "4")),
+        )
+
+    def limits(self, pool_size: Optional[int] = None) -> httpx.Limits:
+        size = pool_size or self.pool_size
+        return httpx.Limits(max_connections=size, max_keepalive_connections=size)
+
+
+_lock = threading.Lock()
+_settings: Optional[OllamaSettings] = None
+_client: Optional[Client] = None
+
+
+def get_settings() -> OllamaSettings:
+    """Settings read from the environment on first use (after .env is loaded)."""
+
+    global _settings
+    with _lock:
+        if _settings is None:
+            _settings = OllamaSettings.from_env()
+        return _settings
+
+
+def get_client() -> Client:
+    """Return the process-wide Client, creating it with a keep-alive pool on first use."""
+
+    global _client
+    settings = get_settings()
+    with _lock:
+        if _client is None:
+            _client = Client(
+                host=settings.host, timeout=settings.timeout, limits=settings.limits()
+            )
+        return _client
+
+
+def create_async_client(pool_size: Optional[int] = None) -> AsyncClient:
+    """Return a new pooled AsyncClient; async clients are bound to one event loop."""
+
+    settings = get_settings()
+    return AsyncClient(
+        host=settings.host, timeout=settings.timeout, limits=settings.limits(pool_size)
+    )
+
+
+def reset_clients(settings: Optional[OllamaSettings] = None) -> None:
+    """Close the shared client and use ``settings`` (or re-read the environment) next time."""
+
+    global _client, _settings
+    with _lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+        _settings = settings
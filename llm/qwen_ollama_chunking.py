@@ -1,8 +1,13 @@
-from ollama import Client
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from ollama import AsyncClient
+from pydantic import BaseModel, Field, ValidationError
+from typing import List, Optional, Sequence, Tuple
 import json
 
+from llm.ollama_client import get_client, get_settings
+
+# Bump when the prompt built by chunk_enricher changes so cached enrichments are not reused.
+PROMPT_VERSION = "1"
+
 class ChunkMetadata(BaseModel):
     """Structured metadata for a document chunk."""
     summary: str = Field(description="A concise 1-2 sentence summary of the chunk.")
@@ -27,33 +32,46 @@ def chunk_enricher(chunk_text: str, is_table: bool, expert_role: str) -> str:
     """
     return prompt
 
-def generate_enriched_chunk(metadata_prompt: str) -> ChunkMetadata:
-    """Uses the Ollama Qwen model to generate enriched metadata for a chunk."""
-    
-    # Provide a clear JSON example structure instead of the complex JSON schema
-    example_structure = {
-        "summary": "A concise 1-2 sentence summary of the chunk.",
-        "keywords": ["keyword1", "keyword2", "keyword3"],
-        "hypothetical_questions": ["Question 1?", "Question 2?", "Question 3?"],
-        "table_summary": "Summary of table data or null if not a table"
-    }
-    
-    full_prompt = f"{metadata_prompt}\n\nRespond strictly in JSON format. The output must be a single JSON object matching this structure:\n{json.dumps(example_structure, indent=2)}"
+# Provide a clear JSON example structure instead of the complex JSON schema
+EXAMPLE_STRUCTURE = {
+    "summary": "A concise 1-2 sentence summary of the chunk.",
+    "keywords": ["keyword1", "keyword2", "keyword3"],
+    "hypothetical_questions": ["Question 1?", "Question 2?", "Question 3?"],
+    "table_summary": "Summary of table data or null if not a table"
+}
+
+def full_prompt(metadata_prompt: str) -> str:
+    """Appends the JSON output instructions to a chunk_enricher prompt."""
+
+    return f"{metadata_prompt}\n\nRespond strictly in JSON format. The output must be a single JSON object matching this structure:\n{json.dumps(EXAMPLE_STRUCTURE, indent=2)}"
 
-    client = Client(host='http://192.168.88.17:11434') # Default host
+def batch_chunk_enricher(chunks: Sequence[Tuple[str, bool]], expert_role: str) -> str:
+    """Generates one prompt asking for metadata of several (chunk_text, is_table) chunks."""
 
-    response = client.chat(
-        model='qwen2.5:1.5b',
-        messages=[{'role': 'user', 'content': full_prompt}],
-        format='json'
+    sections = []
+    for index, (chunk_text, is_table) in enumerate(chunks):
+        kind = "TABLE" if is_table else "TEXT (set 'table_summary' to null)"
+        sections.append(f"Chunk {index} [{kind}]:\n---\n{chunk_text}\n---")
+
+    example = {"chunks": [{"id": 0, **EXAMPLE_STRUCTURE}]}
+    return (
+        f"You are an expert {expert_role}. Analyze each of the following {len(chunks)} document chunks "
+        "independently and generate the specified metadata for every one of them. "
+        "For TABLE chunks the summary should describe the main data points and trends.\n\n"
+        + "\n\n".join(sections)
+        + f"\n\nRespond strictly in JSON format: a single object whose 'chunks' array holds one entry per chunk, "
+        f"with 'id' set to the chunk number, matching this structure:\n{json.dumps(example, indent=2)}"
     )
 
+def parse_metadata(content: str) -> ChunkMetadata:
+    """Parses and validates the JSON content of a chat response."""
+
     # Parse the JSON response
     try:
-        response_data = json.loads(response['message']['content'])
+        response_data = json.loads(content)
     except json.JSONDecodeError:
         # Fallback or empty if JSON is invalid
-        print(f"Error decoding JSON from LLM: {response['message']['content']}")
+        print(f"Error decoding JSON from LLM: {content}")
         response_data = {}
     
     # Ensure table_summary is present (set to None if missing)
@@ -62,3 +80,58 @@ def generate_enriched_chunk(metadata_prompt: str) -> ChunkMetadata:
     
     # Validate and return
     return ChunkMetadata.model_validate(response_data)
+
+def chat_json(prompt: str, model: Optional[str] = None) -> str:
+    """Sends one JSON-mode chat request on the shared client and returns the reply text.
+
+    ``model`` overrides the configured OLLAMA_MODEL for this request.
+    """
+
+    settings = get_settings()
+    response = get_client().chat(
+        model=model or settings.model,
+        messages=[{'role': 'user', 'content': prompt}],
+        format='json',
+        keep_alive=settings.keep_alive,
+    )
+    return response['message']['content']
+
+def parse_batch(content: str, count: int) -> List[Optional[ChunkMetadata]]:
+    """Validates each entry of a batch response; missing or invalid entries are None."""
+
+    results: List[Optional[ChunkMetadata]] = [None] * count
+    try:
+        data = json.loads(content)
+    except json.JSONDecodeError:
+        print(f"Error decoding JSON from LLM: {content}")
+        return results
+
+    entries = data.get("chunks", []) if isinstance(data, dict) else data
+    if not isinstance(entries, list):
+        return results
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        index = entry.get("id")
+        if not isinstance(index, int) or not 0 <= index < count or results[index] is not None:
+            continue
+        try:
+            metadata = ChunkMetadata.model_validate({"table_summary": None, **entry})
+        except ValidationError:
+            continue
+        if metadata.summary.strip():
+            results[index] = metadata
+    return results
+
+async def agenerate_enriched_chunk(metadata_prompt: str, client: AsyncClient) -> ChunkMetadata:
+    """Async counterpart of OllamaBackend.generate on a shared AsyncClient."""
+
+    settings = get_settings()
+    response = await client.chat(
+        model=settings.model,
+        messages=[{'role': 'user', 'content': full_prompt(metadata_prompt)}],
+        format='json',
+        keep_alive=settings.keep_alive,
+    )
+
+    return parse_metadata(response['message']['content'])
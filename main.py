@@ -1,24 +1,430 @@
 import os
+from collections import defaultdict
+from functools import partial
 from pathlib import Path
 
 from dotenv import load_dotenv
 
 from agent.chunk_enrichment.chunk_aggregator import (
-    collect_enriched_chunks,
+    build_enriched_records,
+    delete_stale_records,
+    record_ids_by_file,
+    stored_enrichments,
+    unenriched_records,
+    upsert_enriched_chunks,
 )
+from agent.chunk_enrichment.async_enrichment import enrich_chunk_async
+from agent.chunk_enrichment.batch_enrichment import enrich_chunks_batched
+from agent.chunk_enrichment.chunk_store import (
+    SHARD_MAX_RECORDS,
+    ShardedChunkStore,
+    migrate_json_file,
+)
+from agent.chunk_enrichment.columnar_store import (
+    FORMATS as COLUMNAR_FORMATS,
+    ColumnarChunkStore,
+)
+from agent.chunk_enrichment.chunk_triage import (
+    SKIPPED_METADATA,
+    ChunkTriage,
+    TriageThresholds,
+    enrich_with_triage,
+)
+from agent.chunk_enrichment.enrichment_cache import EnrichmentCache
+from agent.chunk_enrichment.enrichment_journal import EnrichmentJournal
+from agent.chunk_enrichment.json_store import JsonChunkStore
 from agent.chunk_enrichment.llm_enrichment import enrich_chunk
-from agent.chunk_generation.title_chunker import title_chunker
-from agent.parser.parse_html import parse_html
-from agent.embedder.fast_embed_qdrant import create_embedding_from_chunks
+from agent.chunk_enrichment.model_routing import ModelRouter, RoutingPolicy
+from agent.chunk_enrichment.near_duplicates import (
+    NearDuplicateIndex,
+    enrich_with_near_duplicates,
+)
+from agent.chunk_generation.boilerplate_filter import BoilerplateFilter
+from agent.chunk_generation.table_splitter import split_table_chunks
+from agent.chunk_generation.title_chunker import iter_title_chunks, title_chunker
+from agent.chunk_generation.token_chunker import (
+    chunk_token_budget,
+    iter_token_chunks,
+    load_embedding_token_counter,
+    token_chunker,
+)
+from agent.parser.edgar_submission import DEFAULT_DOCUMENT_TYPES
+from agent.parser.parse_cache import ParseCache
+from agent.parser.parse_html import iter_parse_html, parse_html
+from agent.embedder.fast_embed_qdrant import (
+    delete_stale_points,
+    embed_chunks,
+    existing_point_ids,
+    point_id,
+    sync_chunks,
+    upsert_points,
+)
+from llm.backends import get_backend
+from utils.memory import peak_rss_mb
+from utils.pipeline import Stage, run_pipeline
 from utils.sqlite_db import create_table_from_input
 
+ENRICHMENT_ENGINES = {
+    "threads": enrich_chunk,
+    "async": enrich_chunk_async,
+    "batched": enrich_chunks_batched,
+}
+
+
+def _enrich_chunks(
+    chunked_elements,
+    skip_enrichment: bool,
+    enrichment_options: dict | None = None,
+    verbose: bool = True,
+):
+    """Enrich chunks with LLM metadata, or fill in placeholders when skipped.
+
+    ``enrichment_options`` may hold a ``triage`` (low-value chunks get local
+    or no metadata), a ``dedup_index`` (near-duplicates reuse the canonical
+    enrichment), a ``cache`` (chunks enriched on an earlier run skip
+    the LLM), a ``journal`` (results are recorded as they finish and replayed
+    on resume), ``max_attempts`` per chunk, a model ``router`` and the
+    ``engine`` (a key of ``ENRICHMENT_ENGINES``). ``verbose`` prints sample
+    metadata.
+    """
+
+    options = enrichment_options or {}
+    dedup_index = options.get("dedup_index")
+    enrichment_cache = options.get("cache")
+    journal = options.get("journal")
+    router = options.get("router")
+    triage = options.get("triage")
+
+    if skip_enrichment:
+        if verbose:
+            print("\nSkipping enrichment as SKIP_ENRICHMENT is set to true.")
+        return [dict(SKIPPED_METADATA) for _ in chunked_elements]
+
+    enrich = partial(
+        ENRICHMENT_ENGINES[options.get("engine") or "threads"],
+        cache=enrichment_cache,
+        journal=journal,
+        max_attempts=options.get("max_attempts", 1),
+        **({"router": router} if router is not None else {}),
+    )
+    if dedup_index:
+        enrich = partial(enrich_with_near_duplicates, enrich_fn=enrich, index=dedup_index)
+    if triage:
+        enriched_chunks = enrich_with_triage(chunked_elements, enrich, triage)
+        print(triage.stats.report())
+    else:
+        enriched_chunks = enrich(chunked_elements)
+    if dedup_index:
+        print(dedup_index.stats.report())
+    if enrichment_cache is not None:
+        print(enrichment_cache.stats.report())
+    if journal is not None:
+        print(journal.stats.report())
+    if router is not None:
+        print(router.report())
+    failed = sum(1 for enriched in enriched_chunks if not enriched)
+    if failed and journal is not None:
+        print(f"\n{failed} chunks failed enrichment; rerun with RESUME_ENRICHMENT=true to retry them.")
+    print(f"\nEnriched {len(enriched_chunks)} chunks with metadata.")
+    if not verbose:
+        return enriched_chunks
+    print("\nSample enriched chunk metadata:")
+    for i, enriched in enumerate(enriched_chunks[:3]):
+        print(f"\nEnriched Chunk {i+1}: {enriched}")
+    return enriched_chunks
+
+
+def _enrich_new_chunks(
+    file_path,
+    chunked_elements,
+    enriched_output,
+    skip_enrichment: bool,
+    enrichment_options: dict | None = None,
+    verbose: bool = True,
+    filings_root=None,
+):
+    """Enrich only the chunks not already stored; stored chunks keep their metadata.
+
+    Placeholders left by a SKIP_ENRICHMENT run are enriched once enrichment is on.
+    """
+
+    stored = stored_enrichments(
+        file_path, chunked_elements, enriched_output, filings_root=filings_root
+    )
+    if not skip_enrichment:
+        stored = [
+            None
+            if metadata is not None
+            and metadata.get("summary") == SKIPPED_METADATA["summary"]
+            and "enrichment" not in metadata
+            else metadata
+            for metadata in stored
+        ]
+    pending = [chunk for chunk, metadata in zip(chunked_elements, stored) if metadata is None]
+    reused = len(chunked_elements) - len(pending)
+    if reused:
+        print(f"Reusing stored metadata for {reused} of {len(chunked_elements)} chunks from {file_path}.")
+    enriched = iter(
+        _enrich_chunks(pending, skip_enrichment, enrichment_options, verbose) if pending else []
+    )
+    return [metadata if metadata is not None else next(enriched) for metadata in stored]
+
+
+def _split_tables(chunked_elements, table_format: str, max_tokens: int | None):
+    """Split HTML table chunks into compact row groups unless TABLE_FORMAT is html."""
+
+    if table_format == "html":
+        return chunked_elements
+    if max_tokens:
+        return split_table_chunks(
+            chunked_elements,
+            max_size=max_tokens,
+            table_format=table_format,
+            measure=load_embedding_token_counter().count,
+        )
+    return split_table_chunks(chunked_elements, table_format=table_format)
+
+
+def _chunk_document(document, table_format: str, max_tokens: int | None):
+    """Chunks of one parsed ``(file_path, elements)`` document; empty if it has no elements."""
+
+    chunked_documents = (
+        iter_token_chunks([document], max_tokens, table_format=table_format)
+        if max_tokens
+        else iter_title_chunks([document])
+    )
+    for _, chunked_elements in chunked_documents:
+        return _split_tables(chunked_elements, table_format, max_tokens)
+    return []
+
+
+def _source_file(file_path) -> str:
+    # The source_file parse_html stamps on every element of the document.
+    return Path(file_path).as_posix()
+
+
+def _run_streaming(
+    folder: str,
+    enriched_chunks_path: str | ShardedChunkStore | ColumnarChunkStore | JsonChunkStore,
+    skip_enrichment: bool,
+    parse_options: dict,
+    boilerplate_filter: BoilerplateFilter | None,
+    enrichment_options: dict | None = None,
+    max_tokens: int | None = None,
+    table_format: str = "html",
+):
+    """Parse, chunk, enrich and embed one document at a time to keep memory flat.
+
+    With ``max_tokens``, chunks are sized in embedding-model tokens.
+    """
+
+    documents = iter_parse_html(folder, **parse_options)
+    if boilerplate_filter:
+        documents = (
+            (file_path, boilerplate_filter.filter(elements))
+            for file_path, elements in documents
+        )
+    document_count = 0
+    points_stored = 0
+    # Vectors of canonical chunks, reused by near-duplicates in later documents.
+    vector_cache = {}
+
+    for document in documents:
+        file_path = document[0]
+        chunked_elements = _chunk_document(document, table_format, max_tokens)
+        if not chunked_elements:
+            # A filing that no longer produces chunks leaves no records or points behind
+            delete_stale_records(
+                enriched_chunks_path, _source_file(file_path), set(), filings_root=folder
+            )
+            delete_stale_points(_source_file(file_path), set())
+            continue
+        document_count += 1
+        print(f"\nGenerated {len(chunked_elements)} chunks from {file_path}.")
+
+        enriched_chunks = _enrich_new_chunks(
+            file_path,
+            chunked_elements,
+            enriched_chunks_path,
+            skip_enrichment,
+            enrichment_options,
+            filings_root=folder,
+        )
+        new_records = build_enriched_records(
+            file_path, chunked_elements, enriched_chunks, filings_root=folder
+        )
+        upserted = upsert_enriched_chunks(new_records, enriched_chunks_path, source=file_path)
+        failed = unenriched_records(
+            file_path, chunked_elements, enriched_chunks, filings_root=folder
+        )
+        # Records of chunks the document no longer produces are deleted
+        for source_file, keep_ids in record_ids_by_file(new_records + failed).items():
+            delete_stale_records(enriched_chunks_path, source_file, keep_ids, filings_root=folder)
+
+        # Only new or changed chunks are embedded; points the document no longer has are deleted,
+        # while chunks that failed enrichment keep their earlier points
+        if new_records:
+            points_stored += sync_chunks(
+                new_records,
+                vector_cache=vector_cache,
+                content_char_limit=None if max_tokens else 1000,
+                changed=upserted.changed,
+                keep=failed,
+            ).embedded
+
+        print(f"Peak RSS after {document_count} document(s): {peak_rss_mb():.1f} MB")
+
+    if not document_count:
+        print(f"No elements were parsed from {folder}. Nothing to chunk.")
+        return
+
+    if boilerplate_filter:
+        print(boilerplate_filter.stats.report())
+    print(
+        f"\nStreamed {document_count} documents into {points_stored} points. "
+        f"Peak RSS: {peak_rss_mb():.1f} MB "
+        f"(parser workers: {peak_rss_mb(include_children=True):.1f} MB)"
+    )
+
+
+def _run_pipelined(
+    folder: str,
+    enriched_chunks_path: str | ShardedChunkStore | ColumnarChunkStore | JsonChunkStore,
+    skip_enrichment: bool,
+    parse_options: dict,
+    boilerplate_filter: BoilerplateFilter | None,
+    enrichment_options: dict | None = None,
+    max_tokens: int | None = None,
+    table_format: str = "html",
+    queue_size: int = 4,
+    batch_size: int = 16,
+):
+    """Run parse -> chunk -> enrich -> embed -> upsert as overlapping stages.
+
+    Documents are chunked one at a time and enriched in batches of
+    ``batch_size`` chunks, so embedding and upserts start as soon as the
+    first batch is enriched instead of after the whole corpus.
+    """
+
+    documents = iter_parse_html(folder, **parse_options)
+    if boilerplate_filter:
+        documents = (
+            (file_path, boilerplate_filter.filter(elements))
+            for file_path, elements in documents
+        )
+    # Vectors of canonical chunks, reused by near-duplicates in later batches.
+    vector_cache = {}
+    content_char_limit = None if max_tokens else 1000
+    points_stored = 0
+    # Record and point ids per source file of the document being enriched and upserted,
+    # for stale-record and stale-point deletion.
+    document_record_ids = defaultdict(set)
+    document_point_ids = defaultdict(set)
+
+    def chunk(document):
+        file_path = document[0]
+        chunked_elements = _chunk_document(document, table_format, max_tokens)
+        print(f"\nGenerated {len(chunked_elements)} chunks from {file_path}.")
+        if not chunked_elements:
+            # A document without chunks is one empty last batch, so its old records and points go
+            yield file_path, [], True
+        for start in range(0, len(chunked_elements), batch_size):
+            last = start + batch_size >= len(chunked_elements)
+            yield file_path, chunked_elements[start:start + batch_size], last
+
+    def store_batch(file_path, chunked_elements):
+        enriched_chunks = _enrich_new_chunks(
+            file_path,
+            chunked_elements,
+            enriched_chunks_path,
+            skip_enrichment,
+            enrichment_options,
+            verbose=False,
+            filings_root=folder,
+        )
+        records = build_enriched_records(
+            file_path, chunked_elements, enriched_chunks, filings_root=folder
+        )
+        upserted = upsert_enriched_chunks(records, enriched_chunks_path, source=file_path)
+        failed = unenriched_records(
+            file_path, chunked_elements, enriched_chunks, filings_root=folder
+        )
+        return records, upserted.changed, failed
+
+    def enrich(batch):
+        file_path, chunked_elements, last = batch
+        if chunked_elements:
+            records, changed, failed = store_batch(file_path, chunked_elements)
+        else:
+            records, changed, failed = [], [], []
+            document_record_ids[_source_file(file_path)] = set()
+        for source_file, ids in record_ids_by_file(records + failed).items():
+            document_record_ids[source_file] |= ids
+        if last:
+            # The document is complete, so its stored records not seen in this run are stale
+            for source_file, keep_ids in document_record_ids.items():
+                delete_stale_records(enriched_chunks_path, source_file, keep_ids, filings_root=folder)
+            document_record_ids.clear()
+        yield file_path, records, changed, failed, last
+
+    def embed(batch):
+        file_path, records, changed, failed, last = batch
+        ids = [point_id(record) for record in records]
+        # Chunks that already have a point in Qdrant are not embedded again unless their metadata changed
+        present = (existing_point_ids(ids) if ids else set()) - {point_id(record) for record in changed}
+        missing = [record for record, id_ in zip(records, ids) if id_ not in present]
+        points = embed_chunks(missing, vector_cache, content_char_limit) if missing else []
+        ids_by_file = [(record.get("source_file"), id_) for record, id_ in zip(records, ids)]
+        # Chunks that failed enrichment are not embedded, but their earlier points are not stale
+        ids_by_file += [(record.get("source_file"), point_id(record)) for record in failed]
+        yield file_path, points, ids_by_file, last
+
+    def upsert(batch):
+        nonlocal points_stored
+        file_path, points, ids_by_file, last = batch
+        if last and not ids_by_file:
+            # Only a document without chunks has an empty last batch
+            document_point_ids[_source_file(file_path)] = set()
+        if points:
+            upsert_points(points)
+            points_stored += len(points)
+        for source_file, id_ in ids_by_file:
+            if source_file:
+                document_point_ids[source_file].add(id_)
+        if last:
+            # The document is complete, so its points not seen in this run are stale
+            for source_file, keep_ids in document_point_ids.items():
+                delete_stale_points(source_file, keep_ids)
+            document_point_ids.clear()
+        return ()
+
+    # enrich and embed keep one worker each so the JSON file and vector reuse stay consistent
+    stats = run_pipeline(
+        documents,
+        [Stage("chunk", chunk), Stage("enrich", enrich), Stage("embed", embed), Stage("upsert", upsert)],
+        queue_size=queue_size,
+        source_name="parse",
+    )
+
+    if not stats.stages[0].items_out:
+        print(f"No elements were parsed from {folder}. Nothing to chunk.")
+        return
+
+    if boilerplate_filter:
+        print(boilerplate_filter.stats.report())
+    print(f"\n{stats.report()}")
+    print(
+        f"\nPipelined {stats.stages[0].items_out} documents into {points_stored} points. "
+        f"Peak RSS: {peak_rss_mb():.1f} MB"
+    )
+
 
 def main():
     """Main orchestrator for Agentic Rag workflow"""
 
     # Force reload from .env file, overriding any cached shell variables
     load_dotenv(override=True)
-    
+
     # Extract environment variables
     folder = os.getenv("TARGET_FILE_LOCATION")
     if not folder:
@@ -29,52 +435,205 @@ def main():
     if not enriched_chunks_path:
         print("Error: ENRICHED_CHUNKS_PATH environment variable not set.")
         return
+    # "json" loads ENRICHED_CHUNKS_PATH once and writes it back at the end of the run;
+    # "sharded" appends JSONL shards; "parquet" and "arrow" write columnar files partitioned by source
+    store_kind = os.getenv("ENRICHED_CHUNKS_STORE", "json").lower()
+    if store_kind == "sharded":
+        chunk_store = ShardedChunkStore(
+            os.getenv("ENRICHED_CHUNKS_DIR") or Path(enriched_chunks_path).with_suffix(".shards"),
+            shard_max_records=int(os.getenv("CHUNK_STORE_SHARD_RECORDS", str(SHARD_MAX_RECORDS))),
+            compression=os.getenv("CHUNK_STORE_COMPRESSION") or None,
+        )
+    elif store_kind in COLUMNAR_FORMATS:
+        chunk_store = ColumnarChunkStore(
+            os.getenv("ENRICHED_CHUNKS_DIR") or Path(enriched_chunks_path).with_suffix(f".{store_kind}"),
+            format=store_kind,
+        )
+    else:
+        chunk_store = JsonChunkStore(enriched_chunks_path)
+    if not isinstance(chunk_store, JsonChunkStore) and Path(enriched_chunks_path).exists():
+        migrate_json_file(enriched_chunks_path, chunk_store)
 
     sqlite_csv_path = os.getenv("SQLITE_CSV_PATH", "sec-edgar-filings/revenue_summary.csv")
 
-    # Parse files into text
-    parsed_elements = parse_html(folder)
-    if not parsed_elements:
-        print(f"No elements were parsed from {folder}. Nothing to chunk.")
-        return
-    print(f"\nParsed {len(parsed_elements)} elements from {folder}")
-
-    # Chunk text into smaller text chunks
-    chunked_elements = title_chunker(parsed_elements)
-    print(f"\nGenerated {len(chunked_elements)} chunks from parsed elements.")
-
-    # Enrich chunks with LLM-generated metadata
+    parse_cache_dir = os.getenv("PARSE_CACHE_DIR")
+    document_types = os.getenv("EDGAR_DOCUMENT_TYPES", ",".join(DEFAULT_DOCUMENT_TYPES))
+    parse_options = {
+        "workers": int(os.getenv("PARSE_WORKERS", "1")),
+        "cache": (
+            ParseCache(
+                parse_cache_dir,
+                max_bytes=int(os.getenv("PARSE_CACHE_MAX_MB", "1024")) * 1024 * 1024,
+            )
+            if parse_cache_dir
+            else None
+        ),
+        "document_types": [t.strip() for t in document_types.split(",") if t.strip()],
+        "fast_html": os.getenv("HTML_PARSER", "unstructured").lower() == "lxml",
+    }
     skip_enrichment = os.getenv("SKIP_ENRICHMENT", "false").lower() == "true"
-    
-    if skip_enrichment:
-        print("\nSkipping enrichment as SKIP_ENRICHMENT is set to true.")
-        enriched_chunks = [
-            {
-                "summary": "No summary available (enrichment skipped)",
-                "keywords": [],
-                "hypothetical_questions": [],
-                "table_summary": None
-            }
-            for _ in chunked_elements
-        ]
-    else:
-        enriched_chunks = enrich_chunk(chunked_elements)
-        print(f"\nEnriched {len(enriched_chunks)} chunks with metadata.")
-        print("\nSample enriched chunk metadata:")
-        for i, enriched in enumerate(enriched_chunks[:3]):
-            print(f"\nEnriched Chunk {i+1}: {enriched}")
-
-    # Aggregate and persist enriched chunks in JSON
-    enriched_chunks = collect_enriched_chunks(
-        file_path=folder,
-        chunks=chunked_elements,
-        enriched_metadata=enriched_chunks,
-        output_path=enriched_chunks_path,
-        filings_root=folder,
+    streaming = os.getenv("STREAMING_INGEST", "false").lower() == "true"
+    # Overlaps parsing, enrichment, embedding and upserts on bounded queues
+    pipelined = os.getenv("PIPELINE_INGEST", "false").lower() == "true"
+    # Opt-in: drops running headers, footers and page markers repeated across pages
+    boilerplate_filter = (
+        BoilerplateFilter()
+        if os.getenv("BOILERPLATE_FILTER", "false").lower() == "true"
+        else None
     )
+    # "tokens" sizes chunks to the embedding model's window instead of by characters
+    token_chunking = os.getenv("CHUNKING_MODE", "chars").lower() == "tokens"
+    max_tokens = (
+        int(os.getenv("CHUNK_MAX_TOKENS") or chunk_token_budget()) if token_chunking else None
+    )
+    # markdown/tsv rewrite every table as compact row groups; html (the default) keeps
+    # table chunks as stored before and only splits tables over the token budget
+    table_format = os.getenv("TABLE_FORMAT", "html").lower()
+    near_duplicate_threshold = os.getenv("NEAR_DUPLICATE_THRESHOLD")
+    enrichment_cache_path = os.getenv("ENRICHMENT_CACHE_PATH")
+    journal_path = os.getenv("ENRICHMENT_JOURNAL_PATH")
+    # Resume replays the journal and only sends missing or failed chunks to the LLM
+    resume_enrichment = os.getenv("RESUME_ENRICHMENT", "false").lower() == "true"
+    if resume_enrichment and not journal_path:
+        print("Warning: RESUME_ENRICHMENT needs ENRICHMENT_JOURNAL_PATH; nothing to resume from.")
+    # Signatures, checkboxes and fragments skip the LLM; short chunks get local keywords
+    triage = (
+        ChunkTriage(
+            TriageThresholds(
+                skip_below_chars=int(os.getenv("TRIAGE_SKIP_BELOW_CHARS", "80")),
+                cheap_below_chars=int(os.getenv("TRIAGE_CHEAP_BELOW_CHARS", "300")),
+                min_alpha_ratio=float(os.getenv("TRIAGE_MIN_ALPHA_RATIO", "0.5")),
+            )
+        )
+        if os.getenv("CHUNK_TRIAGE", "false").lower() == "true"
+        else None
+    )
+    # Small model for prose, large model for tables, long chunks and failed answers
+    router = (
+        ModelRouter(RoutingPolicy.from_env())
+        if os.getenv("MODEL_ROUTING", "false").lower() == "true" and not skip_enrichment
+        else None
+    )
+    # Routed results depend on the policy, so cache and journal keys use it as the model
+    cache_model = router.policy.describe() if router is not None else None
+    enrichment_options = {
+        "dedup_index": (
+            NearDuplicateIndex(threshold=float(near_duplicate_threshold))
+            if near_duplicate_threshold
+            else None
+        ),
+        "cache": (
+            EnrichmentCache(enrichment_cache_path, model=cache_model)
+            if enrichment_cache_path
+            else None
+        ),
+        "journal": (
+            EnrichmentJournal(journal_path, resume=resume_enrichment, model=cache_model)
+            if journal_path
+            else None
+        ),
+        "router": router,
+        "triage": triage,
+        "max_attempts": int(os.getenv("ENRICHMENT_MAX_ATTEMPTS", "3")),
+        # "async" adapts Ollama concurrency with AIMD; "batched" packs short chunks
+        # into shared prompts; "threads" sends one prompt per chunk on a fixed pool
+        "engine": os.getenv("ENRICHMENT_ENGINE", "threads").lower(),
+    }
+    if not skip_enrichment:
+        # ENRICHMENT_BACKEND picks ollama, gemini or fake; each has its own rate limits
+        backend = get_backend()
+        if enrichment_options["engine"] == "async" and backend.name != "ollama":
+            print(f"Warning: the async engine only supports Ollama; using threads for {backend.name}.")
+            enrichment_options["engine"] = "threads"
+        if enrichment_options["engine"] == "async" and router is not None:
+            print("Warning: the async engine does not support MODEL_ROUTING; using threads.")
+            enrichment_options["engine"] = "threads"
+        print(f"Enriching with the {backend.name} backend ({backend.model}), limits: {backend.limits}")
+
+    try:
+        if pipelined:
+            _run_pipelined(
+                folder,
+                chunk_store,
+                skip_enrichment,
+                parse_options,
+                boilerplate_filter,
+                enrichment_options,
+                max_tokens,
+                table_format,
+                queue_size=int(os.getenv("PIPELINE_QUEUE_SIZE", "4")),
+                batch_size=int(os.getenv("PIPELINE_BATCH_SIZE", "16")),
+            )
+        elif streaming:
+            _run_streaming(
+                folder,
+                chunk_store,
+                skip_enrichment,
+                parse_options,
+                boilerplate_filter,
+                enrichment_options,
+                max_tokens,
+                table_format,
+            )
+        else:
+            # Parse files into text
+            parsed_elements = parse_html(folder, **parse_options)
+            if not parsed_elements:
+                print(f"No elements were parsed from {folder}. Nothing to chunk.")
+                return
+            print(f"\nParsed {len(parsed_elements)} elements from {folder}")
+
+            # Drop running headers, footers and page numbers before they reach the LLM
+            if boilerplate_filter:
+                parsed_elements = boilerplate_filter.filter(parsed_elements)
+                print(boilerplate_filter.stats.report())
+
+            # Chunk text into smaller text chunks
+            chunked_elements = (
+                token_chunker(parsed_elements, max_tokens, table_format=table_format)
+                if max_tokens
+                else title_chunker(parsed_elements)
+            )
+            chunked_elements = _split_tables(chunked_elements, table_format, max_tokens)
+            print(f"\nGenerated {len(chunked_elements)} chunks from parsed elements.")
+
+            # Enrich chunks not already stored with LLM-generated metadata
+            enriched_chunks = _enrich_new_chunks(
+                folder,
+                chunked_elements,
+                chunk_store,
+                skip_enrichment,
+                enrichment_options,
+                filings_root=folder,
+            )
+
+            # Aggregate enriched chunks and upsert them by chunk id
+            records = build_enriched_records(
+                folder, chunked_elements, enriched_chunks, filings_root=folder
+            )
+            upserted = upsert_enriched_chunks(records, chunk_store, source=folder)
+            failed = unenriched_records(
+                folder, chunked_elements, enriched_chunks, filings_root=folder
+            )
+            for source_file, keep_ids in record_ids_by_file(records + failed).items():
+                delete_stale_records(chunk_store, source_file, keep_ids, filings_root=folder)
+
+            # Embed new or changed chunks and drop points of removed chunks
+            if records:
+                sync_chunks(
+                    records,
+                    content_char_limit=None if max_tokens else 1000,
+                    changed=upserted.changed,
+                    keep=failed,
+                )
+            else:
+                print("\nNo chunks to embed.")
 
-    # Create embeddings from enriched chunks and store in Qdrant
-    create_embedding_from_chunks(enriched_chunks)
+            print(f"\nPeak RSS: {peak_rss_mb():.1f} MB")
+    finally:
+        # The JSON store writes its file here, once per run
+        print(chunk_store.stats.report())
+        chunk_store.close()
 
     # Create SQLite table from data
     create_table_from_input(
@@ -84,4 +643,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
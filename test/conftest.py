@@ -5,6 +5,8 @@ import pytest
 import os
 from dotenv import load_dotenv
 
+from llm.ollama_client import OllamaSettings, reset_clients
+
 
 @pytest.fixture(scope="session", autouse=True)
 def load_env():
@@ -18,3 +20,19 @@ def load_env():
 def test_data_dir():
     """Provide path to test data directory."""
     return os.path.join(os.path.dirname(__file__), 'data')
+
+
+@pytest.fixture
+def serve():
+    """Start a fake server and point the Ollama client settings at it."""
+    servers = []
+
+    def start(server):
+        servers.append(server.__enter__())
+        reset_clients(OllamaSettings(host=server.url))
+        return server
+
+    yield start
+    for server in servers:
+        server.__exit__(None, None, None)
+    reset_clients()
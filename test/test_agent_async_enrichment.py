@@ -0,0 +1,103 @@
+"""
+Test cases for asyncio enrichment with adaptive concurrency.
+Tests AIMDController and enrich_chunk_async from agent.chunk_enrichment.async_enrichment
+against the local fake Ollama server.
+"""
+import re
+
+import httpx
+from agent.chunk_enrichment import async_enrichment
+from agent.chunk_enrichment.async_enrichment import AIMDController, enrich_chunk_async
+from agent.chunk_enrichment.enrichment_cache import EnrichmentCache
+from testing.fake_ollama_server import RESPONSE_METADATA, FakeOllamaServer
+from testing.records import numbered_chunks
+
+
+class EchoServer(FakeOllamaServer):
+    """Answers with the chunk number found in the prompt so ordering can be checked."""
+
+    def response_for(self, request):
+        number = re.search(r"Chunk number (\d+)", request["messages"][-1]["content"]).group(1)
+        return {**RESPONSE_METADATA, "summary": f"summary {number}"}
+
+
+
+def test_controller_increases_additively_and_halves_on_overload():
+    controller = AIMDController(initial=2, maximum=8)
+
+    for _ in range(20):
+        controller.on_success(latency=0.1, started_at=0.0)
+    assert controller.concurrency > 2
+
+    grown = controller.limit
+    controller.on_overload(started_at=float("inf"))
+    assert controller.limit == grown / 2
+
+    # A request started before that decrease does not shrink the limit again.
+    controller.on_overload(started_at=0.0)
+    assert controller.limit == grown / 2
+    assert controller.overloads == 2
+
+
+def test_controller_backs_off_when_latency_climbs():
+    controller = AIMDController(initial=8, latency_tolerance=1.5, smoothing=1.0)
+    controller.on_success(latency=0.1, started_at=float("inf"))
+
+    controller.on_success(latency=0.5, started_at=float("inf"))
+
+    assert controller.concurrency == 4
+
+
+def test_results_keep_input_order(serve):
+    server = serve(EchoServer(latency=0.01, capacity=8, max_in_flight=64))
+
+    results = enrich_chunk_async(numbered_chunks(30), controller=AIMDController(initial=4, maximum=8))
+
+    assert [result["summary"] for result in results] == [f"summary {i}" for i in range(30)]
+    assert server.peak_in_flight <= 8
+
+
+def test_overloaded_server_triggers_backoff_and_retries(serve):
+    controller = AIMDController(initial=12, maximum=16)
+    server = serve(FakeOllamaServer(latency=0.02, capacity=2, max_in_flight=4))
+
+    results = enrich_chunk_async(
+        numbered_chunks(40), controller=controller, retry_delay=0.01, max_attempts=10
+    )
+
+    assert server.rejected > 0
+    assert controller.overloads > 0
+    assert controller.concurrency < 12
+    assert all(result["summary"] == "Fake summary." for result in results)
+
+
+def test_connection_errors_are_retried_without_backing_off(serve, monkeypatch):
+    server = serve(FakeOllamaServer(latency=0))
+    controller = AIMDController(initial=4, maximum=4)
+    generate = async_enrichment.agenerate_enriched_chunk
+    failed = set()
+
+    async def flaky(prompt, client):
+        if prompt not in failed:
+            failed.add(prompt)
+            raise httpx.ConnectError("connection refused")
+        return await generate(prompt, client)
+
+    monkeypatch.setattr(async_enrichment, "agenerate_enriched_chunk", flaky)
+
+    results = enrich_chunk_async(numbered_chunks(5), controller=controller, retry_delay=0.01, max_attempts=2)
+
+    assert all(result["summary"] == "Fake summary." for result in results)
+    assert server.requests == 5
+    assert controller.overloads == 0
+
+
+def test_cached_chunks_skip_the_server(serve, tmp_path):
+    server = serve(FakeOllamaServer())
+    cache = EnrichmentCache(tmp_path / "cache.db")
+
+    enrich_chunk_async(numbered_chunks(5), cache=cache)
+    enrich_chunk_async(numbered_chunks(5), cache=cache)
+
+    assert server.requests == 5
+    assert cache.stats.hits == 5
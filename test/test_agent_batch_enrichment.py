@@ -0,0 +1,144 @@
+"""
+Test cases for batched multi-chunk enrichment.
+Tests plan_batches and enrich_chunks_batched from agent.chunk_enrichment.batch_enrichment
+against the local fake Ollama server.
+"""
+import json
+import re
+
+from agent.chunk_enrichment.batch_enrichment import (
+    BatchEnrichmentStats,
+    enrich_chunks_batched,
+    plan_batches,
+)
+from agent.chunk_enrichment.enrichment_cache import EnrichmentCache
+from llm.qwen_ollama_chunking import parse_batch
+from testing.fake_ollama_server import RESPONSE_METADATA, FakeOllamaServer
+from testing.records import numbered_chunks
+
+
+class BatchServer(FakeOllamaServer):
+    """Answers batch prompts entry by entry, leaving out chunks listed in ``drop``."""
+
+    def __init__(self, drop=(), **kwargs):
+        super().__init__(**kwargs)
+        self.drop = set(drop)
+        self.batch_sizes = []
+
+    def response_for(self, request):
+        prompt = request["messages"][-1]["content"]
+        numbers = [int(n) for n in re.findall(r"Chunk number (\d+)", prompt)]
+        if "'chunks' array" not in prompt:
+            return {**RESPONSE_METADATA, "summary": f"summary {numbers[0]}"}
+        self.batch_sizes.append(len(numbers))
+        return {
+            "chunks": [
+                {"id": index, **RESPONSE_METADATA, "summary": f"summary {number}"}
+                for index, number in enumerate(numbers)
+                if number not in self.drop
+            ]
+        }
+
+
+
+def test_plan_batches_respects_budget_and_size():
+    assert plan_batches([100, 100, 100, 100, 100], token_budget=250, max_batch_size=8) == [
+        [0, 1],
+        [2, 3],
+        [4],
+    ]
+    assert plan_batches([1] * 5, token_budget=100, max_batch_size=2) == [[0, 1], [2, 3], [4]]
+    # An oversized entry still gets a batch of its own.
+    assert plan_batches([500, 10], token_budget=100) == [[0], [1]]
+
+
+def test_parse_batch_rejects_invalid_entries():
+    content = json.dumps(
+        {
+            "chunks": [
+                {"id": 0, **RESPONSE_METADATA},
+                {"id": 0, **RESPONSE_METADATA, "summary": "duplicate id"},
+                {"id": 1, **RESPONSE_METADATA, "summary": "  "},
+                {"id": 2, "summary": "missing keywords"},
+                {"id": 7, **RESPONSE_METADATA},
+            ]
+        }
+    )
+
+    results = parse_batch(content, 3)
+
+    assert results[0].summary == "Fake summary."
+    assert results[1:] == [None, None]
+    assert parse_batch("not json", 2) == [None, None]
+
+
+def test_short_chunks_share_prompts_and_keep_order(serve):
+    server = serve(BatchServer())
+    stats = BatchEnrichmentStats()
+
+    results = enrich_chunks_batched(numbered_chunks(10), max_batch_size=4, stats=stats)
+
+    assert [result["summary"] for result in results] == [f"summary {i}" for i in range(10)]
+    assert server.batch_sizes and max(server.batch_sizes) <= 4
+    assert server.requests == stats.calls == 3
+    assert stats.prompt_tokens < stats.single_call_prompt_tokens
+    assert "3 LLM calls for 10 chunks" in stats.report()
+
+
+def test_failed_entries_fall_back_to_single_chunk_calls(serve):
+    server = serve(BatchServer(drop={2, 5}))
+    stats = BatchEnrichmentStats()
+
+    results = enrich_chunks_batched(numbered_chunks(6), stats=stats)
+
+    assert [result["summary"] for result in results] == [f"summary {i}" for i in range(6)]
+    assert stats.batch_calls == 1
+    assert stats.fallback_calls == 2
+    assert server.requests == 3
+
+
+def test_fallback_retries_count_as_calls(serve):
+    class FailingSingles(BatchServer):
+        def response_for(self, request):
+            if "'chunks' array" in request["messages"][-1]["content"]:
+                return super().response_for(request)
+            return {"summary": "missing keywords"}
+
+    server = serve(FailingSingles(drop={2}))
+    stats = BatchEnrichmentStats()
+
+    results = enrich_chunks_batched(numbered_chunks(4), max_attempts=3, stats=stats)
+
+    assert results[2] == {}
+    assert stats.fallback_calls == 3
+    assert server.requests == stats.calls == 4
+
+
+def test_singles_do_not_wait_for_batches(serve):
+    server = serve(BatchServer(latency=0.05))
+
+    enrich_chunks_batched(numbered_chunks(4) + numbered_chunks(1, padding=" x" * 300), max_batch_size=4)
+
+    assert server.peak_in_flight == 2
+
+
+def test_long_chunks_are_enriched_one_per_call(serve):
+    server = serve(BatchServer())
+
+    results = enrich_chunks_batched(numbered_chunks(3, padding=" x" * 300))
+
+    assert [result["summary"] for result in results] == [f"summary {i}" for i in range(3)]
+    assert server.batch_sizes == []
+    assert server.requests == 3
+
+
+def test_cache_is_shared_with_single_chunk_enrichment(serve, tmp_path):
+    server = serve(BatchServer())
+    cache = EnrichmentCache(tmp_path / "cache.db")
+
+    enrich_chunks_batched(numbered_chunks(5), cache=cache)
+    results = enrich_chunks_batched(numbered_chunks(5), cache=cache)
+
+    assert server.requests == 1
+    assert cache.stats.hits == 5
+    assert results[4]["summary"] == "summary 4"
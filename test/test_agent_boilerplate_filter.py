@@ -0,0 +1,122 @@
+"""
+Test cases for boilerplate elimination before chunking.
+Tests BoilerplateFilter from agent.chunk_generation.boilerplate_filter.
+"""
+from unstructured.documents.elements import (
+    ElementMetadata,
+    NarrativeText,
+    PageBreak,
+    Table,
+    Title,
+)
+
+from agent.chunk_generation.boilerplate_filter import BoilerplateFilter
+
+SEGMENTS = ["cloud services", "gaming", "search advertising", "devices", "licensing"]
+BODY = "Revenue from {segment} increased during the period."
+
+
+def _document(filename: str, pages: int, title: str = "Item 7. Management's Discussion"):
+    metadata = ElementMetadata(filename=filename)
+    elements = [Title(text=title, metadata=metadata)]
+    for page in range(1, pages + 1):
+        elements.extend(
+            [
+                Title(text="MICROSOFT CORPORATION FORM 10-K", metadata=metadata),
+                NarrativeText(text=BODY.format(segment=SEGMENTS[page - 1]), metadata=metadata),
+                NarrativeText(text=f"Page {page} of {pages}", metadata=metadata),
+                NarrativeText(text="Table of Contents", metadata=metadata),
+                PageBreak(text="", metadata=metadata),
+            ]
+        )
+    return elements
+
+
+def test_running_headers_and_page_numbers_are_removed():
+    boilerplate_filter = BoilerplateFilter()
+
+    kept = boilerplate_filter.filter(_document("msft-10k.htm", pages=4))
+
+    texts = [e.text for e in kept if e.text]
+    assert texts[0] == "Item 7. Management's Discussion"
+    assert texts[1:] == [BODY.format(segment=s) for s in SEGMENTS[:4]]
+
+
+def test_stats_report_removed_elements_and_characters():
+    boilerplate_filter = BoilerplateFilter(chars_per_chunk=100)
+
+    boilerplate_filter.filter(_document("msft-10k.htm", pages=4))
+
+    stats = boilerplate_filter.stats
+    assert stats.elements_seen == 21
+    assert stats.elements_removed == 12
+    assert stats.characters_removed > 0
+    assert stats.estimated_llm_calls_saved == -(-stats.characters_removed // 100)
+    assert "removed 12/21 elements" in stats.report()
+
+
+def test_header_repeated_on_two_pages_needs_cross_document_evidence():
+    boilerplate_filter = BoilerplateFilter(min_document_repeats=3)
+
+    first = boilerplate_filter.filter(_document("q1.htm", pages=2))
+    assert any(e.text == "MICROSOFT CORPORATION FORM 10-K" for e in first)
+
+    boilerplate_filter.filter(_document("q2.htm", pages=2))
+    third = boilerplate_filter.filter(_document("q3.htm", pages=2))
+    assert not any(e.text == "MICROSOFT CORPORATION FORM 10-K" for e in third)
+
+
+def test_section_titles_shared_across_documents_are_kept():
+    boilerplate_filter = BoilerplateFilter(min_document_repeats=2)
+
+    for name in ("q1.htm", "q2.htm", "q3.htm"):
+        kept = boilerplate_filter.filter(_document(name, pages=1, title="Item 1A. Risk Factors"))
+        assert kept[0].text == "Item 1A. Risk Factors"
+
+
+def test_tables_are_never_removed():
+    metadata = ElementMetadata(filename="msft-10k.htm")
+    elements = []
+    for page in range(1, 5):
+        elements.append(Table(text="Segment 2023 2022", metadata=metadata))
+        elements.append(PageBreak(text="", metadata=metadata))
+
+    kept = BoilerplateFilter().filter(elements)
+
+    assert sum(e.category == "Table" for e in kept) == 4
+
+
+def test_content_differing_only_in_numbers_is_kept():
+    metadata = ElementMetadata(filename="msft-10k.htm")
+    elements = []
+    for note in range(1, 5):
+        elements.extend(
+            [
+                Title(text=f"Note {note}", metadata=metadata),
+                NarrativeText(
+                    text=f"Body of note {note} about leases and revenue recognition policies.",
+                    metadata=metadata,
+                ),
+                PageBreak(text="", metadata=metadata),
+            ]
+        )
+
+    kept = BoilerplateFilter().filter(elements)
+
+    assert [e.text for e in kept if e.text] == [e.text for e in elements if e.text]
+
+
+def test_bare_numbers_are_page_numbers_only_at_the_end_of_a_page():
+    metadata = ElementMetadata(filename="msft-10k.htm")
+    elements = [
+        NarrativeText(text="2023", metadata=metadata),
+        NarrativeText(text="(1)", metadata=metadata),
+        NarrativeText(text="Revenue grew in every segment.", metadata=metadata),
+        NarrativeText(text="12", metadata=metadata),
+        PageBreak(text="", metadata=metadata),
+        NarrativeText(text="- 13 -", metadata=metadata),
+    ]
+
+    kept = BoilerplateFilter().filter(elements)
+
+    assert [e.text for e in kept if e.text] == ["2023", "(1)", "Revenue grew in every segment."]
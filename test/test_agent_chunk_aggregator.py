@@ -4,7 +4,20 @@ import json
 from pathlib import Path
 from typing import Any
 
-from agent.chunk_enrichment.chunk_aggregator import collect_enriched_chunks
+import pytest
+
+from agent.chunk_enrichment.chunk_aggregator import (
+    build_enriched_records,
+    collect_enriched_chunks,
+    delete_stale_records,
+    record_ids_by_file,
+    stored_enrichments,
+    unenriched_records,
+    upsert_enriched_chunks,
+)
+from agent.chunk_enrichment.chunk_store import INDEX_NAME, ShardedChunkStore
+from agent.chunk_enrichment.json_store import JsonChunkStore
+from testing.records import enriched_records
 
 
 class DummyMetadata:
@@ -66,3 +79,220 @@ def test_collect_enriched_chunks_writes_combined_json(tmp_path):
         persisted = json.load(saved)
 
     assert persisted == results
+
+
+class ParsedElement:
+    def __init__(self, element_id: str):
+        self.id = element_id
+
+
+def _chunks(texts, orig_ids=None):
+    chunks = []
+    for text, element_ids in zip(texts, orig_ids or [[] for _ in texts]):
+        metadata = DummyMetadata({})
+        metadata.filename = "msft-10q.htm"
+        metadata.orig_elements = [ParsedElement(element_id) for element_id in element_ids]
+        chunks.append(DummyChunk(text, metadata))
+    return chunks
+
+
+def _build(tmp_path, chunks, summaries):
+    filings_root = tmp_path / "sec"
+    file_path = filings_root / "MSFT" / "10-Q" / "0001" / "full-submission.txt"
+    return build_enriched_records(
+        file_path,
+        chunks,
+        [{"summary": summary, "keywords": []} for summary in summaries],
+        filings_root=filings_root,
+    )
+
+
+def test_chunk_ids_are_stable_and_ignore_random_element_ids(tmp_path):
+    hashed = ["a" * 32, "b" * 32]
+    first = _build(tmp_path, _chunks(["Revenue grew.", "Costs fell."], [hashed, hashed]), ["x", "y"])
+    again = _build(tmp_path, _chunks(["Revenue grew.", "Costs fell."], [hashed, hashed]), ["x", "y"])
+    with_uuid = _build(
+        tmp_path,
+        _chunks(["Revenue grew."], [hashed + ["85720073-5fd8-4599-b0d9-5d041115d405"]]),
+        ["x"],
+    )
+    other_elements = _build(tmp_path, _chunks(["Revenue grew."], [["c" * 32]]), ["x"])
+
+    assert [record["chunk_id"] for record in first] == [record["chunk_id"] for record in again]
+    assert first[0]["chunk_id"] != first[1]["chunk_id"]
+    assert with_uuid[0]["chunk_id"] == first[0]["chunk_id"]
+    assert other_elements[0]["chunk_id"] != first[0]["chunk_id"]
+
+
+def test_reingesting_unchanged_chunks_does_not_rewrite_the_json_file(tmp_path):
+    output_path = tmp_path / "enriched_chunks.json"
+    records = _build(tmp_path, _chunks(["Revenue grew.", "Costs fell."]), ["x", "y"])
+
+    first = upsert_enriched_chunks(records, output_path)
+    written_at = output_path.stat().st_mtime_ns
+    second = upsert_enriched_chunks(
+        _build(tmp_path, _chunks(["Revenue grew.", "Costs fell."]), ["x", "y"]), output_path
+    )
+
+    assert (first.inserted, first.unchanged) == (2, 0)
+    assert (second.inserted, second.updated, second.unchanged, second.changed) == (0, 0, 2, [])
+    assert output_path.stat().st_mtime_ns == written_at
+
+    third = upsert_enriched_chunks(
+        _build(tmp_path, _chunks(["Revenue grew.", "Costs fell."]), ["x", "new summary"]), output_path
+    )
+
+    assert (third.updated, third.unchanged) == (1, 1)
+    stored = json.loads(output_path.read_text(encoding="utf-8"))
+    assert [record["summary"] for record in stored] == ["x", "new summary"]
+
+
+@pytest.mark.parametrize("kind", ["json", "sharded"])
+def test_stored_enrichments_are_found_by_chunk_id(tmp_path, kind):
+    output = tmp_path / "enriched_chunks.json"
+    if kind == "sharded":
+        output = ShardedChunkStore(tmp_path / "store", fsync=False)
+    upsert_enriched_chunks(_build(tmp_path, _chunks(["Revenue grew.", "Costs fell."]), ["x", "y"]), output)
+
+    found = stored_enrichments(
+        tmp_path / "sec" / "MSFT" / "10-Q" / "0001" / "full-submission.txt",
+        _chunks(["Costs fell.", "Margins rose."]),
+        output,
+        filings_root=tmp_path / "sec",
+    )
+
+    assert found == [{"summary": "y", "keywords": []}, None]
+
+
+def test_unenriched_records_cover_the_dropped_chunks(tmp_path):
+    filings_root = tmp_path / "sec"
+    file_path = filings_root / "MSFT" / "10-Q" / "0001" / "full-submission.txt"
+    chunks = _chunks(["Revenue grew.", "Costs fell.", "Margins rose."])
+    metadata = [{"summary": "x"}, {}]
+
+    kept = build_enriched_records(file_path, chunks, metadata, filings_root=filings_root)
+    dropped = unenriched_records(file_path, chunks, metadata, filings_root=filings_root)
+
+    assert [record["content"] for record in dropped] == ["Costs fell.", "Margins rose."]
+    assert {record["chunk_id"] for record in kept + dropped} == {
+        record["chunk_id"]
+        for record in build_enriched_records(file_path, chunks, [{"summary": "x"}] * 3, filings_root=filings_root)
+    }
+    assert "summary" not in dropped[0]
+
+
+def test_stores_upsert_through_their_index(tmp_path):
+    store = ShardedChunkStore(tmp_path / "store", fsync=False)
+    records = _build(tmp_path, _chunks(["Revenue grew.", "Costs fell."]), ["x", "y"])
+    upsert_enriched_chunks(records, store)
+    index_size = (tmp_path / "store" / INDEX_NAME).stat().st_size
+
+    unchanged = upsert_enriched_chunks(records, store)
+
+    assert unchanged.changed == []
+    assert (tmp_path / "store" / INDEX_NAME).stat().st_size == index_size
+
+    updated = upsert_enriched_chunks(
+        _build(tmp_path, _chunks(["Costs fell."]), ["new summary"]), store
+    )
+
+    assert updated.updated == 1
+    assert len(store) == 2
+    assert sorted(record["summary"] for record in store) == ["new summary", "x"]
+
+
+def test_columnar_store_replaces_updated_rows(tmp_path):
+    pytest.importorskip("pyarrow")
+    from agent.chunk_enrichment.columnar_store import ColumnarChunkStore
+
+    store = ColumnarChunkStore(tmp_path / "store")
+    upsert_enriched_chunks(_build(tmp_path, _chunks(["Revenue grew.", "Costs fell."]), ["x", "y"]), store)
+
+    result = upsert_enriched_chunks(
+        _build(tmp_path, _chunks(["Revenue grew.", "Costs fell."]), ["x", "new summary"]), store
+    )
+
+    assert (result.updated, result.unchanged) == (1, 1)
+    assert len(store) == 2
+    assert sorted(record["summary"] for record in store) == ["new summary", "x"]
+
+
+def test_chunks_are_labelled_by_the_filing_they_came_from(tmp_path):
+    from unstructured.chunking.title import chunk_by_title
+    from unstructured.documents.elements import ElementMetadata, NarrativeText
+
+    filings_root = tmp_path / "sec"
+    filings = [
+        ("10-K", "0000950170-23-035122", "2023-07-27"),
+        ("10-Q", "0000950170-24-008814", "2024-01-30"),
+    ]
+    elements = []
+    for form, accession, filed in filings:
+        metadata = ElementMetadata(filename=f"{form}.htm")
+        metadata.source_file = (filings_root / "MSFT" / form / accession / "full-submission.txt").as_posix()
+        metadata.accession_number = accession
+        metadata.form_type = form
+        metadata.filing_date = filed
+        elements.append(NarrativeText(text=f"Revenue grew in the {form} period.", metadata=metadata))
+    chunks = [chunk for element in elements for chunk in chunk_by_title([element])]
+
+    records = build_enriched_records(
+        filings_root, chunks, [{"summary": "s"}, {"summary": "s"}], filings_root=filings_root
+    )
+
+    assert [record["source"] for record in records] == [
+        "10-K/0000950170-23-035122",
+        "10-Q/0000950170-24-008814",
+    ]
+    assert [record["form_type"] for record in records] == ["10-K", "10-Q"]
+    assert records[1]["accession_number"] == "0000950170-24-008814"
+    assert records[1]["filing_date"] == "2024-01-30"
+    assert records[0]["source_file"].endswith("0000950170-23-035122/full-submission.txt")
+
+
+def _store(tmp_path, kind):
+    if kind == "json":
+        return tmp_path / "enriched_chunks.json"
+    if kind == "json-store":
+        return JsonChunkStore(tmp_path / "enriched_chunks.json")
+    if kind == "sharded":
+        return ShardedChunkStore(tmp_path / "store", fsync=False)
+    pytest.importorskip("pyarrow")
+    from agent.chunk_enrichment.columnar_store import ColumnarChunkStore
+
+    return ColumnarChunkStore(tmp_path / "store")
+
+
+@pytest.mark.parametrize("kind", ["json", "json-store", "sharded", "columnar"])
+def test_a_shrunk_filing_leaves_no_stale_records(tmp_path, kind):
+    output = _store(tmp_path, kind)
+    upsert_enriched_chunks(enriched_records("10-Q/0001", 6) + enriched_records("10-K/0002", 2), output)
+
+    reingested = enriched_records("10-Q/0001", 2)
+    (source_file, keep_ids), = record_ids_by_file(reingested).items()
+    removed = delete_stale_records(output, source_file, keep_ids)
+
+    assert removed == 4
+    assert delete_stale_records(output, source_file, keep_ids) == 0
+    if isinstance(output, JsonChunkStore):
+        output.close()
+    stored = json.loads(output.read_text()) if isinstance(output, Path) else list(output)
+    assert sorted(record["chunk_id"] for record in stored) == [
+        "10-K/0002-0", "10-K/0002-1", "10-Q/0001-0", "10-Q/0001-1",
+    ]
+    assert delete_stale_records(output, "MSFT/10-K/0002/full-submission.txt", set()) == 2
+
+
+def test_records_can_be_built_without_a_filings_root(tmp_path):
+    file_path = tmp_path / "sec" / "MSFT" / "10-Q" / "0001" / "full-submission.txt"
+    chunks = _chunks(["Revenue grew.", "Costs fell."])
+
+    records = build_enriched_records(file_path, chunks, [{"summary": "x"}])
+    output = tmp_path / "enriched_chunks.json"
+    upsert_enriched_chunks(records, output)
+
+    assert records[0]["source"] == file_path.parts[1] + "/" + file_path.parts[2]
+    assert stored_enrichments(file_path, chunks, output) == [{"summary": "x"}, None]
+    assert [record["content"] for record in unenriched_records(file_path, chunks, [{"summary": "x"}])] == [
+        "Costs fell."
+    ]
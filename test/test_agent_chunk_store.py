@@ -0,0 +1,173 @@
+"""
+Test cases for the sharded enriched chunk store.
+Tests ShardedChunkStore and migrate_json_file from agent.chunk_enrichment.chunk_store
+and their use in persist_enriched_records.
+"""
+import json
+
+import pytest
+
+from agent.chunk_enrichment.chunk_aggregator import persist_enriched_records
+from agent.chunk_enrichment.chunk_store import (
+    INDEX_NAME,
+    ShardedChunkStore,
+    migrate_json_file,
+    record_id,
+)
+from testing.records import enriched_records
+
+
+def test_records_rotate_into_shards_and_stream_back_in_order(tmp_path):
+    store = ShardedChunkStore(tmp_path / "store", shard_max_records=3, fsync=False)
+
+    store.append(enriched_records("10-Q/0001", 4))
+    store.append(enriched_records("10-Q/0001", 3, start=4))
+
+    assert [path.name for path in store.shards()] == [
+        "shard-00000.jsonl",
+        "shard-00001.jsonl",
+        "shard-00002.jsonl",
+    ]
+    assert [record["summary"] for record in store] == [f"S{i}" for i in range(7)]
+    assert len(store) == 7
+    assert store.stats.sealed_shards == 2
+
+
+def test_zstd_shards_are_sealed_and_still_indexed(tmp_path):
+    pytest.importorskip("zstandard")
+    store = ShardedChunkStore(tmp_path / "store", shard_max_records=2, compression="zstd", fsync=False)
+    records = enriched_records("10-Q/0001", 5)
+
+    store.append(records)
+
+    assert [path.name for path in store.shards()] == [
+        "shard-00000.jsonl.zst",
+        "shard-00001.jsonl.zst",
+        "shard-00002.jsonl",
+    ]
+    assert store.get(record_id(records[1]))["summary"] == "S1"
+    assert store.get(record_id(records[4]))["summary"] == "S4"
+    assert store.get("missing") is None
+    assert list(store) == records
+
+
+def test_get_many_reads_each_compressed_shard_once(tmp_path):
+    pytest.importorskip("zstandard")
+    store = ShardedChunkStore(tmp_path / "store", shard_max_records=3, compression="zstd", fsync=False)
+    records = enriched_records("10-Q/0001", 8)
+    store.append(records)
+    store.append([{**records[1], "summary": "newer"}])
+    opened = []
+    open_for_reading = store._open_for_reading
+    store._open_for_reading = lambda path, offset=0: opened.append(path.name) or open_for_reading(
+        path, offset
+    )
+
+    wanted = [record_id(records[i]) for i in (5, 0, 2, 1, 7)] + ["missing", record_id(records[0])]
+    found = store.get_many(wanted)
+
+    assert sorted(opened) == ["shard-00000.jsonl.zst", "shard-00001.jsonl.zst", "shard-00002.jsonl"]
+    assert {rid: record["summary"] for rid, record in found.items()} == {
+        record_id(records[0]): "S0",
+        record_id(records[1]): "newer",
+        record_id(records[2]): "S2",
+        record_id(records[5]): "S5",
+        record_id(records[7]): "S7",
+    }
+
+
+def test_reopening_recovers_from_a_crash_mid_append(tmp_path):
+    directory = tmp_path / "store"
+    store = ShardedChunkStore(directory, fsync=False)
+    store.append(enriched_records("10-Q/0001", 2))
+    store.close()
+
+    # A record reached the shard without its index entry, and a second one was cut short.
+    with (directory / "shard-00000.jsonl").open("a", encoding="utf-8") as shard_file:
+        shard_file.write(json.dumps(enriched_records("10-Q/0001", 1, start=2)[0]) + "\n")
+        shard_file.write('{"source": "10-Q/0001", "cont')
+
+    reopened = ShardedChunkStore(directory, fsync=False)
+
+    assert [record["summary"] for record in reopened] == ["S0", "S1", "S2"]
+    assert reopened.get(record_id(enriched_records("10-Q/0001", 1, start=2)[0]))["summary"] == "S2"
+    reopened.append(enriched_records("10-Q/0001", 1, start=3))
+    assert [record["summary"] for record in reopened] == ["S0", "S1", "S2", "S3"]
+    assert len((directory / INDEX_NAME).read_text().splitlines()) == 4
+
+
+def test_removed_records_stay_removed_after_reopening(tmp_path):
+    directory = tmp_path / "store"
+    store = ShardedChunkStore(directory, fsync=False)
+    store.append(enriched_records("10-Q/0001", 3) + enriched_records("10-K/0002", 1, start=3))
+
+    # The last record of the open shard is removed too, so reopening must not re-index it.
+    assert store.remove(["10-Q/0001-2", "10-Q/0001-0", "10-K/0002-3", "missing"]) == 3
+    assert store.file_ids("MSFT/10-Q/0001/full-submission.txt") == {"10-Q/0001-1"}
+    store.close()
+
+    reopened = ShardedChunkStore(directory, fsync=False)
+
+    assert [record["chunk_id"] for record in reopened] == ["10-Q/0001-1"]
+    assert reopened.get_many(["10-Q/0001-2"]) == {}
+    assert reopened.file_ids("MSFT/10-Q/0001/full-submission.txt") == {"10-Q/0001-1"}
+    assert reopened.file_ids("MSFT/10-K/0002/full-submission.txt") == set()
+
+
+def test_indexes_without_source_files_are_filled_in_by_one_scan(tmp_path):
+    directory = tmp_path / "store"
+    store = ShardedChunkStore(directory, fsync=False)
+    store.append(enriched_records("10-Q/0001", 2))
+    store.close()
+    index = directory / INDEX_NAME
+    entries = [json.loads(line) for line in index.read_text().splitlines()]
+    index.write_text("".join(
+        json.dumps({key: entry[key] for key in ("id", "shard", "offset")}) + "\n" for entry in entries
+    ))
+
+    reopened = ShardedChunkStore(directory, fsync=False)
+
+    assert reopened.file_ids("MSFT/10-Q/0001/full-submission.txt") == {"10-Q/0001-0", "10-Q/0001-1"}
+
+
+def test_interrupted_seal_keeps_the_compressed_copy(tmp_path):
+    pytest.importorskip("zstandard")
+    directory = tmp_path / "store"
+    store = ShardedChunkStore(directory, shard_max_records=2, compression="zstd", fsync=False)
+    store.append(enriched_records("10-Q/0001", 3))
+    store.close()
+
+    # Crash after the atomic rename but before the plain shard was removed.
+    (directory / "shard-00000.jsonl").write_text("stale\n", encoding="utf-8")
+    (directory / "leftover.tmp").write_bytes(b"partial")
+
+    reopened = ShardedChunkStore(directory, shard_max_records=2, compression="zstd", fsync=False)
+
+    assert not (directory / "shard-00000.jsonl").exists()
+    assert not (directory / "leftover.tmp").exists()
+    assert [record["summary"] for record in reopened] == ["S0", "S1", "S2"]
+
+
+def test_migration_copies_the_legacy_json_once(tmp_path):
+    legacy = tmp_path / "enriched_chunks.json"
+    legacy.write_text(json.dumps(enriched_records("10-Q/0001", 3)), encoding="utf-8")
+    store = ShardedChunkStore(tmp_path / "store", fsync=False)
+    store.append(enriched_records("10-Q/0001", 1))
+
+    assert migrate_json_file(legacy, store) == 2
+    assert not legacy.exists()
+    assert (tmp_path / "enriched_chunks.json.migrated").exists()
+    assert [record["summary"] for record in store] == ["S0", "S1", "S2"]
+
+
+def test_persist_appends_to_a_store_without_rereading_it(tmp_path):
+    store = ShardedChunkStore(tmp_path / "store", fsync=False)
+    persist_enriched_records(enriched_records("10-Q/0001", 2), store, source="a.htm")
+
+    returned = persist_enriched_records(enriched_records("10-Q/0001", 1, start=2), store, source="b.htm")
+
+    assert returned == enriched_records("10-Q/0001", 1, start=2)
+    assert len(store) == 3
+
+    persist_enriched_records(enriched_records("10-Q/0001", 1, start=5), store, append=False)
+    assert [record["summary"] for record in store] == ["S5"]
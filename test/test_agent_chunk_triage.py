@@ -0,0 +1,101 @@
+"""
+Test cases for rule-based enrichment triage.
+Tests ChunkTriage, tfidf_keywords and enrich_with_triage from
+agent.chunk_enrichment.chunk_triage.
+"""
+from unstructured.documents.elements import ElementMetadata, Table
+
+from agent.chunk_enrichment.chunk_triage import (
+    CHEAP,
+    FULL,
+    SKIP,
+    SKIPPED_METADATA,
+    ChunkTriage,
+    TriageThresholds,
+    enrich_with_triage,
+    tfidf_keywords,
+)
+from testing.records import text_chunk
+
+PROSE = (
+    "Revenue increased 15% driven by growth in Azure and other cloud services. "
+    "Operating expenses rose modestly as we invested in cloud engineering, while "
+    "gross margin percentage decreased slightly due to the mix of cloud offerings. "
+    "We expect continued demand for our AI infrastructure in the next fiscal year."
+)
+SIGNATURE = (
+    "Pursuant to the requirements of the Securities Exchange Act of 1934, the Registrant has "
+    "duly caused this report to be signed on its behalf by the undersigned. "
+    "/s/ Amy E. Hood Executive Vice President and Chief Financial Officer"
+)
+CHECKBOXES = (
+    "Indicate by check mark whether the registrant is a large accelerated filer ☒ "
+    "Accelerated filer ☐ Non-accelerated filer ☐ Smaller reporting company ☐"
+)
+EXHIBITS = (
+    "31.1* Certification of Chief Executive Officer pursuant to Section 302\n"
+    "31.2* Certification of Chief Financial Officer pursuant to Section 302\n"
+    "32.1** Certification of Chief Executive Officer pursuant to Section 906\n"
+    "* Filed herewith. ** Furnished herewith."
+)
+
+
+
+def test_rules_route_chunks():
+    triage = ChunkTriage()
+
+    assert triage.classify(PROSE, is_table=False) == (FULL, "prose")
+    assert triage.classify("Item 1A.", is_table=False) == (SKIP, "fragment")
+    assert triage.classify(SIGNATURE, is_table=False) == (SKIP, "signature")
+    assert triage.classify(CHECKBOXES, is_table=False) == (SKIP, "checkboxes")
+    assert triage.classify("1,234 5,678 9,012 3,456 " * 5, is_table=False) == (SKIP, "mostly numbers")
+    assert triage.classify(EXHIBITS, is_table=False) == (CHEAP, "exhibit index")
+    assert triage.classify(PROSE[:200], is_table=False) == (CHEAP, "short")
+    assert triage.classify("1,234 5,678 9,012 3,456 " * 5, is_table=True) == (FULL, "table")
+
+
+def test_thresholds_are_configurable():
+    strict = ChunkTriage(TriageThresholds(skip_below_chars=10, cheap_below_chars=1000))
+
+    assert strict.classify("Item 1A. Risk Factors", is_table=False) == (CHEAP, "short")
+    assert strict.classify(PROSE, is_table=False) == (CHEAP, "short")
+
+
+def test_tfidf_prefers_terms_specific_to_each_text():
+    keywords = tfidf_keywords([
+        "Cloud revenue grew. Cloud margins rose. Cloud demand lifted revenue.",
+        "Gaming revenue fell. Xbox content fell.",
+    ])
+
+    assert keywords[0][0] == "cloud"
+    assert "revenue" not in keywords[1][:2]
+
+
+def test_only_full_chunks_reach_the_llm():
+    table = Table(
+        text="Segment Revenue Intelligent Cloud 25,880 Productivity 19,570 Personal Computing 13,183",
+        metadata=ElementMetadata(filename="msft-10q.htm", text_as_html="<table></table>"),
+    )
+    chunks = [text_chunk(PROSE), text_chunk(SIGNATURE), text_chunk(EXHIBITS), table]
+    sent = []
+
+    def enrich(batch):
+        sent.extend(batch)
+        return [{"summary": "LLM summary", "keywords": ["llm"]} for _ in batch]
+
+    triage = ChunkTriage()
+    results = enrich_with_triage(chunks, enrich, triage)
+
+    assert sent == [chunks[0], chunks[3]]
+    assert [result["enrichment"] for result in results] == [FULL, SKIP, CHEAP, FULL]
+    assert results[1]["summary"] == SKIPPED_METADATA["summary"]
+    assert results[2]["summary"].startswith("31.1* Certification")
+    assert "certification" in results[2]["keywords"]
+    assert triage.stats.llm_calls_avoided == 2
+    assert "2 LLM calls avoided" in triage.stats.report()
+
+
+def test_failed_full_enrichment_stays_empty():
+    results = enrich_with_triage([text_chunk(PROSE)], lambda batch: [{}], ChunkTriage())
+
+    assert results == [{}]
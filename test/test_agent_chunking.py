@@ -4,7 +4,7 @@ Tests the title_chunker function from agent.chunk_generation.title_chunker
 """
 import pytest
 from unstructured.documents.elements import Text, Title, ElementMetadata
-from agent.chunk_generation.title_chunker import title_chunker
+from agent.chunk_generation.title_chunker import iter_title_chunks, title_chunker
 
 
 class TestTitleChunker:
@@ -120,6 +120,20 @@ class TestTitleChunker:
             if 'text_as_html' in metadata_dict:
                 assert metadata_dict['text_as_html'] is not None
 
+    def test_iter_title_chunks_chunks_each_document(self, sample_elements, large_text_elements):
+        """Test that streaming chunking yields chunks per document and skips empty ones."""
+        documents = [
+            ("first.txt", sample_elements),
+            ("empty.txt", []),
+            ("second.txt", large_text_elements),
+        ]
+
+        results = list(iter_title_chunks(iter(documents)))
+
+        assert [name for name, _ in results] == ["first.txt", "second.txt"]
+        assert results[0][1] == title_chunker(sample_elements)
+        assert len(results[1][1]) > 1
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,98 @@
+"""
+Test cases for the columnar enriched chunk store.
+Tests ColumnarChunkStore from agent.chunk_enrichment.columnar_store.
+"""
+import json
+
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from agent.chunk_enrichment.chunk_aggregator import persist_enriched_records  # noqa: E402
+from agent.chunk_enrichment.chunk_store import migrate_json_file  # noqa: E402
+from agent.chunk_enrichment.columnar_store import ColumnarChunkStore  # noqa: E402
+from testing.records import enriched_records  # noqa: E402
+
+
+@pytest.mark.parametrize("format", ["parquet", "arrow"])
+def test_records_round_trip_partitioned_by_source(tmp_path, format):
+    store = ColumnarChunkStore(tmp_path / "store", format=format)
+    store.append(enriched_records("10-Q/0001", 2))
+    store.append(enriched_records("10-K/0002", 1, start=2))
+    store.append(enriched_records("10-Q/0001", 1, start=3))
+
+    assert sorted(path.name for path in (tmp_path / "store").iterdir()) == [
+        "source=10-K%2F0002",
+        "source=10-Q%2F0001",
+    ]
+    assert store.sources() == ["10-K/0002", "10-Q/0001"]
+    assert len(store) == 4
+    assert sorted(store, key=lambda record: record["summary"]) == (
+        enriched_records("10-Q/0001", 2) + enriched_records("10-K/0002", 1, start=2) + enriched_records("10-Q/0001", 1, start=3)
+    )
+
+
+def test_reads_select_columns_and_sources(tmp_path):
+    store = ColumnarChunkStore(tmp_path / "store")
+    store.append(enriched_records("10-Q/0001", 3) + enriched_records("10-K/0002", 2, start=3))
+
+    table = store.read(columns=["summary"], sources=["10-K/0002"])
+
+    assert table.column_names == ["summary"]
+    assert table.column("summary").to_pylist() == ["S3", "S4"]
+    batches = list(store.iter_records(columns=["content", "keywords"], batch_size=2))
+    assert all(len(batch) <= 2 for batch in batches)
+    assert {tuple(record) for batch in batches for record in batch} == {("content", "keywords")}
+
+
+def test_fields_outside_the_schema_survive_in_extra(tmp_path):
+    store = ColumnarChunkStore(tmp_path / "store")
+    record = {**enriched_records("10-Q/0001", 1)[0], "dedup_group": "abc", "enrichment": "cheap"}
+
+    store.append([record])
+
+    assert list(store) == [record]
+
+
+def test_persist_and_migrate_into_the_columnar_store(tmp_path):
+    legacy = tmp_path / "enriched_chunks.json"
+    legacy.write_text(json.dumps(enriched_records("10-Q/0001", 2)), encoding="utf-8")
+    store = ColumnarChunkStore(tmp_path / "store")
+
+    assert migrate_json_file(legacy, store) == 2
+    returned = persist_enriched_records(enriched_records("10-K/0002", 1, start=2), store, source="b.htm")
+
+    assert returned == enriched_records("10-K/0002", 1, start=2)
+    assert len(store) == 3
+    assert store.stats.migrated == 2
+
+    persist_enriched_records(enriched_records("10-K/0002", 1, start=5), store, append=False)
+    assert [record["summary"] for record in store] == ["S5"]
+
+
+@pytest.mark.parametrize("format", ["parquet", "arrow"])
+def test_remove_only_rewrites_files_holding_the_ids(tmp_path, format):
+    store = ColumnarChunkStore(tmp_path / "store", format=format)
+    store.append(enriched_records("10-Q/0001", 2))
+    store.append(enriched_records("10-Q/0001", 2, start=2))
+    store.append(enriched_records("10-K/0002", 2, start=4))
+    files = sorted((tmp_path / "store").rglob(f"*.{format}"))
+    before = {path: path.stat().st_mtime_ns for path in files}
+
+    assert store.remove(["10-Q/0001-3", "missing"]) == 1
+    assert store.remove(["10-K/0002-4"], sources=["10-Q/0001"]) == 0
+
+    changed = [path for path in files if not path.exists() or path.stat().st_mtime_ns != before[path]]
+    assert [path.parent.name for path in changed] == ["source=10-Q%2F0001"]
+    assert sorted(record["chunk_id"] for record in store) == [
+        "10-K/0002-4", "10-K/0002-5", "10-Q/0001-0", "10-Q/0001-1", "10-Q/0001-2",
+    ]
+
+
+def test_get_many_reads_only_the_given_sources(tmp_path):
+    store = ColumnarChunkStore(tmp_path / "store")
+    store.append(enriched_records("10-Q/0001", 2) + enriched_records("10-K/0002", 2, start=2))
+
+    assert set(store.get_many(["10-Q/0001-1", "10-K/0002-2"])) == {"10-Q/0001-1", "10-K/0002-2"}
+    assert set(store.get_many(["10-Q/0001-1", "10-K/0002-2"], sources=["10-Q/0001"])) == {"10-Q/0001-1"}
+    assert store.get_many(["10-Q/0001-1"], sources=[]) == {}
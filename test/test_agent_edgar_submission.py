@@ -0,0 +1,174 @@
+"""
+Test cases for EDGAR full-submission splitting.
+Tests agent.parser.edgar_submission and its use in parse_html.
+"""
+import pytest
+from unstructured.documents.elements import ElementMetadata, NarrativeText
+
+from agent.parser import parse_html as parse_html_module
+from agent.parser.edgar_submission import (
+    filing_provenance,
+    index_submission,
+    is_full_submission,
+    iter_selected_documents,
+)
+from agent.parser.parse_html import parse_html
+
+SUBMISSION = """<SEC-DOCUMENT>0000950170-23-035122.txt : 20230727
+<SEC-HEADER>0000950170-23-035122.hdr.sgml : 20230727
+ACCESSION NUMBER:\t\t0000950170-23-035122
+CONFORMED SUBMISSION TYPE:\t10-K
+FILED AS OF DATE:\t\t20230727
+</SEC-HEADER>
+<DOCUMENT>
+<TYPE>10-K
+<SEQUENCE>1
+<FILENAME>msft-10k_20230630.htm
+<DESCRIPTION>10-K
+<TEXT>
+<XBRL>
+<html><body><p>Annual report body</p></body></html>
+</XBRL>
+</TEXT>
+</DOCUMENT>
+<DOCUMENT>
+<TYPE>EX-21.1
+<SEQUENCE>2
+<FILENAME>msft-ex21.htm
+<TEXT>
+<html><body><p>Subsidiaries</p></body></html>
+</TEXT>
+</DOCUMENT>
+<DOCUMENT>
+<TYPE>EX-99.1
+<SEQUENCE>3
+<FILENAME>press.pdf
+<TEXT>
+begin 644 press.pdf
+M)5!$1BTQ+C0*)>+CS],*
+end
+</TEXT>
+</DOCUMENT>
+<DOCUMENT>
+<TYPE>GRAPHIC
+<SEQUENCE>4
+<FILENAME>logo.jpg
+<TEXT>
+begin 644 logo.jpg
+M_]C_X``02D9)1@`!`0$`8`!@``#_
+end
+</TEXT>
+</DOCUMENT>
+</SEC-DOCUMENT>
+"""
+
+
+@pytest.fixture
+def submission_path(tmp_path):
+    path = tmp_path / "MSFT" / "10-K" / "0000950170-23-035122" / "full-submission.txt"
+    path.parent.mkdir(parents=True)
+    path.write_text(SUBMISSION, encoding="utf-8")
+    return path
+
+
+def test_index_submission_records_every_document(submission_path):
+    documents = index_submission(submission_path)
+
+    assert [d.type for d in documents] == ["10-K", "EX-21.1", "EX-99.1", "GRAPHIC"]
+    assert [d.sequence for d in documents] == [1, 2, 3, 4]
+    assert documents[0].filename == "msft-10k_20230630.htm"
+
+
+def test_selected_documents_are_unwrapped_and_binaries_skipped(submission_path):
+    selected = list(iter_selected_documents(submission_path, ["10-K", "EX-99.1", "GRAPHIC"]))
+
+    assert [document.type for document, _ in selected] == ["10-K"]
+    body = selected[0][1]
+    assert body.startswith(b"<html>")
+    assert b"<XBRL>" not in body
+
+
+def test_is_full_submission_detects_marker(tmp_path, submission_path):
+    renamed = tmp_path / "filing.txt"
+    renamed.write_text(SUBMISSION, encoding="utf-8")
+    plain = tmp_path / "notes.txt"
+    plain.write_text("just notes", encoding="utf-8")
+
+    assert is_full_submission(submission_path)
+    assert is_full_submission(renamed)
+    assert not is_full_submission(plain)
+
+
+def test_parse_html_only_partitions_selected_documents(submission_path, monkeypatch):
+    calls = []
+
+    def fake_partition(file=None, metadata_filename=None, **kwargs):
+        calls.append(metadata_filename)
+        return [NarrativeText(text=file.read().decode(), metadata=ElementMetadata())]
+
+    monkeypatch.setattr(parse_html_module, "partition", fake_partition)
+
+    elements = parse_html(str(submission_path.parents[2]), document_types=["10-K", "EX-21.1"])
+
+    assert calls == ["msft-10k_20230630.htm", "msft-ex21.htm"]
+    assert "Annual report body" in elements[0].text
+
+
+def test_documents_without_a_filename_get_a_flat_fallback_name(tmp_path, monkeypatch):
+    path = tmp_path / "MSFT" / "10-K" / "0000950170-23-035122" / "full-submission.txt"
+    path.parent.mkdir(parents=True)
+    path.write_text(
+        SUBMISSION.replace("<TYPE>10-K\n", "<TYPE>10-K/A\n").replace(
+            "<FILENAME>msft-10k_20230630.htm\n", ""
+        ),
+        encoding="utf-8",
+    )
+    calls = []
+
+    def fake_partition(file=None, metadata_filename=None, **kwargs):
+        calls.append(metadata_filename)
+        return [NarrativeText(text=file.read().decode(), metadata=ElementMetadata())]
+
+    monkeypatch.setattr(parse_html_module, "partition", fake_partition)
+
+    parse_html(str(tmp_path), document_types=["10-K/A"])
+
+    assert calls == ["full-submission-10-K_A.txt"]
+
+
+def test_provenance_comes_from_the_submission_header(submission_path):
+    provenance = filing_provenance(submission_path)
+
+    assert provenance.accession_number == "0000950170-23-035122"
+    assert provenance.form_type == "10-K"
+    assert provenance.filing_date == "2023-07-27"
+    assert provenance.source_file == submission_path.as_posix()
+
+
+def test_provenance_falls_back_to_the_download_path(tmp_path):
+    document = tmp_path / "MSFT" / "10-Q" / "0000950170-24-008814" / "primary-document.html"
+    document.parent.mkdir(parents=True)
+    document.write_text("<html><body><p>Quarterly report</p></body></html>", encoding="utf-8")
+    loose = tmp_path / "notes.html"
+    loose.write_text("<p>notes</p>", encoding="utf-8")
+
+    assert filing_provenance(document).as_metadata() == {
+        "source_file": document.as_posix(),
+        "accession_number": "0000950170-24-008814",
+        "form_type": "10-Q",
+    }
+    assert filing_provenance(loose).as_metadata() == {"source_file": loose.as_posix()}
+
+
+def test_parsed_elements_carry_filing_provenance(submission_path, monkeypatch):
+    def fake_partition(file=None, metadata_filename=None, **kwargs):
+        return [NarrativeText(text=file.read().decode(), metadata=ElementMetadata(filename=metadata_filename))]
+
+    monkeypatch.setattr(parse_html_module, "partition", fake_partition)
+
+    elements = parse_html(str(submission_path.parents[2]), document_types=["10-K", "EX-21.1"])
+
+    assert {element.metadata.accession_number for element in elements} == {"0000950170-23-035122"}
+    assert {element.metadata.form_type for element in elements} == {"10-K"}
+    assert elements[0].metadata.filing_date == "2023-07-27"
+    assert elements[0].metadata.source_file == submission_path.as_posix()
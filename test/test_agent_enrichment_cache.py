@@ -0,0 +1,89 @@
+"""
+Test cases for the persistent enrichment cache.
+Tests EnrichmentCache from agent.chunk_enrichment.enrichment_cache and its use in enrich_chunk.
+"""
+import time
+from unittest.mock import patch
+
+from unstructured.documents.elements import ElementMetadata, Text
+
+from agent.chunk_enrichment.enrichment_cache import EnrichmentCache
+from agent.chunk_enrichment.llm_enrichment import enrich_chunk
+from llm.qwen_ollama_chunking import ChunkMetadata
+
+METADATA = ChunkMetadata(
+    summary="Revenue grew 15%.",
+    keywords=["revenue"],
+    hypothetical_questions=["How much did revenue grow?"],
+    table_summary=None,
+)
+
+
+def test_key_covers_content_table_flag_expert_prompt_and_model(tmp_path):
+    cache = EnrichmentCache(tmp_path / "cache.db")
+    base = cache.key("Revenue grew.", False, "financial analyst")
+
+    assert base == cache.key("Revenue grew.", False, "financial analyst")
+    assert base != cache.key("Revenue fell.", False, "financial analyst")
+    assert base != cache.key("Revenue grew.", True, "financial analyst")
+    assert base != cache.key("Revenue grew.", False, "auditor")
+    assert base != EnrichmentCache(tmp_path / "cache.db", prompt_version="next").key(
+        "Revenue grew.", False, "financial analyst"
+    )
+    assert base != EnrichmentCache(tmp_path / "cache.db", model="qwen2.5:7b").key(
+        "Revenue grew.", False, "financial analyst"
+    )
+
+
+def test_entries_survive_reopen_and_count_hits(tmp_path):
+    first = EnrichmentCache(tmp_path / "cache.db")
+    key = first.key("Revenue grew.", False, "financial analyst")
+    assert first.get(key) is None
+    first.put(key, {"summary": "cached"})
+    first.close()
+
+    second = EnrichmentCache(tmp_path / "cache.db")
+    assert second.get(key) == {"summary": "cached"}
+    assert (second.stats.hits, second.stats.misses) == (1, 0)
+    assert "hit rate 100.0%" in second.stats.report()
+
+
+def test_prune_drops_other_versions_and_stale_entries(tmp_path):
+    old_prompt = EnrichmentCache(tmp_path / "cache.db", prompt_version="0")
+    old_prompt.put(old_prompt.key("a", False, "x"), {"summary": "old prompt"})
+
+    cache = EnrichmentCache(tmp_path / "cache.db")
+    cache.put(cache.key("b", False, "x"), {"summary": "current"})
+    assert cache.prune() == 1
+    assert len(cache) == 1
+
+    time.sleep(0.01)
+    assert cache.prune(max_age_days=0) == 1
+    assert len(cache) == 0
+
+
+def test_enrich_chunk_reuses_cached_metadata_on_rerun(tmp_path):
+    chunk = Text(text="Revenue grew 15%.", metadata=ElementMetadata(filename="msft.htm"))
+    cache = EnrichmentCache(tmp_path / "cache.db")
+
+    with patch(
+        "agent.chunk_enrichment.llm_enrichment.generate_enriched_chunk", return_value=METADATA
+    ) as generate:
+        first = enrich_chunk([chunk], cache=cache)
+        second = enrich_chunk([chunk], cache=EnrichmentCache(tmp_path / "cache.db"))
+
+    assert generate.call_count == 1
+    assert first == second == [METADATA.model_dump()]
+
+
+def test_failed_enrichment_is_not_cached(tmp_path):
+    chunk = Text(text="Revenue grew 15%.", metadata=ElementMetadata(filename="msft.htm"))
+    cache = EnrichmentCache(tmp_path / "cache.db")
+
+    with patch(
+        "agent.chunk_enrichment.llm_enrichment.generate_enriched_chunk",
+        side_effect=RuntimeError("ollama down"),
+    ):
+        assert enrich_chunk([chunk], cache=cache) == [{}]
+
+    assert len(cache) == 0
@@ -0,0 +1,128 @@
+"""
+Test cases for the crash-safe enrichment journal.
+Tests EnrichmentJournal from agent.chunk_enrichment.enrichment_journal, resuming
+enrich_chunk from it, and retries with backoff.
+"""
+import json
+from unittest.mock import patch
+
+import pytest
+
+from agent.chunk_enrichment.enrichment_journal import EnrichmentJournal
+from agent.chunk_enrichment.llm_enrichment import _enrich_single_chunk, _retry_delay, enrich_chunk
+from llm.qwen_ollama_chunking import ChunkMetadata
+from testing.records import numbered_chunks
+
+METADATA = ChunkMetadata(
+    summary="Revenue grew 15%.",
+    keywords=["revenue"],
+    hypothetical_questions=["How much did revenue grow?"],
+    table_summary=None,
+)
+
+
+
+def test_resume_replays_successes_but_not_failures(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = EnrichmentJournal(path)
+    journal.record("ok", {"summary": "done"})
+    journal.record_failure("bad", RuntimeError("Ollama unreachable"), attempts=3)
+    journal.close()
+
+    resumed = EnrichmentJournal(path, resume=True)
+    assert resumed.get("ok") == {"summary": "done"}
+    assert resumed.get("bad") is None
+    assert (resumed.stats.replayed, resumed.stats.replayed_failures) == (1, 1)
+    resumed.close()
+
+    assert EnrichmentJournal(path).get("ok") is None
+
+
+def test_fresh_runs_rotate_instead_of_truncating_the_journal(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = EnrichmentJournal(path)
+    journal.record("ok", {"summary": "done"})
+    journal.close()
+
+    EnrichmentJournal(path).close()
+    EnrichmentJournal(path).close()
+
+    rotated = sorted(tmp_path.glob("journal.jsonl.*"))
+    assert len(rotated) == 1
+    assert EnrichmentJournal(rotated[0], resume=True).get("ok") == {"summary": "done"}
+    assert path.read_text(encoding="utf-8") == ""
+
+
+def test_torn_last_line_is_skipped_and_appends_stay_readable(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = EnrichmentJournal(path)
+    journal.record("first", {"summary": "one"})
+    journal.close()
+    with path.open("a", encoding="utf-8") as journal_file:
+        journal_file.write('{"key": "second", "sta')
+
+    resumed = EnrichmentJournal(path, resume=True)
+    resumed.record("third", {"summary": "three"})
+    resumed.close()
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert json.loads(lines[-1])["key"] == "third"
+    final = EnrichmentJournal(path, resume=True)
+    assert final.get("first") and final.get("third")
+    assert final.get("second") is None
+
+
+def test_resumed_run_only_sends_missing_and_failed_chunks(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    chunks = numbered_chunks(4)
+
+    def fail_on_chunk_two(prompt):
+        if "Chunk number 2" in prompt:
+            raise ConnectionError("Ollama went away")
+        return METADATA
+
+    with patch(
+        "agent.chunk_enrichment.llm_enrichment.generate_enriched_chunk",
+        side_effect=fail_on_chunk_two,
+    ):
+        first = enrich_chunk(chunks[:3], journal=EnrichmentJournal(path))
+    assert first[2] == {}
+
+    with patch(
+        "agent.chunk_enrichment.llm_enrichment.generate_enriched_chunk",
+        return_value=METADATA,
+    ) as generate:
+        journal = EnrichmentJournal(path, resume=True)
+        resumed = enrich_chunk(chunks, journal=journal)
+
+    prompts = [call.args[0] for call in generate.call_args_list]
+    assert len(prompts) == 2
+    assert any("Chunk number 2" in prompt for prompt in prompts)
+    assert any("Chunk number 3" in prompt for prompt in prompts)
+    assert all(result["summary"] == "Revenue grew 15%." for result in resumed)
+    assert journal.stats.replayed == 2
+
+
+def test_retries_back_off_exponentially_until_success():
+    with patch(
+        "agent.chunk_enrichment.llm_enrichment.generate_enriched_chunk",
+        side_effect=[TimeoutError(), TimeoutError(), METADATA],
+    ), patch("agent.chunk_enrichment.llm_enrichment.time.sleep") as sleep:
+        metadata, attempts = _enrich_single_chunk(numbered_chunks(1)[0], max_attempts=3, retry_delay=1.0)
+
+    assert metadata["summary"] == "Revenue grew 15%."
+    assert attempts == 3
+    assert [call.args[0] for call in sleep.call_args_list] == [1.0, 2.0]
+
+
+def test_retries_are_bounded():
+    assert _retry_delay(10, retry_delay=1.0, max_delay=30.0) == 30.0
+
+    with patch(
+        "agent.chunk_enrichment.llm_enrichment.generate_enriched_chunk",
+        side_effect=TimeoutError("still down"),
+    ) as generate, patch("agent.chunk_enrichment.llm_enrichment.time.sleep"):
+        with pytest.raises(TimeoutError):
+            _enrich_single_chunk(numbered_chunks(1)[0], max_attempts=4)
+
+    assert generate.call_count == 4
@@ -0,0 +1,196 @@
+"""
+Test cases for the per-document ingest modes.
+Tests _run_streaming, _run_pipelined and _enrich_new_chunks from main with partition stubbed
+out, the fake enrichment backend and local Qdrant with a fake embedding
+model, so nothing is downloaded or served.
+"""
+from pathlib import Path
+
+import pytest
+from unstructured.documents.elements import ElementMetadata, NarrativeText, Title
+
+import agent.embedder.fast_embed_qdrant as fast_embed_qdrant
+import main
+from agent.chunk_enrichment.chunk_aggregator import upsert_enriched_chunks
+from agent.chunk_enrichment.chunk_triage import SKIPPED_METADATA
+from agent.chunk_enrichment.json_store import JsonChunkStore
+from agent.embedder.fast_embed_qdrant import (
+    COLLECTION_NAME,
+    QdrantSettings,
+    get_qdrant_client,
+    reset_qdrant_client,
+)
+from agent.parser import parse_html as parse_html_module
+from llm.backends import FakeBackend, reset_backend
+from testing.embeddings import FakeEmbeddingModel
+
+FILING_A = "MSFT/10-Q/0000950170-24-000001/primary-document.txt"
+FILING_B = "MSFT/10-Q/0000950170-24-000002/primary-document.txt"
+
+
+def fake_partition(filename: str, **kwargs):
+    """Stand-in for unstructured partition: each line of the file becomes one titled section."""
+    metadata = ElementMetadata(filename=Path(filename).name)
+    elements = []
+    for line in Path(filename).read_text(encoding="utf-8").splitlines():
+        elements.append(Title(text=line, metadata=metadata))
+        # Long enough that chunk_by_title keeps every section in a chunk of its own.
+        elements.append(NarrativeText(text=f"{line} " + "Revenue grew on cloud demand. " * 10, metadata=metadata))
+    return elements
+
+
+class CountingBackend(FakeBackend):
+    """Fake backend that counts the prompts it answers."""
+
+    def __init__(self):
+        super().__init__()
+        self.prompts = 0
+
+    def _complete(self, prompt, schema=None, model=None):
+        self.prompts += 1
+        return super()._complete(prompt, schema, model)
+
+
+@pytest.fixture
+def ingest(tmp_path, monkeypatch):
+    """Stub parsing, enrichment and embedding; return the filings folder."""
+    monkeypatch.setattr(parse_html_module, "partition", fake_partition)
+    monkeypatch.setattr(fast_embed_qdrant, "_embedding_model", FakeEmbeddingModel())
+    reset_qdrant_client(QdrantSettings(path=str(tmp_path / "qdrant")))
+    reset_backend(CountingBackend())
+    folder = tmp_path / "sec"
+    folder.mkdir()
+    yield folder
+    reset_backend()
+    reset_qdrant_client()
+
+
+def write_filing(folder, filing, sections):
+    path = folder / filing
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("".join(f"Section {section}\n" for section in sections), encoding="utf-8")
+
+
+def run(mode, folder, skip_enrichment=False):
+    """Ingest ``folder`` into enriched.json next to it, as one run; return the stored records."""
+    store = JsonChunkStore(folder.parent / "enriched.json")
+    if mode == "pipelined":
+        main._run_pipelined(str(folder), store, skip_enrichment, {}, None, queue_size=2, batch_size=2)
+    else:
+        main._run_streaming(str(folder), store, skip_enrichment, {}, None)
+    store.close()
+    return list(store)
+
+
+def points():
+    stored, _ = get_qdrant_client().scroll(COLLECTION_NAME, limit=100)
+    return sorted((point.payload["source_file"], point.payload["content"]) for point in stored)
+
+
+@pytest.mark.parametrize("mode", ["streaming", "pipelined"])
+def test_a_rerun_reuses_stored_metadata_and_points(ingest, mode):
+    write_filing(ingest, FILING_A, range(3))
+    write_filing(ingest, FILING_B, range(2))
+    embedder = fast_embed_qdrant._embedding_model
+
+    first = run(mode, ingest)
+    prompts = main.get_backend().prompts
+    embedded = len(embedder.embedded)
+    second = run(mode, ingest)
+
+    assert (prompts, embedded) == (5, 5)
+    assert main.get_backend().prompts == prompts
+    assert len(embedder.embedded) == embedded
+    assert second == first
+    assert all(record["summary"] != SKIPPED_METADATA["summary"] for record in second)
+    assert len(points()) == 5
+
+
+@pytest.mark.parametrize("mode", ["streaming", "pipelined"])
+def test_a_shrunk_and_an_emptied_filing_leave_nothing_stale(ingest, mode):
+    write_filing(ingest, FILING_A, range(6))
+    write_filing(ingest, FILING_B, range(2))
+    run(mode, ingest)
+    assert len(points()) == 8
+
+    write_filing(ingest, FILING_A, range(2))
+    write_filing(ingest, FILING_B, [])
+    records = run(mode, ingest)
+
+    assert [record["source_file"] for record in records] == [(ingest / FILING_A).as_posix()] * 2
+    assert points() == sorted((record["source_file"], record["content"]) for record in records)
+    assert main.get_backend().prompts == 8
+
+
+@pytest.mark.parametrize("mode", ["streaming", "pipelined"])
+def test_placeholders_of_a_skipped_run_are_enriched_later(ingest, mode):
+    write_filing(ingest, FILING_A, range(3))
+
+    skipped = run(mode, ingest, skip_enrichment=True)
+    enriched = run(mode, ingest)
+    again = run(mode, ingest)
+
+    assert {record["summary"] for record in skipped} == {SKIPPED_METADATA["summary"]}
+    assert SKIPPED_METADATA["summary"] not in {record["summary"] for record in enriched}
+    assert [record["chunk_id"] for record in enriched] == [record["chunk_id"] for record in skipped]
+    assert main.get_backend().prompts == 3
+    assert again == enriched
+
+
+def test_enrich_new_chunks_only_sends_pending_chunks(ingest):
+    write_filing(ingest, FILING_A, range(3))
+    file_path = ingest / FILING_A
+    chunks = main._chunk_document((file_path, fake_partition(str(file_path))), "html", None)
+    store = JsonChunkStore(ingest.parent / "enriched.json")
+    stored = main.build_enriched_records(
+        file_path, chunks[:2], [{"summary": "kept", "keywords": []}, dict(SKIPPED_METADATA)], filings_root=ingest
+    )
+    upsert_enriched_chunks(stored, store)
+
+    skipping = main._enrich_new_chunks(file_path, chunks, store, True, filings_root=ingest)
+
+    assert [metadata["summary"] for metadata in skipping] == ["kept"] + [SKIPPED_METADATA["summary"]] * 2
+    assert main.get_backend().prompts == 0
+
+    enriching = main._enrich_new_chunks(file_path, chunks, store, False, verbose=False, filings_root=ingest)
+
+    assert enriching[0] == {"summary": "kept", "keywords": []}
+    assert SKIPPED_METADATA["summary"] not in {metadata["summary"] for metadata in enriching[1:]}
+    assert main.get_backend().prompts == 2
+
+
+def test_pipelined_batches_prune_each_document_once_it_is_complete(ingest, monkeypatch):
+    write_filing(ingest, FILING_A, range(5))
+    write_filing(ingest, FILING_B, range(2))
+    run("pipelined", ingest)
+    batches, pruned_records, pruned_points = [], [], []
+    enrich_new_chunks = main._enrich_new_chunks
+    delete_stale_records = main.delete_stale_records
+    delete_stale_points = main.delete_stale_points
+    monkeypatch.setattr(
+        main, "_enrich_new_chunks",
+        lambda file_path, chunks, *args, **kwargs: batches.append(len(chunks))
+        or enrich_new_chunks(file_path, chunks, *args, **kwargs),
+    )
+    monkeypatch.setattr(
+        main, "delete_stale_records",
+        lambda output, source_file, keep_ids, **kwargs: pruned_records.append((source_file, len(keep_ids)))
+        or delete_stale_records(output, source_file, keep_ids, **kwargs),
+    )
+    monkeypatch.setattr(
+        main, "delete_stale_points",
+        lambda source_file, keep_ids: pruned_points.append((source_file, len(keep_ids)))
+        or delete_stale_points(source_file, keep_ids),
+    )
+
+    write_filing(ingest, FILING_A, range(1, 6))
+    records = run("pipelined", ingest)
+
+    expected = [((ingest / FILING_A).as_posix(), 5), ((ingest / FILING_B).as_posix(), 2)]
+    assert batches == [2, 2, 1, 2]
+    assert pruned_records == expected
+    assert pruned_points == expected
+    assert len(records) == 7
+    assert len(points()) == 7
+    # Section 0 was dropped and section 5 is new; the rest keep their metadata.
+    assert main.get_backend().prompts == 7 + 1
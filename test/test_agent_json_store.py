@@ -0,0 +1,55 @@
+"""
+Test cases for the JSON enriched chunk store.
+Tests JsonChunkStore from agent.chunk_enrichment.json_store and its use in
+upsert_enriched_chunks and persist_enriched_records.
+"""
+import json
+
+from agent.chunk_enrichment.chunk_aggregator import persist_enriched_records, upsert_enriched_chunks
+from agent.chunk_enrichment.json_store import JsonChunkStore
+from testing.records import enriched_records
+
+
+def test_upserts_write_the_file_once_on_flush(tmp_path):
+    path = tmp_path / "enriched_chunks.json"
+    store = JsonChunkStore(path)
+
+    for start in range(0, 6, 2):
+        upsert_enriched_chunks(enriched_records("10-Q/0001", 2, start=start), store)
+    upsert_enriched_chunks([{**enriched_records("10-Q/0001", 1)[0], "summary": "new"}], store)
+
+    assert not path.exists()
+    store.close()
+    stored = json.loads(path.read_text(encoding="utf-8"))
+    assert [record["summary"] for record in stored] == ["new", "S1", "S2", "S3", "S4", "S5"]
+    assert store.stats.writes == 1
+
+
+def test_reopening_loads_the_file_and_skips_unchanged_writes(tmp_path):
+    path = tmp_path / "enriched_chunks.json"
+    persist_enriched_records(enriched_records("10-Q/0001", 3), path)
+    written_at = path.stat().st_mtime_ns
+
+    store = JsonChunkStore(path)
+    result = upsert_enriched_chunks(enriched_records("10-Q/0001", 3), store)
+    store.close()
+
+    assert (result.unchanged, result.changed) == (3, [])
+    assert len(store) == 3
+    assert set(store.get_many(["10-Q/0001-1", "missing"])) == {"10-Q/0001-1"}
+    assert path.stat().st_mtime_ns == written_at
+    assert store.stats.writes == 0
+
+
+def test_remove_and_clear(tmp_path):
+    path = tmp_path / "enriched_chunks.json"
+    store = JsonChunkStore(path)
+    store.append(enriched_records("10-Q/0001", 3))
+
+    assert store.remove(["10-Q/0001-1", "missing"]) == 1
+    store.flush()
+    assert [record["chunk_id"] for record in json.loads(path.read_text())] == ["10-Q/0001-0", "10-Q/0001-2"]
+
+    store.clear()
+    store.close()
+    assert json.loads(path.read_text()) == []
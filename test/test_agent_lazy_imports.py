@@ -0,0 +1,45 @@
+"""
+Test cases for deferred heavy imports.
+Checks that importing agent.embedder.fast_embed_qdrant, agent.parser.parse_html
+and utils.sqlite_db does not load fastembed, qdrant_client, unstructured's
+partitioners or langchain_community until they are used.
+"""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import agent.embedder.fast_embed_qdrant as fast_embed_qdrant
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _loaded_after_import(module, packages):
+    code = (
+        "import json, sys\n"
+        f"import {module}\n"
+        f"print(json.dumps([name for name in {packages!r} if name in sys.modules]))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize(
+    "module, packages",
+    [
+        ("agent.embedder.fast_embed_qdrant", ["fastembed", "qdrant_client"]),
+        ("agent.parser.parse_html", ["unstructured.partition.auto", "pypdf"]),
+        ("utils.sqlite_db", ["langchain_community", "pandas"]),
+    ],
+)
+def test_heavy_dependencies_are_not_imported_at_module_load(module, packages):
+    assert _loaded_after_import(module, packages) == []
+
+
+def test_unknown_module_attributes_still_raise():
+    with pytest.raises(AttributeError):
+        fast_embed_qdrant.no_such_attribute
@@ -0,0 +1,116 @@
+"""
+Test cases for per-chunk model routing.
+Tests RoutingPolicy and ModelRouter from agent.chunk_enrichment.model_routing and
+their use in enrich_chunk and enrich_chunks_batched.
+"""
+import pytest
+from pydantic import ValidationError
+from unstructured.documents.elements import ElementMetadata, Table
+
+from agent.chunk_enrichment.batch_enrichment import enrich_chunks_batched
+from agent.chunk_enrichment.llm_enrichment import enrich_chunk
+from agent.chunk_enrichment.model_routing import ModelRouter, RoutingPolicy
+from llm.backends import FakeBackend, RateLimits
+from llm.qwen_ollama_chunking import chunk_enricher
+from testing.records import text_chunk
+
+POLICY = RoutingPolicy(small_model="small", large_model="large", long_chunk_chars=200)
+
+
+class ScriptedBackend(FakeBackend):
+    """Fake backend whose small model garbles chunks that mention 'garble'."""
+
+    def __init__(self):
+        super().__init__(RateLimits(concurrency=4))
+        self.models = []
+
+    def _complete(self, prompt, schema=None, model=None):
+        self.models.append(model)
+        if model == "small" and "garble" in prompt:
+            return "not json"
+        return super()._complete(prompt, schema, model)
+
+
+
+def _table():
+    metadata = ElementMetadata(
+        filename="msft-10q.htm",
+        text_as_html="<table><tr><th>Segment</th><th>Revenue</th></tr><tr><td>Cloud</td><td>10</td></tr></table>",
+    )
+    return Table(text="Segment Revenue Cloud 10", metadata=metadata)
+
+
+def test_policy_routes_tables_and_long_chunks_to_the_large_model():
+    assert POLICY.choose("Revenue grew.", is_table=False) == "small"
+    assert POLICY.choose("Revenue grew.", is_table=True) == "large"
+    assert POLICY.choose("x" * 200, is_table=False) == "large"
+
+    prose_only = RoutingPolicy(small_model="small", large_model="large", tables_to_large=False)
+    assert prose_only.choose("Revenue grew.", is_table=True) == "small"
+    assert prose_only.describe() != POLICY.describe()
+
+
+def test_policy_is_read_from_the_environment(monkeypatch):
+    monkeypatch.setenv("ROUTING_SMALL_MODEL", "qwen2.5:0.5b")
+    monkeypatch.setenv("ROUTING_LARGE_MODEL", "qwen2.5:14b")
+    monkeypatch.setenv("ROUTING_TABLES", "small")
+
+    policy = RoutingPolicy.from_env()
+
+    assert (policy.small_model, policy.large_model, policy.tables_to_large) == (
+        "qwen2.5:0.5b",
+        "qwen2.5:14b",
+        False,
+    )
+
+
+def test_invalid_small_model_answer_escalates_to_the_large_model():
+    backend = ScriptedBackend()
+    router = ModelRouter(POLICY, backend)
+
+    metadata = router.generate(
+        chunk_enricher("Please garble this.", False, "analyst"), "Please garble this.", False
+    )
+
+    assert metadata.summary == "Please garble this."
+    assert backend.models == ["small", "large"]
+    assert router.escalations == 1
+    assert (router.stats["small"].calls, router.stats["small"].invalid) == (1, 1)
+    assert router.stats["large"].calls == 1
+    assert "1 escalations to large" in router.report()
+
+
+def test_escalation_can_be_disabled():
+    router = ModelRouter(
+        RoutingPolicy(small_model="small", large_model="large", escalate=False), ScriptedBackend()
+    )
+
+    with pytest.raises(ValidationError):
+        router.generate(chunk_enricher("garble", False, "analyst"), "garble", False)
+    assert router.escalations == 0
+
+
+def test_enrich_chunk_tracks_calls_per_model():
+    backend = ScriptedBackend()
+    router = ModelRouter(POLICY, backend)
+    chunks = [text_chunk("Revenue grew."), _table(), text_chunk("Costs fell. " * 20), text_chunk("garble me")]
+
+    results = enrich_chunk(chunks, router=router)
+
+    assert all(result["summary"] for result in results)
+    assert router.stats["small"].calls == 2
+    assert router.stats["large"].calls == 3
+    assert router.escalations == 1
+
+
+def test_batched_engine_only_batches_small_model_chunks():
+    backend = ScriptedBackend()
+    router = ModelRouter(POLICY, backend)
+    chunks = [text_chunk(f"Revenue line {i} grew.") for i in range(4)] + [_table()]
+
+    results = enrich_chunks_batched(chunks, router=router)
+
+    assert [result["summary"] for result in results[:4]] == [f"Revenue line {i} grew." for i in range(4)]
+    assert results[4]["table_summary"] is not None
+    assert sorted(backend.models) == ["large", "small"]
+    assert router.stats["small"].calls == 1
@@ -0,0 +1,89 @@
+"""
+Test cases for near-duplicate detection ahead of enrichment.
+Tests NearDuplicateIndex and enrich_with_near_duplicates from agent.chunk_enrichment.near_duplicates.
+"""
+from unstructured.documents.elements import NarrativeText
+
+from agent.chunk_enrichment.near_duplicates import (
+    NearDuplicateIndex,
+    enrich_with_near_duplicates,
+)
+
+RISK_FACTOR = (
+    "Our business depends on the continued growth of cloud services and any decline in "
+    "demand for our products could materially affect our revenue operating results and "
+    "financial condition including changes in customer spending patterns competition from "
+    "new entrants pricing pressure regulatory developments in the markets where we operate "
+    "and our ability to attract and retain key personnel across engineering and sales"
+)
+
+
+def _fake_enricher(calls):
+    def enrich(chunks):
+        calls.append([chunk.text for chunk in chunks])
+        return [{"summary": f"summary of {chunk.text[:20]}", "keywords": []} for chunk in chunks]
+
+    return enrich
+
+
+def test_near_duplicate_is_matched_and_distinct_text_is_not():
+    index = NearDuplicateIndex(threshold=0.8)
+
+    first, first_duplicate = index.assign(RISK_FACTOR)
+    second, second_duplicate = index.assign(RISK_FACTOR.replace("key personnel", "key staff"))
+    third, third_duplicate = index.assign("Revenue by segment for the quarter ended March 31.")
+
+    assert not first_duplicate
+    assert (second, second_duplicate) == (first, True)
+    assert third != first and not third_duplicate
+    assert index.stats.chunks_seen == 3
+    assert index.stats.duplicates == 1
+
+
+def test_threshold_is_configurable():
+    edited = RISK_FACTOR.replace("cloud services", "gaming").replace("sales", "marketing")
+
+    lenient = NearDuplicateIndex(threshold=0.5)
+    lenient.assign(RISK_FACTOR)
+    assert lenient.assign(edited)[1]
+
+    strict = NearDuplicateIndex(threshold=0.99)
+    strict.assign(RISK_FACTOR)
+    assert not strict.assign(edited)[1]
+
+
+def test_duplicates_reuse_canonical_enrichment_across_batches():
+    index = NearDuplicateIndex(threshold=0.8)
+    calls = []
+    enrich = _fake_enricher(calls)
+
+    q1 = [NarrativeText(text=RISK_FACTOR), NarrativeText(text="Q1 revenue grew strongly.")]
+    q2 = [
+        NarrativeText(text=RISK_FACTOR.replace("key personnel", "key staff")),
+        NarrativeText(text=RISK_FACTOR),
+    ]
+
+    first = enrich_with_near_duplicates(q1, enrich, index)
+    second = enrich_with_near_duplicates(q2, enrich, index)
+
+    assert len(calls) == 1
+    assert second[0]["summary"] == first[0]["summary"]
+    assert second[0]["dedup_group"] == second[1]["dedup_group"] == first[0]["dedup_group"]
+    assert first[1]["dedup_group"] != first[0]["dedup_group"]
+    assert index.stats.hit_rate == 0.5
+    assert "hit rate 50.0%" in index.stats.report()
+
+
+def test_duplicate_of_failed_canonical_is_enriched_itself():
+    index = NearDuplicateIndex(threshold=0.8)
+    calls = []
+
+    enrich_with_near_duplicates([NarrativeText(text=RISK_FACTOR)], lambda chunks: [{}], index)
+    results = enrich_with_near_duplicates(
+        [NarrativeText(text=RISK_FACTOR), NarrativeText(text=RISK_FACTOR)],
+        _fake_enricher(calls),
+        index,
+    )
+
+    assert calls == [[RISK_FACTOR]]
+    assert results[0]["summary"] == results[1]["summary"]
@@ -0,0 +1,114 @@
+"""
+Test cases for the content-addressed parse cache.
+Tests ParseCache from agent.parser.parse_cache and its use in parse_html.
+"""
+from unstructured.documents.elements import ElementMetadata, NarrativeText, Title
+
+from agent.parser import parse_html as parse_html_module
+from agent.parser.parse_cache import ParseCache
+from agent.parser.parse_html import PARTITION_KWARGS, parse_html
+
+
+def _elements(prefix: str):
+    metadata = ElementMetadata(filename="filing.htm", page_number=1)
+    return [
+        Title(text=f"{prefix} title", metadata=metadata),
+        NarrativeText(text=f"{prefix} body text", metadata=metadata),
+    ]
+
+
+def test_cache_round_trips_elements(tmp_path):
+    source = tmp_path / "filing.htm"
+    source.write_text("<p>body</p>", encoding="utf-8")
+    cache = ParseCache(tmp_path / "cache")
+
+    key = cache.key(source, PARTITION_KWARGS)
+    assert cache.get(key) is None
+
+    cache.put(key, _elements("cached"))
+    restored = cache.get(key)
+
+    assert [type(e).__name__ for e in restored] == ["Title", "NarrativeText"]
+    assert [e.text for e in restored] == ["cached title", "cached body text"]
+    assert restored[0].metadata.page_number == 1
+
+
+def test_cache_key_depends_on_content_and_params(tmp_path):
+    source = tmp_path / "filing.htm"
+    source.write_text("<p>v1</p>", encoding="utf-8")
+    cache = ParseCache(tmp_path / "cache")
+
+    original = cache.key(source, PARTITION_KWARGS)
+    assert cache.key(source, {**PARTITION_KWARGS, "strategy": "hi_res"}) != original
+
+    source.write_text("<p>v2</p>", encoding="utf-8")
+    assert cache.key(source, PARTITION_KWARGS) != original
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = ParseCache(tmp_path / "cache")
+    cache.put("aa" + "0" * 62, _elements("first"))
+    entry_size = next(cache.entries_dir.glob("*/*.json")).stat().st_size
+    cache.max_bytes = entry_size * 2
+
+    cache.put("bb" + "0" * 62, _elements("second"))
+    cache.put("cc" + "0" * 62, _elements("third"))
+
+    assert cache.get("aa" + "0" * 62) is None
+    assert cache.get("cc" + "0" * 62) is not None
+
+
+def test_cache_drops_entries_from_other_unstructured_versions(tmp_path):
+    old = ParseCache(tmp_path / "cache", version="0.0.1")
+    old.put("aa" + "0" * 62, _elements("old"))
+
+    current = ParseCache(tmp_path / "cache", version="9.9.9")
+
+    assert not old.entries_dir.exists()
+    assert current.get("aa" + "0" * 62) is None
+
+
+def test_cache_leaves_unrelated_directories_alone(tmp_path):
+    shared = tmp_path / "shared"
+    (shared / "other-tool").mkdir(parents=True)
+    (shared / "other-tool" / "data.txt").write_text("keep", encoding="utf-8")
+
+    ParseCache(shared, version="9.9.9")
+
+    assert (shared / "other-tool" / "data.txt").read_text(encoding="utf-8") == "keep"
+
+
+def test_cache_only_rescans_when_the_tracked_size_crosses_the_bound(tmp_path, monkeypatch):
+    cache = ParseCache(tmp_path / "cache")
+    scans = []
+    evict = cache.evict
+    monkeypatch.setattr(cache, "evict", lambda: scans.append(1) or evict())
+
+    for index in range(5):
+        cache.put(f"{index:02d}" + "0" * 62, _elements(f"entry {index}"))
+    assert len(scans) == 1
+
+    cache.max_bytes = 1
+    cache.put("ff" + "0" * 62, _elements("last"))
+    assert len(scans) == 2
+    assert list(cache.entries_dir.glob("*/*.json")) == []
+
+
+def test_parse_html_skips_partition_on_cache_hit(tmp_path, monkeypatch):
+    filings = tmp_path / "filings"
+    filings.mkdir()
+    (filings / "filing.htm").write_text("<p>body</p>", encoding="utf-8")
+    calls = []
+
+    def fake_partition(filename, **kwargs):
+        calls.append(filename)
+        return _elements("parsed")
+
+    monkeypatch.setattr(parse_html_module, "partition", fake_partition)
+    cache = ParseCache(tmp_path / "cache")
+
+    first = parse_html(str(filings), cache=cache)
+    second = parse_html(str(filings), cache=cache)
+
+    assert len(calls) == 1
+    assert [e.text for e in second] == [e.text for e in first]
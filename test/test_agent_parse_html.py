@@ -0,0 +1,92 @@
+"""
+Test cases for parsing functionality.
+Tests parse_html from agent.parser.parse_html with partition stubbed out.
+"""
+import os
+from pathlib import Path
+
+import pytest
+from unstructured.documents.elements import ElementMetadata, NarrativeText
+
+from agent.parser import parse_html as parse_html_module
+from agent.parser.parse_html import iter_parse_html, parse_html
+
+
+def fake_partition(filename: str, **kwargs):
+    """Stand-in for unstructured partition that echoes the file content."""
+    text = Path(filename).read_text(encoding="utf-8")
+    if "explode" in text:
+        raise ValueError("corrupt filing")
+    if "crash" in text:
+        os._exit(1)
+    return [
+        NarrativeText(text=line, metadata=ElementMetadata(filename=Path(filename).name))
+        for line in text.splitlines()
+    ]
+
+
+@pytest.fixture
+def filings_dir(tmp_path, monkeypatch):
+    """Create a small directory of filings and stub partition."""
+    monkeypatch.setattr(parse_html_module, "partition", fake_partition)
+    for index in range(6):
+        filing = tmp_path / "MSFT" / "10-Q" / f"000{index}" / "primary-document.txt"
+        filing.parent.mkdir(parents=True)
+        filing.write_text(f"filing {index} line a\nfiling {index} line b", encoding="utf-8")
+    return tmp_path
+
+
+def test_parse_html_sequential_reads_every_file(filings_dir):
+    elements = parse_html(str(filings_dir))
+    assert len(elements) == 12
+    assert elements[0].text == "filing 0 line a"
+
+
+def test_parse_html_parallel_matches_sequential_order(filings_dir):
+    sequential = [element.text for element in parse_html(str(filings_dir), workers=1)]
+    parallel = [element.text for element in parse_html(str(filings_dir), workers=3)]
+    assert parallel == sequential
+
+
+def test_parse_html_parallel_isolates_failing_file(filings_dir):
+    broken = filings_dir / "MSFT" / "10-Q" / "0002" / "primary-document.txt"
+    broken.write_text("explode", encoding="utf-8")
+
+    elements = parse_html(str(filings_dir), workers=3)
+
+    texts = [element.text for element in elements]
+    assert len(texts) == 10
+    assert not any(text.startswith("filing 2") for text in texts)
+    assert texts[-1] == "filing 5 line b"
+
+
+def test_parse_html_parallel_survives_a_dying_worker(filings_dir):
+    crashing = filings_dir / "MSFT" / "10-Q" / "0003" / "primary-document.txt"
+    crashing.write_text("crash", encoding="utf-8")
+
+    texts = [element.text for element in parse_html(str(filings_dir), workers=3)]
+
+    assert len(texts) == 10
+    assert not any(text.startswith("filing 3") for text in texts)
+    assert texts[-1] == "filing 5 line b"
+
+
+def test_parse_html_missing_path_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        parse_html(str(tmp_path / "missing"))
+
+
+def test_iter_parse_html_yields_one_document_at_a_time(filings_dir):
+    documents = list(iter_parse_html(str(filings_dir), workers=2))
+
+    assert [path.parent.name for path, _ in documents] == [f"000{i}" for i in range(6)]
+    assert all(len(elements) == 2 for _, elements in documents)
+
+
+def test_iter_parse_html_is_lazy(filings_dir):
+    documents = iter_parse_html(str(filings_dir))
+
+    file_path, elements = next(documents)
+
+    assert file_path.parent.name == "0000"
+    assert elements[0].text == "filing 0 line a"
@@ -0,0 +1,109 @@
+"""
+Test cases for the lxml-based iXBRL/HTML parser.
+Tests parse_ixbrl_html from agent.parser.parse_ixbrl.
+"""
+import pytest
+
+from agent.parser import parse_html as parse_html_module
+from agent.parser.parse_html import parse_html
+from agent.parser.parse_ixbrl import parse_ixbrl_html
+
+IXBRL_DOCUMENT = b"""<?xml version="1.0" encoding="utf-8"?>
+<html xmlns="http://www.w3.org/1999/xhtml" xmlns:ix="http://www.xbrl.org/2013/inlineXBRL">
+<head><title>msft-10k</title><style>.x { color: red }</style></head>
+<body>
+<div style="display:none"><ix:header><ix:hidden>
+<ix:nonNumeric name="dei:EntityRegistrantName">HIDDEN REGISTRANT FACT</ix:nonNumeric>
+</ix:hidden></ix:header></div>
+<div><span style="font-weight:700">Item 7. Management's Discussion and Analysis</span></div>
+<div><span style="font-size:10pt">Revenue was
+<ix:nonFraction name="us-gaap:Revenues" scale="6">211,915</ix:nonFraction> million, up 7%.</span></div>
+<hr style="page-break-after:always"/>
+<table>
+<tr><td><span>Segment</span></td><td></td><td>2023</td></tr>
+<tr><td>Intelligent Cloud</td><td>$</td><td>87,907</td></tr>
+</table>
+</body>
+</html>
+"""
+
+
+def test_hidden_xbrl_header_is_dropped():
+    elements = parse_ixbrl_html(IXBRL_DOCUMENT, filename="msft-10k.htm")
+    assert all("HIDDEN REGISTRANT FACT" not in e.text for e in elements)
+    assert all("msft-10k" != e.text for e in elements)
+
+
+def test_emits_title_narrative_and_table_elements():
+    elements = parse_ixbrl_html(IXBRL_DOCUMENT, filename="msft-10k.htm")
+
+    assert [e.category for e in elements] == ["Title", "NarrativeText", "PageBreak", "Table"]
+    assert elements[0].text == "Item 7. Management's Discussion and Analysis"
+    assert elements[1].text == "Revenue was 211,915 million, up 7%."
+    assert elements[1].metadata.filename == "msft-10k.htm"
+
+
+def test_table_has_compact_html_and_page_number():
+    table = parse_ixbrl_html(IXBRL_DOCUMENT, filename="msft-10k.htm")[-1]
+
+    assert table.metadata.text_as_html == (
+        "<table><tr><th>Segment</th><th></th><th>2023</th></tr>"
+        "<tr><td>Intelligent Cloud</td><td>$</td><td>87,907</td></tr></table>"
+    )
+    assert "Intelligent Cloud" in table.text
+    assert table.metadata.page_number == 2
+
+
+def test_table_drops_only_columns_empty_in_every_row():
+    document = (
+        b"<html><body><table>"
+        b"<tr><th>Segment</th><th></th><th>2024</th><th></th></tr>"
+        b"<tr><td>Gaming</td><td></td><td>5,451</td><td></td></tr>"
+        b"<tr><td>Search</td><td></td><td></td><td></td></tr>"
+        b"</table></body></html>"
+    )
+
+    table = parse_ixbrl_html(document, filename="msft-10q.htm")[0]
+
+    assert table.metadata.text_as_html == (
+        "<table><tr><th>Segment</th><th>2024</th></tr>"
+        "<tr><td>Gaming</td><td>5,451</td></tr>"
+        "<tr><td>Search</td><td></td></tr></table>"
+    )
+
+
+def test_blocks_keep_document_order_and_partial_bold_is_not_a_title():
+    document = (
+        b"<html><body><div>Lead text<p>Inner paragraph</p>Trailing text</div>"
+        b"<p>Intro <b>bold</b> words</p><p><b>Item 1A. Risk Factors</b></p></body></html>"
+    )
+
+    elements = parse_ixbrl_html(document, filename="msft-10q.htm")
+
+    assert [(e.category, e.text) for e in elements] == [
+        ("NarrativeText", "Lead text"),
+        ("NarrativeText", "Inner paragraph"),
+        ("NarrativeText", "Trailing text"),
+        ("NarrativeText", "Intro bold words"),
+        ("Title", "Item 1A. Risk Factors"),
+    ]
+
+
+def test_element_ids_are_deterministic():
+    first = [e.id for e in parse_ixbrl_html(IXBRL_DOCUMENT, filename="msft-10k.htm")]
+    second = [e.id for e in parse_ixbrl_html(IXBRL_DOCUMENT, filename="msft-10k.htm")]
+    assert first == second
+
+
+def test_parse_html_fast_path_bypasses_partition(tmp_path, monkeypatch):
+    filing = tmp_path / "msft-10k.htm"
+    filing.write_bytes(IXBRL_DOCUMENT)
+
+    def fail_partition(**kwargs):
+        pytest.fail("partition should not be called for HTML in fast mode")
+
+    monkeypatch.setattr(parse_html_module, "partition", fail_partition)
+
+    elements = parse_html(str(tmp_path), fast_html=True)
+
+    assert [e.category for e in elements][-1] == "Table"
@@ -0,0 +1,91 @@
+"""
+Test cases for page-parallel PDF parsing.
+Tests parse_pdf_file from agent.parser.parse_pdf with partition_pdf stubbed out.
+"""
+import io
+
+import pytest
+from pypdf import PdfReader, PdfWriter
+from unstructured.documents.elements import ElementMetadata, NarrativeText
+
+from agent.parser import parse_pdf as parse_pdf_module
+from agent.parser.parse_cache import ParseCache
+from agent.parser.parse_pdf import page_ranges, parse_pdf_file
+
+CALLS_FILE = "partition-calls.txt"
+
+
+@pytest.fixture
+def pdf_path(tmp_path, monkeypatch):
+    """Write a 10-page blank PDF and stub partition_pdf with one element per page."""
+    writer = PdfWriter()
+    for _ in range(10):
+        writer.add_blank_page(width=612, height=792)
+    path = tmp_path / "annual-report.pdf"
+    with path.open("wb") as handle:
+        writer.write(handle)
+
+    calls_path = tmp_path / CALLS_FILE
+
+    def fake_partition_pdf_bytes(data, filename):
+        page_count = len(PdfReader(io.BytesIO(data)).pages)
+        # Record calls on disk so they are visible from worker processes too.
+        with calls_path.open("a", encoding="utf-8") as calls:
+            calls.write(f"{page_count}\n")
+        return [
+            NarrativeText(
+                text=f"local page {page}",
+                metadata=ElementMetadata(filename=filename, page_number=page),
+            )
+            for page in range(1, page_count + 1)
+        ]
+
+    monkeypatch.setattr(parse_pdf_module, "_partition_pdf_bytes", fake_partition_pdf_bytes)
+    return path
+
+
+def _calls(pdf_path):
+    calls_path = pdf_path.parent / CALLS_FILE
+    return calls_path.read_text().split() if calls_path.exists() else []
+
+
+def test_page_ranges_cover_every_page():
+    assert page_ranges(10, 4) == [(1, 4), (5, 8), (9, 10)]
+    assert page_ranges(0, 4) == []
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_parse_pdf_merges_ranges_in_page_order(pdf_path, workers):
+    elements = parse_pdf_file(pdf_path, workers=workers, pages_per_range=4)
+
+    pages = [e.metadata.page_number for e in elements if e.category != "PageBreak"]
+    assert pages == list(range(1, 11))
+    assert [e.category for e in elements].count("PageBreak") == 2
+    assert elements[0].metadata.filename == "annual-report.pdf"
+
+
+def test_parse_pdf_skips_cached_ranges_on_rerun(pdf_path, tmp_path):
+    cache = ParseCache(tmp_path / "cache")
+
+    first = parse_pdf_file(pdf_path, cache=cache, workers=1, pages_per_range=4)
+    assert _calls(pdf_path) == ["4", "4", "2"]
+
+    second = parse_pdf_file(pdf_path, cache=cache, workers=1, pages_per_range=4)
+    assert _calls(pdf_path) == ["4", "4", "2"]
+    assert [e.id for e in second] == [e.id for e in first]
+
+
+def test_parse_pdf_isolates_failing_range(pdf_path, monkeypatch):
+    original = parse_pdf_module._partition_pdf_bytes
+
+    def flaky(data, filename):
+        if len(PdfReader(io.BytesIO(data)).pages) == 2:
+            raise RuntimeError("bad page range")
+        return original(data, filename)
+
+    monkeypatch.setattr(parse_pdf_module, "_partition_pdf_bytes", flaky)
+
+    elements = parse_pdf_file(pdf_path, workers=1, pages_per_range=4)
+
+    pages = [e.metadata.page_number for e in elements if e.category != "PageBreak"]
+    assert pages == list(range(1, 9))
@@ -0,0 +1,128 @@
+"""
+Test cases for incremental embedding into a persistent Qdrant collection.
+Tests point_id, sync_chunks and delete_stale_points from
+agent.embedder.fast_embed_qdrant against local on-disk Qdrant, with a fake
+embedding model so no model is downloaded.
+"""
+from types import SimpleNamespace
+
+import pytest
+import qdrant_client
+
+import agent.embedder.fast_embed_qdrant as fast_embed_qdrant
+from agent.embedder.fast_embed_qdrant import (
+    COLLECTION_NAME,
+    QdrantSettings,
+    delete_stale_points,
+    get_qdrant_client,
+    point_id,
+    reset_qdrant_client,
+    sync_chunks,
+)
+from testing.embeddings import FakeEmbeddingModel
+from testing.records import enriched_records
+
+
+@pytest.fixture
+def embedder(tmp_path, monkeypatch):
+    model = FakeEmbeddingModel()
+    monkeypatch.setattr(fast_embed_qdrant, "_embedding_model", model)
+    reset_qdrant_client(QdrantSettings(path=str(tmp_path / "qdrant")))
+    yield model
+    reset_qdrant_client()
+
+
+def test_point_ids_follow_the_chunk_id_and_content():
+    record = enriched_records("10-Q/0001", 1)[0]
+
+    assert point_id(record) == point_id({**record, "summary": "Rewritten", "keywords": []})
+    assert point_id(record) != point_id({**record, "content": "Revenue line 9"})
+    assert point_id(record) != point_id({**record, "chunk_id": "other"})
+
+
+def test_points_survive_a_restart_and_are_not_embedded_twice(embedder, tmp_path):
+    first = sync_chunks(enriched_records("10-Q/0001", 3))
+    reset_qdrant_client(QdrantSettings(path=str(tmp_path / "qdrant")))
+
+    second = sync_chunks(enriched_records("10-Q/0001", 3))
+
+    assert (first.embedded, second.embedded, second.present) == (3, 0, 3)
+    assert len(embedder.embedded) == 3
+    assert get_qdrant_client().count(COLLECTION_NAME).count == 3
+
+
+def test_reingesting_a_filing_replaces_changed_and_removed_chunks(embedder):
+    sync_chunks(enriched_records("10-Q/0001", 3) + enriched_records("10-K/0002", 2))
+    reingested = enriched_records("10-Q/0001", 2)
+    reingested[1]["content"] = "Revenue line rewritten"
+
+    result = sync_chunks(reingested)
+
+    assert (result.embedded, result.present, result.deleted) == (1, 1, 2)
+    stored, _ = get_qdrant_client().scroll(COLLECTION_NAME, limit=10)
+    assert sorted(point.payload["content"] for point in stored) == [
+        "Revenue line 0", "Revenue line 0", "Revenue line 1", "Revenue line rewritten",
+    ]
+
+
+def test_changed_metadata_refreshes_the_existing_point(embedder):
+    sync_chunks(enriched_records("10-Q/0001", 2))
+    reenriched = enriched_records("10-Q/0001", 2)
+    reenriched[1]["summary"] = "Rewritten"
+
+    result = sync_chunks(reenriched, changed=[reenriched[1]])
+
+    assert (result.embedded, result.present, result.deleted) == (1, 1, 0)
+    stored, _ = get_qdrant_client().scroll(COLLECTION_NAME, limit=10)
+    assert sorted(point.payload["summary"] for point in stored) == ["Rewritten", "S0"]
+
+
+def test_chunks_that_failed_enrichment_keep_their_points(embedder):
+    sync_chunks(enriched_records("10-Q/0001", 3))
+    reingested = enriched_records("10-Q/0001", 3)
+    failed = {key: reingested[2][key] for key in ("chunk_id", "source_file", "content")}
+
+    result = sync_chunks(reingested[:2], keep=[failed])
+
+    assert (result.embedded, result.present, result.deleted) == (0, 2, 0)
+    assert get_qdrant_client().count(COLLECTION_NAME).count == 3
+
+
+def test_an_empty_keep_set_deletes_every_point_of_the_filing(embedder):
+    sync_chunks(enriched_records("10-Q/0001", 3) + enriched_records("10-K/0002", 2))
+
+    assert delete_stale_points("MSFT/10-Q/0001/full-submission.txt", set()) == 3
+    assert get_qdrant_client().count(COLLECTION_NAME).count == 2
+
+
+class FakeServerClient:
+    """A Qdrant server whose collection already exists with only some payload indexes."""
+
+    indexed = {"source_file": "keyword"}
+    created = []
+
+    def __init__(self, url=None, api_key=None):
+        pass
+
+    def collection_exists(self, name):
+        return True
+
+    def get_collection(self, name):
+        return SimpleNamespace(payload_schema=dict(self.indexed))
+
+    def create_payload_index(self, name, field_name, schema):
+        self.created.append(field_name)
+
+    def close(self):
+        pass
+
+
+def test_existing_server_collections_get_missing_payload_indexes(monkeypatch):
+    monkeypatch.setattr(qdrant_client, "QdrantClient", FakeServerClient)
+    reset_qdrant_client(QdrantSettings(url="http://qdrant.test:6333"))
+    try:
+        get_qdrant_client()
+    finally:
+        reset_qdrant_client()
+
+    assert FakeServerClient.created == ["accession_number"]
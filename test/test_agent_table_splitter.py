@@ -0,0 +1,73 @@
+"""
+Test cases for row-wise table splitting.
+Tests split_table_chunks and chunk_content from agent.chunk_generation.table_splitter.
+"""
+import pytest
+from unstructured.documents.elements import ElementMetadata, NarrativeText, Table
+
+from agent.chunk_generation.table_splitter import chunk_content, split_table_chunks
+
+
+def _income_statement(rows: int) -> Table:
+    body = "".join(
+        f"<tr><td>Line item {i}</td><td></td><td>{i * 100}</td><td>{i * 90}</td></tr>"
+        for i in range(rows)
+    )
+    html = (
+        "<table><tr><th>(In millions)</th><th></th><th>2024</th><th>2023</th></tr>"
+        f"{body}</table>"
+    )
+    return Table(text="income statement", metadata=ElementMetadata(text_as_html=html, filename="msft-10k.htm"))
+
+
+def test_large_table_is_split_with_header_repeated():
+    chunks = split_table_chunks([_income_statement(50)], max_size=300)
+
+    assert len(chunks) > 1
+    for chunk in chunks:
+        lines = chunk.text.splitlines()
+        assert lines[0] == "| (In millions) | 2024 | 2023 |"
+        assert lines[1] == "| --- | --- | --- |"
+        assert len(chunk.text) <= 300
+        assert chunk.metadata.filename == "msft-10k.htm"
+
+    body_rows = [line for chunk in chunks for line in chunk.text.splitlines()[2:]]
+    assert body_rows == [f"| Line item {i} | {i * 100} | {i * 90} |" for i in range(50)]
+
+
+def test_tsv_format_and_non_tables_pass_through():
+    narrative = NarrativeText(text="Revenue grew.")
+
+    chunks = split_table_chunks([narrative, _income_statement(2)], table_format="tsv")
+
+    assert chunks[0] is narrative
+    assert chunks[1].text == "(In millions)\t2024\t2023\nLine item 0\t0\t0\nLine item 1\t100\t90"
+
+
+def test_split_chunks_are_still_tables():
+    split = split_table_chunks([_income_statement(2)])[0]
+
+    content, is_table = chunk_content(split)
+    assert is_table is True
+    assert content.startswith("| (In millions)")
+
+    html_content, html_is_table = chunk_content(_income_statement(2))
+    assert html_is_table is True
+    assert html_content.startswith("<table>")
+
+
+def test_html_format_keeps_row_groups_as_html_tables():
+    chunks = split_table_chunks([_income_statement(50)], max_size=600, table_format="html")
+
+    assert len(chunks) > 1
+    for chunk in chunks:
+        content, is_table = chunk_content(chunk)
+        assert is_table is True
+        assert content.startswith("<table><tr><th>(In millions)</th><th>2024</th><th>2023</th></tr>")
+        assert len(content) <= 600
+    assert chunks[0].text.startswith("(In millions) 2024 2023 Line item 0 0 0")
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError):
+        split_table_chunks([], table_format="csv")
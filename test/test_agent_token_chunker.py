@@ -0,0 +1,120 @@
+"""
+Test cases for token-budget chunking.
+Tests token_chunker and its token counters from agent.chunk_generation.token_chunker.
+"""
+from tokenizers import Tokenizer
+from tokenizers.models import WordLevel
+from tokenizers.pre_tokenizers import Whitespace
+from unstructured.documents.elements import ElementMetadata, NarrativeText, Table, Title
+
+from agent.chunk_generation.table_splitter import chunk_content
+from agent.chunk_generation.token_chunker import (
+    ApproximateTokenCounter,
+    EmbeddingTokenCounter,
+    ModelTokenCounter,
+    _fit_tables,
+    chunk_token_budget,
+    iter_token_chunks,
+    token_chunker,
+)
+
+
+class WordCounter:
+    """One token per whitespace-separated word."""
+
+    def count(self, text):
+        return len(text.split())
+
+    def validate(self):
+        pass
+
+
+def _elements():
+    metadata = ElementMetadata(filename="msft-10q.htm")
+    paragraph = "Revenue increased across every segment during the quarter. " * 15
+    return [Title(text="Item 2. Management's Discussion", metadata=metadata)] + [
+        NarrativeText(text=paragraph, metadata=metadata) for _ in range(4)
+    ]
+
+
+def test_chunks_fit_token_budget():
+    counter = WordCounter()
+
+    chunks = token_chunker(_elements(), max_tokens=100, counter=counter)
+
+    assert len(chunks) > 1
+    assert all(counter.count(chunk.text) <= 100 for chunk in chunks)
+    assert chunks[0].text.startswith("Item 2. Management's Discussion")
+
+
+def test_html_tables_are_measured_as_embedded_and_split():
+    counter = WordCounter()
+    rows = "".join(
+        f"<tr><td>Segment {i} revenue line</td><td>{i},000</td></tr>" for i in range(60)
+    )
+    table = Table(
+        text="Segment revenue",
+        metadata=ElementMetadata(
+            filename="msft-10q.htm",
+            text_as_html=f"<table><tr><th>Segment name</th><th>Amount</th></tr>{rows}</table>",
+        ),
+    )
+
+    chunks = token_chunker(_elements() + [table], max_tokens=100, counter=counter)
+
+    table_chunks = [chunk for chunk in chunks if chunk_content(chunk)[1]]
+    assert len(table_chunks) > 1
+    assert all(chunk_content(chunk)[0].startswith("<table>") for chunk in table_chunks)
+    assert all(counter.count(chunk_content(chunk)[0]) <= 100 for chunk in chunks)
+
+
+def test_oversized_tables_are_split_in_the_table_format():
+    counter = WordCounter()
+    rows = "".join(f"<tr><td>Segment {i} revenue line</td><td>{i},000</td></tr>" for i in range(60))
+    table = Table(
+        text="Segment revenue",
+        metadata=ElementMetadata(
+            text_as_html=f"<table><tr><th>Segment name</th><th>Amount</th></tr>{rows}</table>"
+        ),
+    )
+
+    html = _fit_tables([table], counter, 100)
+    markdown = _fit_tables([table], counter, 100, table_format="markdown")
+
+    assert len(html) > 1 and len(markdown) > 1
+    assert all(chunk_content(chunk)[0].startswith("<table><tr><th>Segment name</th>") for chunk in html)
+    assert all(chunk_content(chunk)[0].startswith("| Segment name | Amount |") for chunk in markdown)
+
+
+def test_model_counter_excludes_special_tokens():
+    class Model:
+        def token_count(self, text):
+            return len(text.split()) + 2
+
+    assert ModelTokenCounter(Model()).count("revenue grew fast") == 3
+
+
+def test_budget_is_limited_by_embedding_window_and_llm():
+    assert chunk_token_budget(512, 128, 750) == 384
+    assert chunk_token_budget(8192, 128, 750) == 750
+
+
+def test_embedding_counter_ignores_inference_truncation():
+    vocab = {"[UNK]": 0, "revenue": 1, "grew": 2}
+    tokenizer = Tokenizer(WordLevel(vocab, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = Whitespace()
+    tokenizer.enable_truncation(max_length=4)
+
+    counter = EmbeddingTokenCounter(tokenizer)
+
+    assert counter.count("revenue grew " * 10) == 20
+    assert tokenizer.truncation is not None
+
+
+def test_approximate_counter_and_iterator():
+    assert ApproximateTokenCounter().count("x" * 10) == 3
+
+    documents = [("empty.htm", []), ("msft-10q.htm", _elements())]
+    chunked = list(iter_token_chunks(documents, max_tokens=100, counter=WordCounter()))
+
+    assert [file_path for file_path, _ in chunked] == ["msft-10q.htm"]
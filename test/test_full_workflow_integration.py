@@ -30,7 +30,7 @@ def test_full_workflow_with_mocked_llm(tmp_path, monkeypatch):
     monkeypatch.chdir(tmp_path)
 
     # 3. Mock Ollama Client
-    # We mock the Client class in llm.qwen_ollama_chunking
+    # We mock the Client class behind the shared client in llm.ollama_client
     mock_response = {
         "summary": "Revenue increased by 10% and expenses declined.",
         "keywords": ["Revenue", "Expenses", "Growth"],
@@ -44,7 +44,9 @@ def test_full_workflow_with_mocked_llm(tmp_path, monkeypatch):
         }
     }
 
-    with patch("llm.qwen_ollama_chunking.Client") as MockClient:
+    from llm.ollama_client import reset_clients
+    reset_clients()
+    with patch("llm.ollama_client.Client") as MockClient:
         # Configure the mock client instance
         mock_instance = MockClient.return_value
         mock_instance.chat.return_value = mock_chat_response
@@ -110,3 +112,6 @@ def test_full_workflow_with_mocked_llm(tmp_path, monkeypatch):
             # If db name is different, we might fail here, but let's assume standard behavior or check the file
             pass
 
+
+    # Drop the mocked client so later tests build a real one
+    reset_clients()
@@ -0,0 +1,186 @@
+"""
+Test cases for the pluggable enrichment backends.
+Tests rate limiting, backend selection and the fake, Ollama and Gemini backends
+from llm.backends.
+"""
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from unstructured.documents.elements import ElementMetadata, Text
+
+from agent.chunk_enrichment.enrichment_cache import EnrichmentCache
+from agent.chunk_enrichment.llm_enrichment import enrich_chunk
+from llm.backends import (
+    FakeBackend,
+    GeminiBackend,
+    OllamaBackend,
+    RateLimiter,
+    RateLimits,
+    TokenBucket,
+    create_backend,
+    get_backend,
+    reset_backend,
+)
+from llm.ollama_client import OllamaSettings, reset_clients
+from llm.qwen_ollama_chunking import batch_chunk_enricher, chunk_enricher
+from testing.fake_ollama_server import FakeOllamaServer
+
+
+@pytest.fixture(autouse=True)
+def fresh_backend():
+    reset_backend()
+    yield
+    reset_backend()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_token_bucket_allows_a_minute_of_burst_then_refills_at_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(60, clock=clock, sleep=clock.sleep)
+
+    assert sum(bucket.acquire() for _ in range(60)) == 0
+    assert bucket.acquire() == pytest.approx(1.0)
+
+    # Oversized requests are capped at the capacity instead of waiting forever.
+    assert bucket.acquire(1000) == pytest.approx(60.0)
+
+
+def test_rate_limiter_caps_concurrency():
+    limiter = RateLimiter(RateLimits(concurrency=2))
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def request():
+        nonlocal running, peak
+        with limiter.slot(tokens=10):
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.01)
+            with lock:
+                running -= 1
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak == 2
+    assert (limiter.stats.requests, limiter.stats.tokens) == (8, 80)
+
+
+def test_limits_are_overridden_from_the_environment(monkeypatch):
+    monkeypatch.setenv("FAKE_REQUESTS_PER_MINUTE", "120")
+    monkeypatch.setenv("FAKE_CONCURRENCY", "3")
+
+    limits = FakeBackend().limits
+
+    assert limits == RateLimits(requests_per_minute=120, tokens_per_minute=None, concurrency=3)
+
+
+def test_backend_is_chosen_from_config(monkeypatch):
+    monkeypatch.setenv("ENRICHMENT_BACKEND", "fake")
+    assert isinstance(get_backend(), FakeBackend)
+
+    with pytest.raises(ValueError, match="ollama, gemini, fake"):
+        create_backend("gpt")
+
+
+def test_fake_backend_is_deterministic_and_handles_batches():
+    backend = FakeBackend()
+    prompt = chunk_enricher("Revenue grew 15% on cloud revenue. Margins fell.", True, "analyst")
+
+    first = backend.generate(prompt)
+    assert first == backend.generate(prompt)
+    assert first.summary == "Revenue grew 15% on cloud revenue."
+    assert first.keywords[0] == "revenue"
+    assert first.table_summary is not None
+
+    batch = backend.generate_batch(
+        batch_chunk_enricher([("Cloud revenue grew.", False), ("Costs fell.", True)], "analyst"), 2
+    )
+    assert [entry.summary for entry in batch] == ["Cloud revenue grew.", "Costs fell."]
+    assert batch[0].table_summary is None and batch[1].table_summary is not None
+
+
+def test_enrich_chunk_runs_on_the_configured_backend(monkeypatch, tmp_path):
+    monkeypatch.setenv("ENRICHMENT_BACKEND", "fake")
+    chunks = [
+        Text(text=f"Segment {i} revenue increased.", metadata=ElementMetadata(filename="msft-10q.htm"))
+        for i in range(5)
+    ]
+    cache = EnrichmentCache(tmp_path / "cache.db")
+
+    results = enrich_chunk(chunks, cache=cache)
+
+    assert [result["summary"] for result in results] == [
+        f"Segment {i} revenue increased." for i in range(5)
+    ]
+    assert cache.model == "fake"
+    assert get_backend().limiter.stats.requests == 5
+
+
+def test_gemini_module_shares_the_process_wide_limiter(monkeypatch):
+    from llm.llm_for_chunking import generate_enriched_chunk as gemini_generate
+
+    monkeypatch.setenv("ENRICHMENT_BACKEND", "fake")
+    gemini_generate(chunk_enricher("Revenue grew.", False, "analyst"))
+
+    assert get_backend().limiter.stats.requests == 1
+
+
+def test_ollama_backend_uses_the_shared_client():
+    with FakeOllamaServer(latency=0) as server:
+        reset_clients(OllamaSettings(host=server.url, model="qwen2.5:7b", pool_size=2))
+        backend = OllamaBackend()
+        assert backend.generate(chunk_enricher("Revenue grew.", False, "analyst")).summary == "Fake summary."
+        assert backend.model == "qwen2.5:7b"
+    reset_clients()
+
+    assert backend.limits.concurrency == 2
+    assert server.requests == 1
+
+
+def test_gemini_backend_declares_free_tier_limits(monkeypatch):
+    calls = []
+
+    class StubModel:
+        def __init__(self, model_name, generation_config):
+            self.generation_config = generation_config
+
+        def generate_content(self, prompt):
+            calls.append(self.generation_config)
+            return SimpleNamespace(text=json.dumps({
+                "summary": "Gemini summary.",
+                "keywords": ["revenue"],
+                "hypothetical_questions": ["What grew?"],
+            }))
+
+    genai = pytest.importorskip("google.generativeai")
+    monkeypatch.setattr(genai, "configure", lambda api_key: None)
+    monkeypatch.setattr(genai, "GenerativeModel", StubModel)
+
+    backend = GeminiBackend(model="gemini-2.0-flash-lite")
+    metadata = backend.generate(chunk_enricher("Revenue grew.", False, "analyst"))
+
+    assert metadata.summary == "Gemini summary."
+    assert metadata.table_summary is None
+    assert "response_schema" in calls[0]
+    assert backend.limits.requests_per_minute == 30
@@ -71,9 +71,10 @@ def test_main_workflow_with_small_file(monkeypatch, tmp_path):
     assert count_result.count == 1, f"Expected 1 document in Qdrant, found {count_result.count}"
 
     # Retrieve the point to check vector dimension
-    points = client.retrieve(
+    # Point ids are uuids derived from the chunk, so fetch whatever point is stored
+    points, _ = client.scroll(
         collection_name=COLLECTION_NAME,
-        ids=[0],
+        limit=1,
         with_vectors=True
     )
     vector = points[0].vector
@@ -0,0 +1,55 @@
+"""
+Test cases for the shared Ollama client.
+Tests llm.ollama_client settings and connection reuse against the fake Ollama server.
+"""
+import pytest
+
+from llm.backends import OllamaBackend
+from llm.ollama_client import OllamaSettings, get_client, get_settings, reset_clients
+from testing.fake_ollama_server import FakeOllamaServer
+
+
+@pytest.fixture(autouse=True)
+def fresh_clients():
+    reset_clients()
+    yield
+    reset_clients()
+
+
+def test_settings_are_read_from_environment(monkeypatch):
+    monkeypatch.setenv("OLLAMA_HOST", "http://ollama.internal:11434")
+    monkeypatch.setenv("OLLAMA_MODEL", "qwen2.5:7b")
+    monkeypatch.setenv("OLLAMA_TIMEOUT", "30")
+    monkeypatch.setenv("OLLAMA_KEEP_ALIVE", "10m")
+    monkeypatch.setenv("ENRICHMENT_WORKERS", "8")
+
+    settings = get_settings()
+
+    assert settings == OllamaSettings(
+        host="http://ollama.internal:11434",
+        model="qwen2.5:7b",
+        timeout=30.0,
+        keep_alive="10m",
+        pool_size=8,
+    )
+    assert settings.limits().max_keepalive_connections == 8
+
+
+def test_client_is_shared_until_reset():
+    first = get_client()
+    assert get_client() is first
+
+    reset_clients(OllamaSettings(host="http://localhost:11434"))
+    assert get_client() is not first
+    assert get_settings().host == "http://localhost:11434"
+
+
+def test_calls_reuse_one_keep_alive_connection():
+    with FakeOllamaServer(latency=0) as server:
+        reset_clients(OllamaSettings(host=server.url, keep_alive="5m"))
+        backend = OllamaBackend()
+        for _ in range(10):
+            assert backend.generate("prompt").summary == "Fake summary."
+
+    assert server.requests == 10
+    assert len(server.connections) == 1
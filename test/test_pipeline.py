@@ -0,0 +1,91 @@
+"""
+Test cases for the bounded-queue pipeline runner.
+Tests run_pipeline and Stage from utils.pipeline.
+"""
+import threading
+import time
+
+import pytest
+
+from utils.pipeline import Stage, run_pipeline
+
+
+def test_items_flow_through_every_stage():
+    results = []
+
+    def split(document):
+        for part in range(3):
+            yield document, part
+
+    def collect(item):
+        results.append(item)
+        return ()
+
+    stats = run_pipeline(
+        range(4), [Stage("split", split), Stage("collect", collect)], source_name="parse"
+    )
+
+    assert sorted(results) == [(document, part) for document in range(4) for part in range(3)]
+    assert [stage.name for stage in stats.stages] == ["parse", "split", "collect"]
+    assert [(stage.items_in, stage.items_out) for stage in stats.stages] == [
+        (0, 4),
+        (4, 12),
+        (12, 0),
+    ]
+    assert "items/s" in stats.report()
+
+
+def test_full_queues_hold_back_faster_stages():
+    produced = []
+    consumed = []
+    ahead = []
+
+    def source():
+        for item in range(20):
+            produced.append(item)
+            ahead.append(len(produced) - len(consumed))
+            yield item
+
+    def slow(item):
+        time.sleep(0.005)
+        consumed.append(item)
+        return ()
+
+    stats = run_pipeline(source(), [Stage("pass", lambda item: [item]), Stage("slow", slow)], queue_size=2)
+
+    assert consumed == list(range(20))
+    # Two queues of two, one item in each stage and the one being produced.
+    assert max(ahead) <= 2 * 2 + 2 + 1
+    assert stats.stages[0].blocked_seconds > 0
+    assert stats.stages[2].max_depth <= 2
+
+
+def test_stage_workers_run_concurrently():
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def work(item):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.01)
+        with lock:
+            running -= 1
+        yield item
+
+    stats = run_pipeline(range(12), [Stage("work", work, workers=3)], queue_size=8)
+
+    assert peak > 1
+    assert stats.stages[1].items_out == 12
+
+
+def test_stage_errors_stop_the_pipeline_and_are_raised():
+    def fail(item):
+        if item == 3:
+            raise ValueError("bad chunk")
+        yield item
+
+    with pytest.raises(ValueError, match="bad chunk"):
+        run_pipeline(iter(range(1000)), [Stage("fail", fail)], queue_size=1)
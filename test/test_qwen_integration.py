@@ -1,5 +1,6 @@
 import pytest
-from llm.qwen_ollama_chunking import generate_enriched_chunk, ChunkMetadata
+from llm.backends import generate_enriched_chunk
+from llm.qwen_ollama_chunking import ChunkMetadata
 
 def test_qwen_json_structure():
     """
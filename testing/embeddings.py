@@ -0,0 +1,17 @@
+"""
+An offline stand-in for the fastembed model, so embedding tests download nothing.
+"""
+import numpy as np
+
+
+class FakeEmbeddingModel:
+    """Yields a 384-dimension vector derived from each text and remembers what it embedded."""
+
+    def __init__(self):
+        self.embedded = []
+
+    def embed(self, texts, batch_size=32):
+        for text in texts:
+            self.embedded.append(text)
+            rng = np.random.default_rng(abs(hash(text)) % 2**32)
+            yield rng.random(384)
@@ -0,0 +1,110 @@
+"""
+A local fake Ollama server for enrichment tests and benchmarks.
+
+Serves POST /api/chat with a valid ChunkMetadata JSON answer after a simulated
+latency that grows once more than ``capacity`` requests are in flight, and
+answers 503 once more than ``max_in_flight`` are.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RESPONSE_METADATA = {
+    "summary": "Fake summary.",
+    "keywords": ["fake"],
+    "hypothetical_questions": ["Is this fake?"],
+    "table_summary": None,
+}
+
+
+class FakeOllamaServer:
+    """Run with ``with FakeOllamaServer() as server:`` and point clients at ``server.url``."""
+
+    def __init__(self, latency=0.02, capacity=4, max_in_flight=8, overload_penalty=0.5):
+        self.latency = latency
+        self.capacity = capacity
+        self.max_in_flight = max_in_flight
+        self.overload_penalty = overload_penalty
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests = 0
+        self.rejected = 0
+        self.prompts = []
+        self.connections = set()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+        )
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, payload):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with server._lock:
+                    server.requests += 1
+                    server.in_flight += 1
+                    in_flight = server.in_flight
+                    server.peak_in_flight = max(server.peak_in_flight, in_flight)
+                    server.prompts.append(request["messages"][-1]["content"])
+                    server.connections.add(self.client_address)
+                try:
+                    if in_flight > server.max_in_flight:
+                        with server._lock:
+                            server.rejected += 1
+                        self._reply(503, {"error": "server overloaded"})
+                        return
+                    queued = max(0, in_flight - server.capacity)
+                    time.sleep(server.latency * (1 + queued * server.overload_penalty))
+                    self._reply(
+                        200,
+                        {
+                            "model": request.get("model", ""),
+                            "created_at": "2024-01-01T00:00:00Z",
+                            "message": {
+                                "role": "assistant",
+                                "content": json.dumps(server.response_for(request)),
+                            },
+                            "done": True,
+                        },
+                    )
+                finally:
+                    with server._lock:
+                        server.in_flight -= 1
+
+        return Handler
+
+    def response_for(self, request):
+        """Metadata returned for a chat request; override for custom answers."""
+        return RESPONSE_METADATA
@@ -0,0 +1,38 @@
+"""
+Chunks as the chunkers produce them, and enriched chunk records shaped like
+the ones build_enriched_records produces.
+"""
+from unstructured.documents.elements import ElementMetadata, Text
+
+
+def text_chunk(text):
+    """A text chunk from the MSFT 10-Q fixture filing."""
+    return Text(text=text, metadata=ElementMetadata(filename="msft-10q.htm"))
+
+
+def numbered_chunks(count, padding=""):
+    """``count`` short chunks numbered from 0, each optionally followed by ``padding``."""
+    return [text_chunk(f"Chunk number {i} about revenue.{padding}") for i in range(count)]
+
+
+
+def enriched_records(source, count, start=0, summary="S"):
+    """``count`` records for the filing ``source`` ("<form>/<accession>"), numbered from ``start``."""
+    form_type, accession_number = source.split("/")
+    return [
+        {
+            "chunk_id": f"{source}-{i}",
+            "source": source,
+            "source_file": f"MSFT/{source}/full-submission.txt",
+            "accession_number": accession_number,
+            "form_type": form_type,
+            "filing_date": None,
+            "content": f"Revenue line {i}",
+            "is_table": i % 2 == 1,
+            "summary": f"{summary}{i}",
+            "keywords": ["revenue", f"k{i}"],
+            "hypothetical_questions": [],
+            "table_summary": None,
+        }
+        for i in range(start, start + count)
+    ]
@@ -0,0 +1,17 @@
+import resource
+import sys
+
+
+def peak_rss_mb(include_children: bool = False) -> float:
+    """Returns the peak resident set size of this process in megabytes.
+
+    With ``include_children`` the peak of terminated child processes (such as
+    parser worker pools) is reported instead.
+    """
+    who = resource.RUSAGE_CHILDREN if include_children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+
+    # ru_maxrss is reported in bytes on macOS and kilobytes elsewhere
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
@@ -0,0 +1,169 @@
+"""Run generator stages on threads joined by bounded queues."""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, List
+
+_DONE = object()
+
+
+@dataclass
+class Stage:
+    """One pipeline step: ``fn`` maps an input item to zero or more output items."""
+
+    name: str
+    fn: Callable[[Any], Iterable[Any]]
+    workers: int = 1
+
+
+@dataclass
+class StageStats:
+    """Throughput and queue depth of one stage."""
+
+    name: str
+    items_in: int = 0
+    items_out: int = 0
+    busy_seconds: float = 0.0
+    blocked_seconds: float = 0.0
+    depth_samples: int = 0
+    depth_total: int = 0
+    max_depth: int = 0
+
+    def sample_depth(self, depth: int) -> None:
+        self.depth_samples += 1
+        self.depth_total += depth
+        self.max_depth = max(self.max_depth, depth)
+
+    @property
+    def mean_depth(self) -> float:
+        return self.depth_total / self.depth_samples if self.depth_samples else 0.0
+
+    def report(self, elapsed: float) -> str:
+        rate = self.items_out / elapsed if elapsed else 0.0
+        busy = self.busy_seconds / elapsed if elapsed else 0.0
+        blocked = self.blocked_seconds / elapsed if elapsed else 0.0
+        return (
+            f"  {self.name:<8} {self.items_in:>6} in {self.items_out:>6} out "
+            f"{rate:8.2f} items/s  busy {busy:6.1%}  blocked on full queue {blocked:6.1%}  "
+            f"input queue depth avg {self.mean_depth:.1f} / max {self.max_depth}"
+        )
+
+
+@dataclass
+class PipelineStats:
+    """Per-stage statistics of one ``run_pipeline`` call."""
+
+    stages: List[StageStats] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    def report(self) -> str:
+        lines = [f"Pipeline finished in {self.elapsed:.1f}s:"]
+        lines.extend(stage.report(self.elapsed) for stage in self.stages)
+        return "\n".join(lines)
+
+
+def run_pipeline(
+    source: Iterable[Any],
+    stages: List[Stage],
+    queue_size: int = 4,
+    source_name: str = "source",
+) -> PipelineStats:
+    """Feed ``source`` through ``stages``, each running on its own threads.
+
+    Stages are connected by queues holding at most ``queue_size`` items, so a
+    slow stage blocks the stages feeding it instead of letting work pile up in
+    memory. Outputs of the last stage are discarded. Busy and blocked times
+    are summed over a stage's workers, so busy can exceed 100% with several
+    workers. The first exception raised by any stage stops the pipeline and
+    is re-raised here.
+    """
+
+    queues = [queue.Queue(maxsize=queue_size) for _ in stages]
+    stats = PipelineStats([StageStats(source_name)] + [StageStats(stage.name) for stage in stages])
+    stop = threading.Event()
+    errors: List[BaseException] = []
+    lock = threading.Lock()
+
+    def put(target: queue.Queue, item: Any, stage_stats: StageStats) -> None:
+        started = time.perf_counter()
+        while not stop.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        with lock:
+            stage_stats.blocked_seconds += time.perf_counter() - started
+
+    def emit(outputs: Iterable[Any], index: int, stage_stats: StageStats) -> None:
+        """Time producing ``outputs`` as busy and hand them to stage ``index``."""
+        iterator = iter(outputs)
+        while not stop.is_set():
+            started = time.perf_counter()
+            item = next(iterator, _DONE)
+            with lock:
+                stage_stats.busy_seconds += time.perf_counter() - started
+            if item is _DONE:
+                return
+            with lock:
+                stage_stats.items_out += 1
+            if index < len(queues):
+                put(queues[index], item, stage_stats)
+
+    def run_source() -> None:
+        try:
+            emit(source, 0, stats.stages[0])
+        except BaseException as exc:
+            errors.append(exc)
+            stop.set()
+        finally:
+            put(queues[0], _DONE, stats.stages[0])
+
+    finished = [0] * len(stages)
+
+    def run_worker(index: int) -> None:
+        stage, stage_stats, inbox = stages[index], stats.stages[index + 1], queues[index]
+        try:
+            while not stop.is_set():
+                try:
+                    item = inbox.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if item is _DONE:
+                    # Let sibling workers of this stage see the end as well.
+                    inbox.put(_DONE)
+                    break
+                with lock:
+                    stage_stats.items_in += 1
+                    stage_stats.sample_depth(inbox.qsize())
+                emit(stage.fn(item), index + 1, stage_stats)
+        except BaseException as exc:
+            errors.append(exc)
+            stop.set()
+        finally:
+            with lock:
+                finished[index] += 1
+                last = finished[index] == stage.workers
+            if last and index + 1 < len(queues):
+                put(queues[index + 1], _DONE, stage_stats)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=run_source, name=source_name, daemon=True)]
+    for index, stage in enumerate(stages):
+        threads.extend(
+            threading.Thread(target=run_worker, args=(index,), name=f"{stage.name}-{worker}", daemon=True)
+            for worker in range(stage.workers)
+        )
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats.elapsed = time.perf_counter() - started
+
+    if errors:
+        raise errors[0]
+    return stats
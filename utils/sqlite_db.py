@@ -1,11 +1,11 @@
-from langchain_community.utilities import SQLDatabase
 import sqlite3
-import pandas as pd
 
 DB_PATH = "financials.db"
 
 def create_table_from_input(input_path: str, table_name: str, db_path: str = DB_PATH):
     """Reads a input file and creates a table in the SQLite database."""
+    import pandas as pd
+
     conn = sqlite3.connect(db_path)
     try:
         df = pd.read_csv(input_path)
@@ -18,6 +18,8 @@ def create_table_from_input(input_path: str, table_name: str, db_path: str = DB_
 
 def verify_database(db_path: str = DB_PATH):
     """Prints schema info using LangChain wrapper."""
+    from langchain_community.utilities import SQLDatabase
+
     try:
         db = SQLDatabase.from_uri(f"sqlite:///{db_path}")
         print("\n--- Database Schema ---")